@@ -19,5 +19,9 @@ if __name__ == "__main__":
     gdop_app = GDOPApp([scenario])
     qt_app = QApplication(sys.argv)
     window = presentation.MainWindow(gdop_app)
+    # optional: python app.py <session.gdop>
+    session_args = [arg for arg in qt_app.arguments()[1:] if arg.endswith(".gdop")]
+    if session_args:
+        window.open_session(session_args[0])
     window.showMaximized()
     sys.exit(qt_app.exec_())
\ No newline at end of file
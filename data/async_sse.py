@@ -0,0 +1,307 @@
+"""
+asyncio-based SSE ingestion for GDOP.
+
+A single event loop on a background thread serves any number of SSE streams.
+Every stream reconnects with exponential backoff, resumes with the Last-Event-ID
+of the last event it saw and can be cancelled immediately from any thread. A
+connection that delivers no bytes (not even a heartbeat comment) for
+idle_timeout seconds is treated as dead and reconnected.
+Only the standard library is used (plain HTTP/1.1 over asyncio streams).
+
+Usage:
+    service = SSEService()
+    stream_id = service.subscribe("http://localhost:8765/events", on_event)
+    service.unsubscribe(stream_id)
+    service.close()
+
+on_event is called on the service's loop thread with an `SSEEvent` and must
+not block; hand the data over to other threads (e.g. a queue) if needed. It may
+also be a coroutine function: the stream then awaits it before reading the next
+event, which applies backpressure to that stream only.
+"""
+
+import asyncio
+import inspect
+import itertools
+import ssl
+import threading
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, Dict, Optional
+from urllib.parse import urlsplit
+import logging
+
+_LOG = logging.getLogger(__name__)
+
+
+class SSEEvent:
+    def __init__(self, event="message", data="", id=None, retry=None):
+        self.event = event
+        self.data = data
+        self.id = id
+        self.retry = retry
+
+    def __repr__(self):
+        return f"SSEEvent(event={self.event}, id={self.id}, data={self.data})"
+
+
+class SSEParser:
+    """Incremental parser for the text/event-stream format.
+
+    Field names are stripped, so the "event : update" lines of data/example.stream
+    are read as "event" fields.
+    """
+
+    def __init__(self):
+        self._event = None
+        self._data = []
+        self._id = None
+        self._retry = None
+        self.last_event_id = None
+
+    def feed_line(self, line: str) -> Optional[SSEEvent]:
+        """Consume one line (without line terminator); returns an event when one is complete."""
+        if not line:
+            return self._dispatch()
+        if line.startswith(":"):
+            return None
+
+        name, _, value = line.partition(":")
+        name = name.strip()
+        if value.startswith(" "):
+            value = value[1:]
+
+        if name == "event":
+            self._event = value
+        elif name == "data":
+            self._data.append(value)
+        elif name == "id":
+            self._id = value
+        elif name == "retry" and value.isdigit():
+            self._retry = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        if self._id is not None:
+            self.last_event_id = self._id
+        if not self._data and self._event is None:
+            self._id = None
+            return None
+        event = SSEEvent(self._event or "message", "\n".join(self._data), self.last_event_id, self._retry)
+        self._event = None
+        self._data = []
+        self._id = None
+        self._retry = None
+        return event
+
+
+class SSEError(Exception):
+    pass
+
+
+async def _open(url: str, last_event_id: Optional[str], timeout: float):
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise SSEError(f"Unsupported URL scheme: {url}")
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, port, ssl=ssl.create_default_context() if secure else None),
+        timeout)
+
+    request = [
+        f"GET {path} HTTP/1.1",
+        f"Host: {parts.netloc}",
+        "Accept: text/event-stream",
+        "Cache-Control: no-cache",
+    ]
+    if last_event_id is not None:
+        request.append(f"Last-Event-ID: {last_event_id}")
+    writer.write(("\r\n".join(request) + "\r\n\r\n").encode("utf-8"))
+    await writer.drain()
+
+    status_line = await asyncio.wait_for(reader.readline(), timeout)
+    status = status_line.decode("latin-1").split()
+    if len(status) < 2 or status[1] != "200":
+        writer.close()
+        raise SSEError(f"Unexpected response from {url}: {status_line.decode('latin-1').strip()}")
+
+    headers = {}
+    while True:
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+    return reader, writer, chunked
+
+
+async def _read(read, idle_timeout: Optional[float]):
+    """Await one body read; SSEError if it takes longer than idle_timeout (None: wait forever)."""
+    if idle_timeout is None:
+        return await read
+    try:
+        return await asyncio.wait_for(read, idle_timeout)
+    except asyncio.TimeoutError:
+        raise SSEError(f"No data received for {idle_timeout:g} s") from None
+
+
+async def _iter_body(reader: asyncio.StreamReader, chunked: bool, idle_timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+    while True:
+        if not chunked:
+            data = await _read(reader.read(65536), idle_timeout)
+            if not data:
+                return
+            yield data
+            continue
+
+        size_line = await _read(reader.readline(), idle_timeout)
+        if not size_line:
+            return
+        size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+        if size == 0:
+            return
+        data = await _read(reader.readexactly(size), idle_timeout)
+        await _read(reader.readexactly(2), idle_timeout)  # CRLF after every chunk
+        yield data
+
+
+async def iter_sse_events(url: str, parser: Optional[SSEParser] = None, timeout: float = 10.0,
+                          idle_timeout: Optional[float] = None) -> AsyncIterator[SSEEvent]:
+    """
+    Connect to url and yield its events until the server closes the stream.
+
+    Args:
+        url: http(s) URL of the event stream
+        parser: Parser of a previous connection, to resume with its Last-Event-ID
+        timeout: Seconds to wait for the connection and the response headers
+        idle_timeout: Seconds without any body bytes after which SSEError is raised
+            (None: wait forever)
+    """
+    parser = parser or SSEParser()
+    reader, writer, chunked = await _open(url, parser.last_event_id, timeout)
+    try:
+        pending = b""
+        async for data in _iter_body(reader, chunked, idle_timeout):
+            pending += data
+            lines = pending.splitlines(keepends=True)
+            # keep an unterminated last line (and a lone CR that may precede LF) for the next chunk
+            pending = lines.pop() if lines and not lines[-1].endswith(b"\n") else b""
+            for raw in lines:
+                event = parser.feed_line(raw.rstrip(b"\r\n").decode("utf-8", errors="replace"))
+                if event is not None:
+                    yield event
+    finally:
+        writer.close()
+
+
+class SSEService:
+    def __init__(self, initial_backoff: float = 0.5, max_backoff: float = 30.0, timeout: float = 10.0,
+                 idle_timeout: Optional[float] = 60.0):
+        """
+        Args:
+            initial_backoff: Seconds before the first reconnect (replaced by the server's retry field)
+            max_backoff: Upper limit of the doubling reconnect delay
+            timeout: Seconds to wait for the connection and the response headers
+            idle_timeout: Seconds without any bytes after which a connection is considered
+                half-open and reconnected; should exceed the server's heartbeat interval
+        """
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._streams: Dict[int, Future] = {}
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="sse-service", daemon=True)
+            self._thread.start()
+            return self._loop
+
+    async def _run_stream(self, url: str, on_event: Callable[[SSEEvent], None], on_status: Optional[Callable[[str], None]]):
+        parser = SSEParser()
+        base_backoff = backoff = self.initial_backoff
+        while True:
+            try:
+                if on_status:
+                    on_status("connecting")
+                async for event in iter_sse_events(url, parser, self.timeout, self.idle_timeout):
+                    if event.retry is not None:
+                        # the server's reconnection time replaces the initial backoff
+                        base_backoff = event.retry / 1000.0
+                    backoff = base_backoff
+                    try:
+                        result = on_event(event)
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception:
+                        _LOG.exception("SSE event handler failed for %s", url)
+                _LOG.info("SSE stream %s closed by server", url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _LOG.warning("SSE stream %s failed: %s", url, e)
+
+            if on_status:
+                on_status("reconnecting")
+            await asyncio.sleep(backoff)
+            backoff = min(self.max_backoff, backoff * 2)
+
+    def subscribe(self, url: str, on_event: Callable[[SSEEvent], None], on_status: Optional[Callable[[str], None]] = None) -> int:
+        """Start consuming url on the shared loop; returns an id for `unsubscribe`."""
+        loop = self._ensure_loop()
+        stream_id = next(self._ids)
+        self._streams[stream_id] = asyncio.run_coroutine_threadsafe(self._run_stream(url, on_event, on_status), loop)
+        return stream_id
+
+    def unsubscribe(self, stream_id: int):
+        """Cancel a stream; the connection is closed on the loop's next iteration."""
+        future = self._streams.pop(stream_id, None)
+        if future is not None:
+            future.cancel()
+
+    async def _cancel_all(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        """Cancel all streams and stop the loop thread."""
+        self._streams.clear()
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._cancel_all(), self._loop).result(timeout=1)
+            except Exception as e:
+                _LOG.warning("SSE streams did not shut down cleanly: %s", e)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=1)
+            if not self._thread.is_alive():
+                self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+_default_service = None
+
+
+def default_service() -> SSEService:
+    """The process-wide service, so all streams share one event loop."""
+    global _default_service
+    if _default_service is None:
+        _default_service = SSEService()
+    return _default_service
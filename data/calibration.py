@@ -0,0 +1,274 @@
+"""
+Per-AP range calibration for GDOP.
+
+Fits a linear bias model for every AP over all rtt-log CSVs of the workspace:
+
+    est_range = scale * reference + offset [+ rssi_coef * (rssi - rssi_center)]
+
+and corrects measured ranges with its inverse. All APs are fitted at once: the
+normal equations of every AP are accumulated with np.add.at over an AP index
+and solved in one batched call.
+
+The reference range of a row is the distance between the AP's anchor and the
+tag truth position of its scenario.json. The loggers write a constant
+placeholder into `true_range(m)`, so that column is not used; scenarios
+without a tag position are skipped.
+
+A fit is cached in <workspace>/CACHE_FILE together with a fingerprint of the
+workspace files (paths, sizes, modification times), so the workspace is only
+fitted again after it changed. Scenarios imported with a calibration keep it
+(`Scenario.calibration`) and correct streamed rtt-log rows with it as well.
+
+Usage:
+    calibration, error = load_or_fit_calibration("workspace")
+    corrected = calibration.correct("FTM_BLUE", 12.875, rssi=-56)
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from data.import_measurements import read_workspace_csvs
+from data.import_scenario import _read_scenario_json
+from simulation.station import Anchor
+
+_LOG = logging.getLogger(__name__)
+
+CACHE_FILE = ".gdop-calibration.json"
+# bump when the model changes, older cache files are then refitted
+CACHE_VERSION = 1
+# a fitted scale below this is treated as unidentifiable and replaced by an offset-only model
+MIN_SCALE = 0.2
+# cache entries per mode; "rssi" adds the RSSI term
+CALIBRATION_MODES = ("linear", "rssi")
+
+_memory_cache: Dict[Tuple[str, bool], "Calibration"] = {}
+
+
+class Calibration:
+    def __init__(self, models: Dict[str, Tuple[float, float, float]], use_rssi: bool = False, fingerprint: str = "",
+                 rssi_center: float = 0.0):
+        """
+        Args:
+            models: ap-ssid -> (scale, offset, rssi_coef)
+            use_rssi: Whether the models include the RSSI term
+            fingerprint: Fingerprint of the workspace the models were fitted on
+            rssi_center: Mean RSSI of the fit; a missing RSSI is corrected as if it were this value
+        """
+        self.models = models
+        self.use_rssi = use_rssi
+        self.fingerprint = fingerprint
+        self.rssi_center = rssi_center
+
+    @property
+    def mode(self) -> str:
+        return "rssi" if self.use_rssi else "linear"
+
+    def __contains__(self, ap_ssid):
+        return str(ap_ssid) in self.models
+
+    def correct(self, ap_ssid, est_range: float, rssi: Optional[float] = None) -> float:
+        """Corrected range for one measurement; unknown APs are returned unchanged."""
+        model = self.models.get(str(ap_ssid))
+        if model is None:
+            return est_range
+        scale, offset, rssi_coef = model
+        rssi_term = 0.0
+        # 0 dBm marks a missing reading in the logs
+        if self.use_rssi and isinstance(rssi, (int, float)) and np.isfinite(rssi) and rssi < 0:
+            rssi_term = rssi_coef * (rssi - self.rssi_center)
+        return (est_range - offset - rssi_term) / scale
+
+    def correct_frame(self, df: pd.DataFrame, range_col: str = "est._range(m)") -> pd.DataFrame:
+        """Return a copy of df with range_col corrected; rows of unknown APs are left unchanged."""
+        if df.empty or "ap-ssid" not in df.columns or range_col not in df.columns:
+            return df
+        # one lookup per AP, then a vectorized map over the rows
+        coefficients = pd.DataFrame.from_dict(self.models, orient="index", columns=["scale", "offset", "rssi_coef"])
+        ap = df["ap-ssid"].astype(str)
+        scale = ap.map(coefficients["scale"]).fillna(1.0).to_numpy(dtype=float)
+        offset = ap.map(coefficients["offset"]).fillna(0.0).to_numpy(dtype=float)
+        est = pd.to_numeric(df[range_col], errors="coerce").to_numpy(dtype=float)
+        corrected = est - offset
+        if self.use_rssi and "rssi(dbm)" in df.columns:
+            rssi_coef = ap.map(coefficients["rssi_coef"]).fillna(0.0).to_numpy(dtype=float)
+            rssi = pd.to_numeric(df["rssi(dbm)"], errors="coerce").to_numpy(dtype=float)
+            # 0 dBm marks a missing reading in the logs
+            with np.errstate(invalid="ignore"):
+                deviation = np.where(rssi < 0, rssi - self.rssi_center, 0.0)
+            corrected -= rssi_coef * deviation
+        return df.assign(**{range_col: corrected / scale})
+
+    def to_dict(self) -> dict:
+        return {"fingerprint": self.fingerprint, "use_rssi": self.use_rssi, "rssi_center": self.rssi_center,
+                "models": {ap: list(model) for ap, model in self.models.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Calibration":
+        return cls({ap: tuple(model) for ap, model in data["models"].items()},
+                   data.get("use_rssi", False), data.get("fingerprint", ""), data.get("rssi_center", 0.0))
+
+    def __repr__(self):
+        return f"Calibration(aps={sorted(self.models)}, mode={self.mode})"
+
+
+def workspace_fingerprint(workspace_dir: str = "workspace") -> str:
+    """Hash of the relative path, size and mtime of every CSV and scenario.json (no file is read)."""
+    root = Path(workspace_dir)
+    entries = []
+    for path in sorted(list(root.glob("*/*.csv")) + list(root.glob("*/scenario.json"))):
+        st = path.stat()
+        entries.append(f"{path.relative_to(root).as_posix()}|{st.st_size}|{st.st_mtime_ns}")
+    return hashlib.sha1("\n".join(entries).encode("utf-8")).hexdigest()
+
+
+def _reference_ranges(scenario_name: str, ap_ssids, workspace_dir: str) -> Dict[str, float]:
+    """ap-ssid -> distance between its anchor and the scenario's tag truth."""
+    # importer imports this module; resolve its AP matching lazily
+    from data.importer import _match_anchor
+
+    config = _read_scenario_json(scenario_name, workspace_dir)
+    if config is None:
+        return {}
+    anchors = []
+    truth = None
+    for st in config.get("stations", []):
+        if st["type"] == "ANCHOR":
+            anchors.append(Anchor(st["position"], st["name"]))
+        elif st["type"] == "TAG" and st.get("position") is not None:
+            truth = np.asarray(st["position"], dtype=float)
+    if truth is None or not anchors:
+        return {}
+
+    references = {}
+    for ap_ssid in ap_ssids:
+        anchor = _match_anchor(anchors, ap_ssid)
+        if anchor is not None:
+            references[str(ap_ssid)] = float(np.linalg.norm(anchor.position() - truth))
+    return references
+
+
+def fit_calibration(workspace_dir: str = "workspace", use_rssi: bool = False) -> Tuple[Optional[Calibration], Optional[str]]:
+    """
+    Fit the per-AP models over the whole workspace.
+
+    Returns:
+        Tuple of (calibration, error_message)
+    """
+    try:
+        df = read_workspace_csvs(workspace_dir)
+        if df.empty or not {"scenario", "ap-ssid", "est._range(m)"} <= set(df.columns):
+            return None, f"No measurement data found in '{workspace_dir}'."
+
+        df = df.assign(est=pd.to_numeric(df["est._range(m)"], errors="coerce"), ap=df["ap-ssid"].astype(str))
+        references = []
+        for scenario_name, group in df.groupby("scenario", sort=False):
+            ref = _reference_ranges(scenario_name, group["ap"].unique(), workspace_dir)
+            references.append(group["ap"].map(ref))
+        df["reference"] = pd.concat(references)
+        if use_rssi:
+            df["rssi"] = pd.to_numeric(df.get("rssi(dbm)"), errors="coerce")
+            # 0 dBm marks a missing reading in the logs
+            df.loc[df["rssi"] >= 0, "rssi"] = np.nan
+        columns = ["est", "reference"] + (["rssi"] if use_rssi else [])
+        df = df.dropna(subset=columns)
+        df = df[df["est"] > 0]
+        if df.empty:
+            return None, "No measurements with a known reference range (scenarios need a tag position)."
+
+        groups, aps = pd.factorize(df["ap"])
+        count = len(aps)
+        y = df["est"].to_numpy(dtype=float)
+        reference = df["reference"].to_numpy(dtype=float)
+        design = [reference, np.ones_like(reference)]
+        rssi_center = 0.0
+        if use_rssi:
+            rssi = df["rssi"].to_numpy(dtype=float)
+            rssi_center = float(rssi.mean())
+            design.append(rssi - rssi_center)
+        X = np.column_stack(design)
+        params = X.shape[1]
+
+        # grouped normal equations: one (p x p) system per AP
+        normal_matrix = np.zeros((count, params, params))
+        normal_rhs = np.zeros((count, params))
+        np.add.at(normal_matrix, groups, X[:, :, None] * X[:, None, :])
+        np.add.at(normal_rhs, groups, X * y[:, None])
+        samples = np.bincount(groups, minlength=count)
+
+        solution = np.full((count, params), np.nan)
+        regular = (samples >= params) & (np.linalg.cond(normal_matrix) < 1e10)
+        if regular.any():
+            solution[regular] = np.linalg.solve(normal_matrix[regular], normal_rhs[regular][:, :, None])[:, :, 0]
+
+        # offset-only model where the scale is not identifiable (one reference distance) or implausible
+        offset_only = ~regular | ~(solution[:, 0] >= MIN_SCALE)
+        mean_bias = np.bincount(groups, weights=y - reference, minlength=count) / np.maximum(samples, 1)
+
+        models = {}
+        for i, ap in enumerate(aps):
+            if offset_only[i]:
+                models[str(ap)] = (1.0, float(mean_bias[i]), 0.0)
+            else:
+                rssi_coef = float(solution[i, 2]) if use_rssi else 0.0
+                models[str(ap)] = (float(solution[i, 0]), float(solution[i, 1]), rssi_coef)
+            _LOG.info("Calibration %s: scale=%.3f offset=%.3f rssi=%.4f (%d samples)",
+                      ap, *models[str(ap)], samples[i])
+
+        return Calibration(models, use_rssi, workspace_fingerprint(workspace_dir), rssi_center), None
+
+    except Exception as e:
+        _LOG.exception("Error fitting calibration: %s", e)
+        return None, f"Error fitting calibration: {str(e)}"
+
+
+def load_or_fit_calibration(workspace_dir: str = "workspace", use_rssi: bool = False) -> Tuple[Optional[Calibration], Optional[str]]:
+    """
+    Return the calibration of the current workspace state, fitting it only if the
+    workspace changed since the cached fit.
+
+    Returns:
+        Tuple of (calibration, error_message)
+    """
+    fingerprint = workspace_fingerprint(workspace_dir)
+    key = (os.path.abspath(workspace_dir), use_rssi)
+    cached = _memory_cache.get(key)
+    if cached is not None and cached.fingerprint == fingerprint:
+        return cached, None
+
+    cache_path = Path(workspace_dir) / CACHE_FILE
+    try:
+        with cache_path.open("r") as f:
+            entries = json.load(f)
+        if entries.get("version") != CACHE_VERSION:
+            entries = {"version": CACHE_VERSION}
+        entry = entries.get(CALIBRATION_MODES[use_rssi])
+        if entry is not None and entry.get("fingerprint") == fingerprint:
+            calibration = Calibration.from_dict(entry)
+            _memory_cache[key] = calibration
+            return calibration, None
+    except FileNotFoundError:
+        entries = {"version": CACHE_VERSION}
+    except Exception as e:
+        _LOG.warning("Ignoring unreadable calibration cache %s: %s", cache_path, e)
+        entries = {"version": CACHE_VERSION}
+
+    calibration, error = fit_calibration(workspace_dir, use_rssi)
+    if error:
+        return None, error
+    # keep the fingerprint taken before reading: files changed during the fit trigger another one
+    calibration.fingerprint = fingerprint
+    _memory_cache[key] = calibration
+    entries[calibration.mode] = calibration.to_dict()
+    try:
+        with cache_path.open("w") as f:
+            json.dump(entries, f, indent=2)
+    except OSError as e:
+        _LOG.warning("Could not write calibration cache %s: %s", cache_path, e)
+    return calibration, None
@@ -1,7 +1,11 @@
+from collections import OrderedDict
 from pathlib import Path
+import csv
+import hashlib
+import heapq
 import io
 import pandas as pd
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
 
 _LOG = logging.getLogger(__name__)
@@ -15,7 +19,13 @@ def _read_csv_with_hash_header(path: Path) -> pd.DataFrame:
     Read a CSV file that may contain lines starting with '//' (comments)
     and a header line starting with '#'. Returns a pandas DataFrame.
     """
-    text = path.read_text(encoding="utf-8")
+    return _parse_csv_text(path.read_text(encoding="utf-8"))
+
+def _parse_csv_text(text: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Parse rtt-log CSV text (see `_read_csv_with_hash_header`). If columns is
+    given, the text holds data rows only, e.g. lines appended to a known file.
+    """
     lines: List[str] = text.splitlines()
     cleaned_lines: List[str] = []
     header_found = False
@@ -41,12 +51,108 @@ def _read_csv_with_hash_header(path: Path) -> pd.DataFrame:
 
     csv_text = "\n".join(cleaned_lines)
     if not csv_text.strip():
-        return pd.DataFrame()
+        return pd.DataFrame(columns=columns) if columns else pd.DataFrame()
+
+    if columns is not None:
+        return pd.read_csv(io.StringIO(csv_text), sep=",", skipinitialspace=True, header=None, names=columns)
 
     df = pd.read_csv(io.StringIO(csv_text), sep=",", skipinitialspace=True)
     df.columns = [_clean_col(c) for c in df.columns]
     return df
 
+# path -> (size, mtime_ns, consumed_bytes, sha1 of the consumed bytes, columns, frame) of what
+# has been parsed so far, least recently used first; at most CSV_CACHE_SIZE files are kept
+_CSV_CACHE: "OrderedDict[str, Tuple[int, int, int, object, Optional[List[str]], pd.DataFrame]]" = OrderedDict()
+CSV_CACHE_SIZE = 256
+_DIGEST_CHUNK = 1 << 20
+
+def _prefix_digest(f, length: int) -> bytes:
+    """SHA-1 of the first length bytes of the open binary file f (read in chunks)."""
+    digest = hashlib.sha1()
+    f.seek(0)
+    remaining = length
+    while remaining > 0:
+        chunk = f.read(min(_DIGEST_CHUNK, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest.digest()
+
+def read_csv_incremental(path: Path) -> pd.DataFrame:
+    """
+    Read an rtt-log CSV like `_read_csv_with_hash_header`, parsing only the bytes
+    appended since the previous call for the same file.
+
+    Parsed rows are cached per file and keyed by size and mtime. When the file
+    changed, the bytes parsed before are compared with a checksum; if they are
+    unchanged only the appended bytes are parsed (the loggers only append),
+    otherwise (edited, rewritten or truncated) the file is read again from
+    scratch. Only complete, newline-terminated lines are consumed, so a row that
+    is still being written is picked up on the next call. The cache holds the
+    CSV_CACHE_SIZE most recently read files.
+    """
+    path = Path(path)
+    st = path.stat()
+    key = str(path)
+    cached = _CSV_CACHE.get(key)
+    if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+        _CSV_CACHE.move_to_end(key)
+        return cached[5]
+
+    with path.open("rb") as f:
+        if (cached is not None and cached[4] is not None and st.st_size >= cached[2]
+                and _prefix_digest(f, cached[2]) == cached[3].digest()):
+            # the digest check left f right after the consumed bytes
+            consumed, digest, columns, frame = cached[2], cached[3].copy(), cached[4], cached[5]
+            data = f.read()
+        else:
+            consumed, digest, columns, frame = 0, hashlib.sha1(), None, pd.DataFrame()
+            f.seek(0)
+            data = f.read()
+
+    complete = data[:data.rfind(b"\n") + 1]
+    if complete:
+        new_rows = _parse_csv_text(complete.decode("utf-8"), columns)
+        if columns is None:
+            columns = list(new_rows.columns) or None
+        frame = new_rows if frame.empty else pd.concat([frame, new_rows], ignore_index=True)
+        consumed += len(complete)
+        digest.update(complete)
+
+    _CSV_CACHE[key] = (st.st_size, st.st_mtime_ns, consumed, digest, columns, frame)
+    _CSV_CACHE.move_to_end(key)
+    while len(_CSV_CACHE) > CSV_CACHE_SIZE:
+        _CSV_CACHE.popitem(last=False)
+    return frame
+
+def read_scenario_csvs(scenario_name: str, workspace_dir: str = "workspace") -> pd.DataFrame:
+    """
+    Read the CSV measurement files of a single scenario folder, annotated like
+    `read_workspace_csvs`. Unchanged files are served from the incremental cache.
+
+    Returns a concatenated pandas.DataFrame (empty DataFrame if none).
+    """
+    scenario_dir = Path(workspace_dir) / scenario_name
+    if not scenario_dir.is_dir():
+        return pd.DataFrame()
+
+    dfs = []
+    for csv_path in sorted(scenario_dir.glob("*.csv")):
+        try:
+            df = read_csv_incremental(csv_path)
+            if df.empty:
+                continue
+            # assign() copies, the cached frame must stay unannotated
+            df = df.assign(scenario=scenario_dir.name, source_file=str(csv_path))
+            dfs.append(df)
+        except Exception as e:
+            _LOG.warning("Failed to read %s: %s", csv_path, e)
+
+    if not dfs:
+        return pd.DataFrame()
+    return pd.concat(dfs, ignore_index=True)
+
 def read_workspace_csvs(workspace_dir: str = "workspace") -> pd.DataFrame:
     """
     Recursively read CSV measurement files under workspace_dir.
@@ -66,11 +172,11 @@ def read_workspace_csvs(workspace_dir: str = "workspace") -> pd.DataFrame:
             continue
         for csv_path in scenario_dir.glob("*.csv"):
             try:
-                df = _read_csv_with_hash_header(csv_path)
+                df = read_csv_incremental(csv_path)
                 if df.empty:
                     continue
-                df["scenario"] = scenario_dir.name
-                df["source_file"] = str(csv_path)
+                # assign() copies, the cached frame must stay unannotated
+                df = df.assign(scenario=scenario_dir.name, source_file=str(csv_path))
                 dfs.append(df)
             except Exception as e:
                 # keep function robust: skip problematic files but log
@@ -79,4 +185,68 @@ def read_workspace_csvs(workspace_dir: str = "workspace") -> pd.DataFrame:
     if not dfs:
         return pd.DataFrame()
     return pd.concat(dfs, ignore_index=True)
-# ...existing code...
\ No newline at end of file
+
+
+def _parse_value(value: str):
+    """Convert a raw CSV cell to int or float where possible, else keep the stripped string."""
+    s = value.strip()
+    try:
+        return int(s)
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        return s
+
+
+def iter_csv_rows(path: Path) -> Iterator[Dict[str, object]]:
+    """
+    Lazily yield the rows of a single rtt-log CSV as dicts keyed by the
+    normalized column names (see `_clean_col`).
+
+    Uses the same conventions as `_read_csv_with_hash_header` ('//' comment
+    lines, '#'-prefixed header) but never holds more than one row in memory.
+    """
+    path = Path(path)
+    with path.open("r", encoding="utf-8", newline="") as f:
+        columns: List[str] = []
+        for ln in f:
+            s = ln.strip()
+            if not s or s.startswith("//"):
+                continue
+            if not columns:
+                # header line: either '#'-prefixed or the first non-comment line
+                header = next(csv.reader([s.lstrip("#").strip()], skipinitialspace=True))
+                columns = [_clean_col(c) for c in header]
+                continue
+            values = next(csv.reader([ln], skipinitialspace=True))
+            yield {col: _parse_value(val) for col, val in zip(columns, values)}
+
+
+def _timed_rows(path: Path, scenario_name: str, time_col: str) -> Iterator[Dict[str, object]]:
+    """Annotate rows like `read_workspace_csvs` and drop rows without a numeric timestamp."""
+    for row in iter_csv_rows(path):
+        t = row.get(time_col)
+        if not isinstance(t, (int, float)):
+            _LOG.debug("Skipping row without numeric '%s' in %s", time_col, path)
+            continue
+        row["scenario"] = scenario_name
+        row["source_file"] = str(path)
+        yield row
+
+
+def merge_scenario_logs(scenario_name: str, workspace_dir: str = "workspace", time_col: str = "time(ms)") -> Iterator[Dict[str, object]]:
+    """
+    Yield all measurement rows of a scenario as a single stream ordered by `time_col`.
+
+    Each rtt-log CSV in workspace/<scenario>/ holds the ranges to one AP and is
+    already ordered by time, so the files are combined with a lazy k-way merge
+    (O(n log k), one buffered row per file) instead of concatenating and sorting.
+    """
+    scenario_dir = Path(workspace_dir) / scenario_name
+    if not scenario_dir.is_dir():
+        raise FileNotFoundError(f"scenario directory not found: {scenario_dir}")
+
+    streams = [_timed_rows(p, scenario_name, time_col) for p in sorted(scenario_dir.glob("*.csv"))]
+    return heapq.merge(*streams, key=lambda row: row[time_col])
@@ -12,6 +12,17 @@ import logging
 _LOG = logging.getLogger(__name__)
 
 
+def _read_scenario_json(scenario_name: str, workspace_dir: str = "workspace"):
+    """Return the parsed scenario.json of a scenario, or None if it does not exist."""
+    scenario_path = os.path.join(workspace_dir, scenario_name, "scenario.json")
+    if not os.path.exists(scenario_path):
+        _LOG.warning("Scenario configuration file not found: %s", scenario_path)
+        return None
+
+    with open(scenario_path, 'r') as f:
+        return json.load(f)
+
+
 def load_scenario_from_json(scenario_obj, scenario_name: str, workspace_dir: str = "workspace") -> bool:
     """
     Load scenario configuration from JSON file and update the scenario object.
@@ -26,14 +37,10 @@ def load_scenario_from_json(scenario_obj, scenario_name: str, workspace_dir: str
     """
     try:
         # Load scenario configuration from JSON
-        scenario_path = os.path.join(workspace_dir, scenario_name, "scenario.json")
-        if not os.path.exists(scenario_path):
-            _LOG.warning("Scenario configuration file not found: %s", scenario_path)
+        data = _read_scenario_json(scenario_name, workspace_dir)
+        if data is None:
             return False
         
-        with open(scenario_path, 'r') as f:
-            data = json.load(f)
-        
         # Clear existing stations and reset measurements before creating Tag objects
         scenario_obj.stations = []
         # Initialize a fresh Measurements container so Tags created below
@@ -63,3 +70,63 @@ def load_scenario_from_json(scenario_obj, scenario_name: str, workspace_dir: str
     except Exception as e:
         _LOG.exception("Error loading scenario from JSON: %s", e)
         return False
+
+
+def update_scenario_from_json(scenario_obj, scenario_name: str, workspace_dir: str = "workspace") -> bool:
+    """
+    Apply an edited scenario.json to an already loaded scenario in place.
+
+    Existing stations are matched by name and keep their identity (anchors are
+    moved, measurements are kept); new stations are added and stations missing
+    from the JSON are removed.
+
+    Args:
+        scenario_obj: The scenario object to update
+        scenario_name: Name of the scenario
+        workspace_dir: Directory containing scenario files
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        data = _read_scenario_json(scenario_name, workspace_dir)
+        if data is None:
+            return False
+
+        existing = {s.name: s for s in scenario_obj.stations}
+        keep = set()
+        for st in data.get('stations', []):
+            name = st['name']
+            typ = st['type']
+            current = existing.get(name)
+            if typ == 'ANCHOR':
+                if isinstance(current, Anchor):
+                    current.update_position(st['position'])
+                else:
+                    if current is not None:
+                        scenario_obj.remove_station(current)
+                    current = Anchor(st['position'], name, scenario_obj)
+                    scenario_obj.stations.append(current)
+            elif typ == 'TAG':
+                pos = st.get('position', None)
+                if pos is None:
+                    scenario_obj.tag_truth = None
+                elif scenario_obj.tag_truth is not None:
+                    scenario_obj.tag_truth.update_position(pos)
+                else:
+                    scenario_obj.tag_truth = Anchor(pos, 'TAG_TRUTH', scenario_obj)
+                if not isinstance(current, Tag):
+                    if current is not None:
+                        scenario_obj.remove_station(current)
+                    current = Tag(scenario_obj, name)
+                    scenario_obj.stations.append(current)
+            keep.add(current)
+
+        for station in [s for s in scenario_obj.stations if s not in keep]:
+            scenario_obj.remove_station(station)
+
+        return True
+
+    except Exception as e:
+        _LOG.exception("Error updating scenario from JSON: %s", e)
+        return False
@@ -4,14 +4,17 @@ Handles importing measurement data from CSV files and scenario configurations fr
 Pure data processing - no UI components.
 """
 
+import numpy as np
 import pandas as pd
 from typing import List, Optional, Tuple
 import logging
 
 _LOG = logging.getLogger(__name__)
 
-from data.import_measurements import read_workspace_csvs
-from data.import_scenario import load_scenario_from_json
+from data.calibration import load_or_fit_calibration
+from data.import_measurements import read_workspace_csvs, read_scenario_csvs, merge_scenario_logs
+from data.import_scenario import load_scenario_from_json, update_scenario_from_json
+from simulation import geometry
 
 
 def get_available_scenarios(workspace_dir: str = "workspace") -> Tuple[List[str], Optional[str]]:
@@ -53,12 +56,8 @@ def get_scenario_data(scenario_name: str, workspace_dir: str = "workspace") -> T
         Tuple of (dataframe, error_message)
     """
     try:
-        df = read_workspace_csvs(workspace_dir)
-        
-        if df.empty:
-            return None, f"No CSV files found in '{workspace_dir}'"
-        
-        scenario_data = df[df['scenario'] == scenario_name].copy()
+        # only the files of this scenario are read (cached per file, see read_csv_incremental)
+        scenario_data = read_scenario_csvs(scenario_name, workspace_dir)
         
         if scenario_data.empty:
             return None, f"No measurement data found for scenario '{scenario_name}'"
@@ -69,7 +68,8 @@ def get_scenario_data(scenario_name: str, workspace_dir: str = "workspace") -> T
         return None, f"Error loading scenario data: {str(e)}"
 
 
-def import_scenario_data(scenario_obj, scenario_name: str, workspace_dir: str = "workspace", agg_method: str = "lowest") -> Tuple[bool, str]:
+def import_scenario_data(scenario_obj, scenario_name: str, workspace_dir: str = "workspace", agg_method: str = "lowest",
+                         robust: bool = False, calibration: Optional[str] = None) -> Tuple[bool, str]:
     """
     Import CSV data for a scenario into the scenario object.
     
@@ -77,6 +77,9 @@ def import_scenario_data(scenario_obj, scenario_name: str, workspace_dir: str =
         scenario_obj: The scenario object to update
         scenario_name: Name of the scenario to import
         workspace_dir: Directory containing CSV files
+        robust: Reject outlier ranges (RANSAC) on import and when positioning tags
+        calibration: Correct the ranges with the workspace's per-AP calibration
+            ('linear' or 'rssi', see data.calibration); None imports raw ranges
         
     Returns:
         Tuple of (success, message)
@@ -91,19 +94,100 @@ def import_scenario_data(scenario_obj, scenario_name: str, workspace_dir: str =
         if error:
             return False, error
 
-        # Process the data (aggregate per AP based on agg_method)
-        processed_count = _process_measurement_data(scenario_obj, scenario_data, scenario_name, agg_method=agg_method)
+        fitted = None
+        if calibration:
+            fitted, error = load_or_fit_calibration(workspace_dir, use_rssi=calibration == "rssi")
+            if error:
+                return False, error
+            scenario_data = fitted.correct_frame(scenario_data)
 
-        return True, f"Successfully imported {processed_count} measurements (agg={agg_method}) from scenario '{scenario_name}'."
+        # Process the data (aggregate per AP based on agg_method)
+        processed_count, rejected = _process_measurement_data(scenario_obj, scenario_data, scenario_name,
+                                                              agg_method=agg_method, robust=robust)
+        scenario_obj.agg_method = agg_method
+        scenario_obj.robust_positioning = robust
+        scenario_obj.calibration = fitted
+
+        message = f"Successfully imported {processed_count} measurements (agg={agg_method}) from scenario '{scenario_name}'."
+        if fitted is not None:
+            message += f" Ranges calibrated ({fitted.mode})."
+        if rejected:
+            message += f" Rejected outlier ranges: {', '.join(rejected)}."
+        return True, message
 
     except Exception as e:
         return False, f"An error occurred while importing CSV data: {str(e)}"
 
 
-def import_scenario(scenario_name: str, workspace_dir: str = "workspace", agg_method: str = "lowest") -> Tuple[bool, str, Optional[object]]:
+def refresh_scenario_data(scenario_obj, scenario_name: str, workspace_dir: str = "workspace", reload_config: bool = False) -> Tuple[bool, str]:
+    """
+    Re-ingest an already imported scenario in place after its workspace files changed.
+
+    The scenario keeps its station objects and its Measurements container, so views
+    holding references to them stay valid. Only changed CSV content is parsed again.
+
+    Args:
+        scenario_obj: The imported scenario to update
+        scenario_name: Name of the scenario folder in the workspace
+        workspace_dir: Directory containing CSV files
+        reload_config: Also apply edits of the scenario.json (station positions)
+
+    Returns:
+        Tuple of (success, message)
+    """
+    try:
+        if reload_config and not update_scenario_from_json(scenario_obj, scenario_name, workspace_dir):
+            return False, f"Failed to reload scenario configuration for '{scenario_name}'"
+
+        scenario_data, error = get_scenario_data(scenario_name, workspace_dir)
+        if error:
+            return False, error
+
+        if scenario_obj.calibration is not None:
+            # refits only if the workspace changed since the calibration was fitted
+            fitted, error = load_or_fit_calibration(workspace_dir, use_rssi=scenario_obj.calibration.use_rssi)
+            if error:
+                return False, error
+            scenario_obj.calibration = fitted
+            scenario_data = fitted.correct_frame(scenario_data)
+
+        agg_method = scenario_obj.agg_method or "lowest"
+        scenario_obj.measurements.clear_unused(scenario_obj.stations)
+        processed_count, rejected = _process_measurement_data(scenario_obj, scenario_data, scenario_name, agg_method=agg_method,
+                                                              robust=scenario_obj.robust_positioning)
+
+        message = f"Re-imported {processed_count} measurements (agg={agg_method}) for scenario '{scenario_name}'."
+        if rejected:
+            message += f" Rejected outlier ranges: {', '.join(rejected)}."
+
+        if scenario_obj.track is not None and scenario_obj.track_options:
+            # the drawn track must follow the ranges; recompute it with the settings of the import
+            track, error = compute_scenario_track(scenario_obj, scenario_name, workspace_dir=workspace_dir,
+                                                  agg_method=agg_method, robust=scenario_obj.robust_positioning,
+                                                  **scenario_obj.track_options)
+            if error:
+                message += f" Track not updated: {error}"
+            else:
+                message += f" Recomputed the track ({len(track)} positions)."
+        return True, message
+
+    except Exception as e:
+        return False, f"An error occurred while re-importing CSV data: {str(e)}"
+
+
+def import_scenario(scenario_name: str, workspace_dir: str = "workspace", agg_method: str = "lowest",
+                    window_ms: Optional[float] = None, step_ms: Optional[float] = None,
+                    max_age_ms: Optional[float] = None, robust: bool = False,
+                    calibration: Optional[str] = None) -> Tuple[bool, str, Optional[object]]:
     """
     Create a new Scenario instance, populate it from workspace data, and return it.
 
+    If window_ms is given, a time-windowed position track is computed as well
+    (see `compute_scenario_track`) and stored on the scenario. With robust,
+    outlier ranges are rejected by RANSAC both on import and in the track.
+    With calibration ('linear' or 'rssi'), all ranges are corrected by the
+    per-AP calibration of the workspace, which is fitted once and cached.
+
     Returns: (success: bool, message: str, scenario: Scenario|None)
     """
     try:
@@ -112,12 +196,21 @@ def import_scenario(scenario_name: str, workspace_dir: str = "workspace", agg_me
         from simulation.scenario import Scenario as ScenarioClass
 
         new_scenario = ScenarioClass(name=scenario_name)
-        ok, msg = import_scenario_data(new_scenario, scenario_name, workspace_dir=workspace_dir, agg_method=agg_method)
+        ok, msg = import_scenario_data(new_scenario, scenario_name, workspace_dir=workspace_dir, agg_method=agg_method,
+                                       robust=robust, calibration=calibration)
         if ok:
             try:
                 new_scenario.name = scenario_name
             except Exception:
                 pass
+            if window_ms:
+                track, error = compute_scenario_track(new_scenario, scenario_name, workspace_dir=workspace_dir,
+                                                      agg_method=agg_method, window_ms=window_ms, step_ms=step_ms,
+                                                      max_age_ms=max_age_ms, robust=robust)
+                if error:
+                    msg = f"{msg} Track not computed: {error}"
+                else:
+                    msg = f"{msg} Computed a track of {len(track)} positions ({window_ms:g} ms windows)."
             return True, msg, new_scenario
         else:
             return False, msg, None
@@ -125,6 +218,142 @@ def import_scenario(scenario_name: str, workspace_dir: str = "workspace", agg_me
         return False, f"Importer raised exception: {e}", None
 
 
+def compute_scenario_track(scenario_obj, scenario_name: str, workspace_dir: str = "workspace", agg_method: str = "lowest",
+                           window_ms: float = 5000.0, step_ms: Optional[float] = None,
+                           max_age_ms: Optional[float] = None, robust: bool = False) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """
+    Compute a position track for a loaded scenario by sliding a time window over its logs.
+
+    The windows [t, t + window_ms) start on a grid with spacing step_ms (defaults
+    to window_ms, i.e. consecutive epochs). All windows are aggregated per AP with
+    agg_method at once and then solved in a single batched trilateration.
+
+    The rtt-log files of a scenario are usually recorded one AP after another, so
+    an AP's latest aggregate is carried forward into later windows without samples
+    until it is older than max_age_ms. Ranges are corrected by the scenario's
+    calibration, if it has one.
+
+    Args:
+        scenario_obj: Scenario whose stations were loaded from the scenario JSON
+        scenario_name: Name of the scenario folder in the workspace
+        workspace_dir: Directory containing CSV files
+        agg_method: Aggregation per AP and window ('newest', 'lowest', 'mean', 'median')
+        window_ms: Window length in milliseconds
+        step_ms: Spacing of window starts in milliseconds
+        max_age_ms: Maximum age of a carried-forward range (None: no limit)
+        robust: Solve every window with RANSAC; rejected ranges do not count as used
+
+    Returns:
+        Tuple of (track, error_message). The track has the columns time_ms (window
+        end), x, y, gdop, error (distance to the tag truth) and anchors (ranges used)
+        and is also stored as scenario_obj.track, the window settings as
+        scenario_obj.track_options.
+    """
+    try:
+        if not window_ms or window_ms <= 0:
+            return None, "Track window must be positive."
+        if not step_ms or step_ms <= 0:
+            step_ms = window_ms
+
+        anchors = scenario_obj.get_anchor_list()
+        if not anchors:
+            return None, f"No anchors defined for scenario '{scenario_name}'"
+
+        # merged logs are already time-ordered, so every AP group below is sorted as well
+        rows = pd.DataFrame.from_records(merge_scenario_logs(scenario_name, workspace_dir))
+        if rows.empty or not {'time(ms)', 'ap-ssid', 'est._range(m)'} <= set(rows.columns):
+            return None, f"No measurement data found for scenario '{scenario_name}'"
+        if scenario_obj.calibration is not None:
+            rows = scenario_obj.calibration.correct_frame(rows)
+        rows['est_range'] = pd.to_numeric(rows['est._range(m)'], errors='coerce')
+        rows = rows[rows['est_range'] > 0]
+        if rows.empty:
+            return None, f"No valid measurements for scenario '{scenario_name}'"
+
+        agg_method = (agg_method or "newest").lower()
+        if agg_method not in ("newest", "lowest", "mean", "median"):
+            _LOG.warning("Unknown aggregation method '%s', defaulting to 'newest'.", agg_method)
+            agg_method = "newest"
+
+        times = rows['time(ms)'].to_numpy(dtype=float)
+        window_count = int((times.max() - times.min()) // step_ms) + 1
+        starts = times.min() + step_ms * np.arange(window_count)
+
+        distances = np.full((window_count, len(anchors)), np.nan)
+        for ap_ssid, group in rows.groupby('ap-ssid', sort=False):
+            anchor = _match_anchor(anchors, ap_ssid)
+            if anchor is None:
+                _LOG.warning("No anchor matches AP '%s' in scenario '%s', skipping it.", ap_ssid, scenario_name)
+                continue
+            column = anchors.index(anchor)
+            values = _window_aggregate(group['time(ms)'].to_numpy(dtype=float), group['est_range'].to_numpy(dtype=float),
+                                       starts, window_ms, agg_method)
+            # several APs may match the same anchor; keep the first one per window
+            distances[:, column] = np.where(np.isnan(distances[:, column]), values, distances[:, column])
+
+        # carry the latest aggregate of every anchor forward into empty windows
+        rows_idx = np.arange(window_count)[:, None]
+        source = np.maximum.accumulate(np.where(np.isfinite(distances), rows_idx, -1), axis=0)
+        distances = np.where(source >= 0, distances[np.maximum(source, 0), np.arange(len(anchors))], np.nan)
+        if max_age_ms is not None:
+            distances[starts[:, None] - starts[np.maximum(source, 0)] > max_age_ms] = np.nan
+
+        anchor_positions = scenario_obj.anchor_positions()
+        if robust:
+            positions, valid = geometry.ransac_trilateration_batch(anchor_positions, distances)
+        else:
+            valid = np.isfinite(distances)
+            positions = geometry.trilateration_batch(anchor_positions, distances)
+        gdop = geometry.dilution_of_precision_batch(anchor_positions, positions, valid)
+        if scenario_obj.tag_truth is not None:
+            error = np.linalg.norm(positions - scenario_obj.tag_truth.position(), axis=1)
+        else:
+            error = np.full(window_count, np.nan)
+
+        track = pd.DataFrame({
+            'time_ms': starts + window_ms,
+            'x': positions[:, 0],
+            'y': positions[:, 1],
+            'gdop': gdop,
+            'error': error,
+            'anchors': valid.sum(axis=1),
+        })
+        scenario_obj.track = track
+        scenario_obj.track_options = {'window_ms': window_ms, 'step_ms': step_ms, 'max_age_ms': max_age_ms}
+        _LOG.info("Computed track with %d windows (method=%s) for scenario '%s'", window_count, agg_method, scenario_name)
+        return track, None
+
+    except Exception as e:
+        return None, f"Error computing track: {str(e)}"
+
+
+def _window_aggregate(times: np.ndarray, ranges: np.ndarray, starts: np.ndarray, window_ms: float, agg_method: str) -> np.ndarray:
+    """
+    Aggregate one AP's time-ordered ranges over all windows [start, start + window_ms) at once.
+
+    Returns one value per window, NaN where a window holds no sample.
+    """
+    lo = np.searchsorted(times, starts, side='left')
+    hi = np.searchsorted(times, starts + window_ms, side='left')
+    filled = hi > lo
+    result = np.full(len(starts), np.nan)
+    if not filled.any():
+        return result
+    lo, hi = lo[filled], hi[filled]
+
+    if agg_method == "newest":
+        result[filled] = ranges[hi - 1]
+        return result
+
+    # pad every window to the widest one so a single nan-aware reduction covers all windows
+    index = lo[:, None] + np.arange((hi - lo).max())[None, :]
+    padded = np.where(index < hi[:, None], ranges[np.minimum(index, len(ranges) - 1)], np.nan)
+    reducer = {"lowest": np.nanmin, "mean": np.nanmean, "median": np.nanmedian}[agg_method]
+    with np.errstate(invalid='ignore'):
+        result[filled] = reducer(padded, axis=1)
+    return result
+
+
 def validate_scenario_for_import(scenario_obj) -> Tuple[bool, str]:
     """
     Validate that a scenario object is ready for import.
@@ -150,7 +379,81 @@ def validate_scenario_for_import(scenario_obj) -> Tuple[bool, str]:
     return True, ""
 
 
-def _process_measurement_data(scenario_obj, scenario_data: pd.DataFrame, scenario_name: str, agg_method: str = "lowest"):
+def resolve_log_rows(scenario_obj, rows) -> List[Tuple[object, object, float]]:
+    """
+    Map streamed rtt-log rows (see `data.tail_streamer`) onto the stations of a scenario.
+
+    Each valid row becomes a range between its AP's anchor and the first tag of
+    the scenario, corrected by the scenario's calibration if it has one. The
+    scenario is only read, so this may run on a streaming thread.
+
+    Args:
+        scenario_obj: The scenario the rows belong to
+        rows: Row dicts keyed by normalized column names
+
+    Returns:
+        List of (anchor, tag, estimated_range) tuples in row order
+    """
+    existing_anchors = scenario_obj.get_anchor_list()
+    existing_tags = scenario_obj.get_tag_list()
+    if not existing_tags or not existing_anchors:
+        return []
+    target_tag = existing_tags[0]
+    calibration = scenario_obj.calibration
+
+    ranges = []
+    for row in rows:
+        estimated_range = row.get('est._range(m)')
+        if not isinstance(estimated_range, (int, float)) or estimated_range <= 0 or 'ap-ssid' not in row:
+            continue
+        if calibration is not None:
+            estimated_range = calibration.correct(row['ap-ssid'], estimated_range, row.get('rssi(dbm)'))
+            if estimated_range <= 0:
+                continue
+        anchor = _match_anchor(existing_anchors, row['ap-ssid'])
+        if anchor is not None:
+            ranges.append((anchor, target_tag, float(estimated_range)))
+    return ranges
+
+
+def apply_log_rows(scenario_obj, rows) -> int:
+    """
+    Apply streamed rtt-log rows to a scenario; the newest sample per AP wins.
+
+    Returns:
+        Number of rows applied
+    """
+    ranges = resolve_log_rows(scenario_obj, rows)
+    scenario_obj.measurements.update_relations({frozenset([anchor, tag]): distance for anchor, tag, distance in ranges})
+    return len(ranges)
+
+
+def _match_anchor(existing_anchors, ap_ssid):
+    """
+    Find the anchor station for an AP SSID by name similarity.
+
+    Import, streaming and calibration all resolve APs through here, so an AP is
+    attributed to the same anchor (or skipped) everywhere.
+
+    Args:
+        existing_anchors: Anchors of the scenario
+        ap_ssid: Value of the 'ap-ssid' column
+
+    Returns:
+        The matching anchor, or None if no anchor name matches
+    """
+    ap_name = ap_ssid if isinstance(ap_ssid, str) else str(ap_ssid)
+    for anchor in existing_anchors:
+        try:
+            if ap_name.lower() in anchor.name.lower() or anchor.name.lower() in ap_name.lower():
+                return anchor
+        except Exception:
+            continue
+    return None
+
+
+def _process_measurement_data(scenario_obj, scenario_data: pd.DataFrame, scenario_name: str, agg_method: str = "lowest",
+                              robust: bool = False) -> Tuple[int, List[str]]:
     """
     Process the imported measurement data and update the scenario.
     
@@ -158,6 +461,10 @@ def _process_measurement_data(scenario_obj, scenario_data: pd.DataFrame, scenari
         scenario_obj: The scenario object to update
         scenario_data: DataFrame containing the measurement data for the scenario
         scenario_name: Name of the imported scenario
+        robust: Reject aggregated ranges that disagree with the RANSAC consensus
+
+    Returns:
+        Tuple of (number of measurements applied, ap-ssids of rejected ranges)
     """
     # Expected columns (mapped from CSV headers)
     # Based on the actual CSV format: time(ms), true_range(m), est._range(m), std_dev(m), ap-ssid
@@ -170,7 +477,7 @@ def _process_measurement_data(scenario_obj, scenario_data: pd.DataFrame, scenari
     existing_tags = scenario_obj.get_tag_list()
     if not existing_tags:
         _LOG.warning("No tags found in scenario configuration. Measurements require at least one tag.")
-        return
+        return 0, []
     
     target_tag = existing_tags[0]  # Use first tag from JSON configuration
     
@@ -180,7 +487,7 @@ def _process_measurement_data(scenario_obj, scenario_data: pd.DataFrame, scenari
     # Ensure the key columns exist
     if 'ap-ssid' not in scenario_data.columns or 'est._range(m)' not in scenario_data.columns:
         _LOG.warning("Input data missing required columns 'ap-ssid' or 'est._range(m)'.")
-        return 0
+        return 0, []
 
     # Prepare aggregation
     # Filter out invalid ranges
@@ -191,7 +498,7 @@ def _process_measurement_data(scenario_obj, scenario_data: pd.DataFrame, scenari
 
     if valid_df.empty:
         _LOG.info("No valid measurements to import for scenario '%s'", scenario_name)
-        return 0
+        return 0, []
 
     # Define aggregation function
     agg_method = (agg_method or "newest").lower()
@@ -223,34 +530,45 @@ def _process_measurement_data(scenario_obj, scenario_data: pd.DataFrame, scenari
         if 'est_range' in valid_df.columns and 'est._range(m)' in valid_df.columns:
             aggregated['est_range'] = aggregated.get('est_range') if 'est_range' in aggregated.columns else aggregated['est._range(m)']
 
-    # Iterate aggregated results and add measurements
+    # Resolve aggregated results to anchors
+    resolved = []
     for ap_ssid, row in aggregated.iterrows():
         try:
             estimated_range = float(row['est_range'])
 
-            # Find a matching anchor station (by name similarity or use first available)
-            ap_name = ap_ssid if isinstance(ap_ssid, str) else str(ap_ssid)
-            anchor_station = None
-            for anchor in existing_anchors:
-                try:
-                    if ap_name.lower() in anchor.name.lower() or anchor.name.lower() in ap_name.lower():
-                        anchor_station = anchor
-                        break
-                except Exception:
-                    continue
-
-            # If no matching anchor found, use the first available anchor
-            if not anchor_station and existing_anchors:
-                anchor_station = existing_anchors[0]
-
-            if anchor_station and anchor_station != target_tag:
-                station_pair = frozenset([anchor_station, target_tag])
-                scenario_obj.measurements.update_relation(station_pair, estimated_range)
-                processed_count += 1
+            anchor_station = _match_anchor(existing_anchors, ap_ssid)
+
+            if anchor_station is None:
+                _LOG.warning("No anchor matches AP '%s' in scenario '%s', skipping it.", ap_ssid, scenario_name)
+            elif anchor_station != target_tag:
+                resolved.append((ap_ssid, anchor_station, estimated_range))
 
         except Exception as e:
             _LOG.warning("Failed to process aggregated measurement for '%s': %s", ap_ssid, e)
             continue
+
+    rejected = []
+    if robust and resolved:
+        resolved, rejected = _reject_outliers(resolved)
+        if rejected:
+            _LOG.warning("Rejected outlier ranges for scenario '%s': %s", scenario_name, ", ".join(rejected))
+
+    # Add measurements
+    for ap_ssid, anchor_station, estimated_range in resolved:
+        station_pair = frozenset([anchor_station, target_tag])
+        scenario_obj.measurements.update_relation(station_pair, estimated_range)
+        processed_count += 1
+
     _LOG.info("Processed %d aggregated measurements (method=%s) for scenario '%s'", processed_count, agg_method, scenario_name)
     _LOG.info("Total measurement relations: %d", len(scenario_obj.measurements.relation))
-    return processed_count
\ No newline at end of file
+    return processed_count, rejected
+
+
+def _reject_outliers(resolved):
+    """Split (ap_ssid, anchor, range) tuples into RANSAC inliers and rejected ap-ssids."""
+    anchor_positions = np.array([anchor.position() for _, anchor, _ in resolved], dtype=float)
+    distances = np.array([estimated_range for _, _, estimated_range in resolved], dtype=float)
+    _, inliers = geometry.ransac_trilateration(anchor_positions, distances)
+    kept = [item for item, inlier in zip(resolved, inliers) if inlier]
+    rejected = [str(item[0]) for item, inlier in zip(resolved, inliers) if not inlier]
+    return kept, rejected
\ No newline at end of file
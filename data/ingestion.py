@@ -0,0 +1,287 @@
+"""
+Ingestion queue between streamers and the GUI.
+
+Streamers run on their own threads (SSE loop, MQTT network loop, CSV tail
+thread) and only push `RangeUpdate`s into an `IngestionQueue`. The GUI drains
+the queue on a timer and applies every pending update in one batch with
+`apply_updates`, so scenarios are only ever modified on the GUI thread and a
+burst of events results in a single refresh. The queue is bounded; what happens
+when producers are faster than the GUI is chosen by its policy. Optionally,
+anchor-tag ranges are grouped into per-tag epochs (see `simulation.epochs`).
+
+Usage:
+    queue = IngestionQueue()
+    queue.push(scenario, "7", "3", 110.5)            # any thread
+    changed = apply_updates(queue.drain())           # GUI thread
+"""
+
+from collections import OrderedDict, deque
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+import logging
+
+from simulation.epochs import Epoch, EpochCollector
+from simulation.station import Anchor, Station, Tag
+
+_LOG = logging.getLogger(__name__)
+
+
+class RangeUpdate:
+    """A range between two stations of a scenario; stations are objects or names."""
+
+    __slots__ = ("scenario", "source", "destination", "distance", "timestamp")
+
+    def __init__(self, scenario, source, destination, distance, timestamp=None):
+        self.scenario = scenario
+        self.source = source
+        self.destination = destination
+        self.distance = distance
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def __repr__(self):
+        return f"RangeUpdate(source={self.source}, destination={self.destination}, distance={self.distance})"
+
+
+class IngestionQueue:
+    """Bounded, thread-safe buffer of `RangeUpdate`s with a configurable overload policy.
+
+    Policies:
+        LATEST  keep only the newest range per station pair (latest value wins)
+        KEEP_N  keep the newest `capacity` updates, dropping the oldest
+        BLOCK   make the producer wait for free space (backpressure towards the
+                network); after `block_timeout` seconds the update is dropped
+
+    Producers on an asyncio event loop (the SSE service) must use `push_async` /
+    `push_many_async`: they wait for space without blocking the loop, so other
+    streams and cancellation keep running.
+    """
+
+    LATEST = "latest"
+    KEEP_N = "keep_n"
+    BLOCK = "block"
+    POLICIES = (LATEST, KEEP_N, BLOCK)
+
+    def __init__(self, policy: str = LATEST, capacity: int = 10000, block_timeout: float = 1.0):
+        self._cond = threading.Condition()
+        self._items = deque()
+        self._latest = OrderedDict()
+        self.policy = policy
+        self.capacity = capacity
+        self.block_timeout = block_timeout
+        self.received = 0
+        self.coalesced = 0
+        self.dropped = 0
+        # callables that see every pushed batch before coalescing (e.g. a stream recorder)
+        self._taps: List[Callable[[List[RangeUpdate]], None]] = []
+        # (loop, future) of async producers waiting for space with the BLOCK policy
+        self._waiters = []
+        self.configure(policy, capacity)
+
+    def add_tap(self, tap: Callable[[List[RangeUpdate]], None]):
+        """Call tap with every pushed batch, on the pushing thread and before any update is dropped."""
+        self._taps = self._taps + [tap]
+
+    def remove_tap(self, tap: Callable[[List[RangeUpdate]], None]):
+        self._taps = [t for t in self._taps if t is not tap]
+
+    def configure(self, policy: str, capacity: Optional[int] = None):
+        """Switch policy and/or capacity; pending updates are kept as far as they fit."""
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown ingestion policy: {policy}")
+        with self._cond:
+            pending = self._pending()
+            self.policy = policy
+            if capacity is not None:
+                self.capacity = max(1, int(capacity))
+            self._items.clear()
+            self._latest.clear()
+            for update in pending:
+                self._add(update)
+            self._cond.notify_all()
+            self._wake_waiters()
+
+    def _wake_waiters(self):
+        # caller holds the lock
+        waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_set_done, waiter)
+            except RuntimeError:
+                # the producer's loop is closed
+                pass
+
+    def _pending(self) -> List[RangeUpdate]:
+        return list(self._latest.values()) if self.policy == self.LATEST else list(self._items)
+
+    def _size(self) -> int:
+        return len(self._latest) if self.policy == self.LATEST else len(self._items)
+
+    def _add(self, update: RangeUpdate):
+        # caller holds the lock
+        if self.policy == self.LATEST:
+            key = (id(update.scenario), frozenset((update.source, update.destination)))
+            if key in self._latest:
+                del self._latest[key]
+                self.coalesced += 1
+            elif len(self._latest) >= self.capacity:
+                self._latest.popitem(last=False)
+                self.dropped += 1
+            self._latest[key] = update
+        else:
+            if len(self._items) >= self.capacity:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(update)
+
+    def push(self, scenario, source, destination, distance, timestamp=None):
+        """Queue one range; safe to call from any thread."""
+        self.push_many([RangeUpdate(scenario, source, destination, distance, timestamp)])
+
+    def _tap(self, updates: Iterable[RangeUpdate]) -> Iterable[RangeUpdate]:
+        taps = self._taps
+        if taps:
+            updates = list(updates)
+            for tap in taps:
+                try:
+                    tap(updates)
+                except Exception:
+                    _LOG.exception("Ingestion tap failed")
+        return updates
+
+    def push_many(self, updates: Iterable[RangeUpdate]):
+        """
+        Queue several ranges at once; safe to call from any thread except an event
+        loop's (with BLOCK it waits on the calling thread, see push_many_async).
+        """
+        updates = self._tap(updates)
+        with self._cond:
+            for update in updates:
+                self.received += 1
+                if self.policy == self.BLOCK:
+                    if not self._cond.wait_for(lambda: self._size() < self.capacity, self.block_timeout):
+                        self.dropped += 1
+                        continue
+                self._add(update)
+
+    async def push_async(self, scenario, source, destination, distance, timestamp=None):
+        """Queue one range from a coroutine, see push_many_async."""
+        await self.push_many_async([RangeUpdate(scenario, source, destination, distance, timestamp)])
+
+    async def push_many_async(self, updates: Iterable[RangeUpdate]):
+        """
+        Queue several ranges from a coroutine. With BLOCK, the coroutine (not the
+        event loop) waits for space, at most block_timeout seconds per update.
+        """
+        updates = self._tap(updates)
+        loop = asyncio.get_running_loop()
+        for update in updates:
+            deadline = loop.time() + self.block_timeout
+            with self._cond:
+                self.received += 1
+            while True:
+                with self._cond:
+                    if self.policy != self.BLOCK or self._size() < self.capacity:
+                        self._add(update)
+                        break
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+                remaining = deadline - loop.time()
+                if remaining > 0:
+                    await asyncio.wait([waiter], timeout=remaining)
+                if not waiter.done():
+                    with self._cond:
+                        self._waiters = [w for w in self._waiters if w[1] is not waiter]
+                    if loop.time() >= deadline:
+                        with self._cond:
+                            self.dropped += 1
+                        break
+
+    def drain(self) -> List[RangeUpdate]:
+        """Remove and return everything queued so far, oldest first."""
+        with self._cond:
+            items = self._pending()
+            self._items.clear()
+            self._latest.clear()
+            self._cond.notify_all()
+            self._wake_waiters()
+        return items
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since creation plus the number of pending updates."""
+        with self._cond:
+            return {
+                "received": self.received,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "pending": self._size(),
+            }
+
+    def __len__(self):
+        with self._cond:
+            return self._size()
+
+
+def _set_done(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _resolve(scenario, station):
+    if isinstance(station, Station):
+        return station
+    return scenario.get_station_by_name(str(station))
+
+
+def apply_updates(updates: Iterable[RangeUpdate], epochs: Optional[EpochCollector] = None) -> Set[object]:
+    """
+    Apply queued updates to their scenarios; the newest range per station pair wins.
+
+    With an `EpochCollector`, anchor-tag ranges are held back until their tag's
+    epoch is complete (or its window ran out) and then applied together; call
+    `apply_epochs(epochs.flush())` periodically to emit epochs that stay incomplete.
+
+    Must be called on the thread that owns the scenarios (the GUI thread).
+
+    Returns:
+        Set of scenarios whose measurements changed
+    """
+    batches = {}
+    finished = []
+    for update in updates:
+        scenario = update.scenario
+        source = _resolve(scenario, update.source)
+        destination = _resolve(scenario, update.destination)
+        if source is destination:
+            continue
+        if epochs is not None:
+            tag, anchor = (source, destination) if isinstance(source, Tag) else (destination, source)
+            if isinstance(tag, Tag) and isinstance(anchor, Anchor) and tag.scenario is scenario:
+                epoch = epochs.add(tag, anchor, update.distance, update.timestamp)
+                if epoch is not None:
+                    finished.append(epoch)
+                continue
+        batches.setdefault(scenario, {})[frozenset([source, destination])] = update.distance
+
+    for scenario, relations in batches.items():
+        scenario.measurements.update_relations(relations)
+    return set(batches) | apply_epochs(finished)
+
+
+def apply_epochs(epochs: Iterable[Epoch]) -> Set[object]:
+    """
+    Write finished epochs into their tags' measurements; stale anchors are removed.
+
+    Returns:
+        Set of scenarios whose measurements changed
+    """
+    changed = set()
+    for epoch in epochs:
+        tag = epoch.tag
+        measurements = tag.scenario.measurements
+        measurements.update_relations({frozenset([anchor, tag]): distance for anchor, distance in epoch.ranges.items()})
+        for anchor in epoch.stale:
+            measurements.remove_relation(frozenset([anchor, tag]))
+        changed.add(tag.scenario)
+    return changed
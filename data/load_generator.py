@@ -0,0 +1,342 @@
+"""
+Synthetic load generator for GDOP streaming.
+
+Emits range measurements between moving tags and fixed anchors in the format
+of data/example.stream, either as an SSE server on localhost or as MQTT
+messages (to a real broker or straight into an on_message callback). Ranges use
+the SandboxScenario noise model and a seeded random generator, so a run with
+the same parameters always produces the same events.
+
+Station ids are numeric: anchors are 1..anchors, tags follow. Use
+`LoadGenerator.scenario_json()` (or --scenario-json) to get a matching
+scenario.json so the ids resolve to stations in the app.
+
+Usage:
+    python -m data.load_generator --tags 4 --anchors 6 --rate 2000 --path circle
+    python -m data.load_generator --rate 0 --mqtt localhost:1883/gdop --mqtt-format binary
+
+With --rate 0 events are sent as fast as possible; simulated time (and so the
+tag motion) still advances by UNPACED_INTERVAL per event.
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from data.mqtt_decoders import encode_binary
+from simulation.sandbox_scenario import noisy_distance
+
+try:
+    import paho.mqtt.client as mqtt
+except Exception:
+    mqtt = None
+
+_LOG = logging.getLogger(__name__)
+
+PATHS = ("static", "circle", "line", "random_walk")
+
+
+class LoadGenerator:
+    # simulated seconds per event when unpaced (rate 0)
+    UNPACED_INTERVAL = 0.01
+
+    def __init__(self, tags: int = 1, anchors: int = 4, rate: float = 100.0, sigma: float = 0.5,
+                 path: str = "circle", area: Tuple[float, float] = (16.0, 11.0), speed: float = 1.0,
+                 seed: int = 0):
+        """
+        Args:
+            tags: Number of moving tags
+            anchors: Number of fixed anchors, placed evenly on an ellipse around the area
+            rate: Range events per second over all pairs (0 = unpaced, see UNPACED_INTERVAL)
+            sigma: Noise of the SandboxScenario range model in metres
+            path: Tag motion, one of PATHS
+            area: Width and height of the area in metres
+            speed: Tag speed in metres per second
+            seed: Seed of the random generator
+        """
+        if path not in PATHS:
+            raise ValueError(f"Unknown motion path: {path}")
+        self.tags = tags
+        self.anchors = anchors
+        self.rate = rate
+        self.sigma = sigma
+        self.path = path
+        self.area = np.asarray(area, dtype=float)
+        self.speed = speed
+        self.seed = seed
+
+        center = self.area / 2
+        angles = 2 * np.pi * np.arange(anchors) / anchors
+        self.anchor_positions = center + center * np.column_stack([np.cos(angles), np.sin(angles)])
+        self.anchor_ids = list(range(1, anchors + 1))
+        self.tag_ids = list(range(anchors + 1, anchors + tags + 1))
+
+    def scenario_json(self) -> Dict[str, list]:
+        """Stations in the scenario.json format, named by their stream ids."""
+        stations = [{"name": str(i), "type": "ANCHOR", "position": p.round(3).tolist()}
+                    for i, p in zip(self.anchor_ids, self.anchor_positions)]
+        stations += [{"name": str(i), "type": "TAG"} for i in self.tag_ids]
+        return {"stations": stations}
+
+    def _positions(self, t: float, walk: np.ndarray, dt: float, rng) -> np.ndarray:
+        center = self.area / 2
+        phase = 2 * np.pi * np.arange(self.tags) / max(self.tags, 1)
+        if self.path == "static":
+            radius = 0.25 * self.area.min()
+            return center + radius * np.column_stack([np.cos(phase), np.sin(phase)]) * (self.tags > 1)
+        if self.path == "circle":
+            radius = 0.3 * self.area.min()
+            angle = self.speed * t / radius + phase
+            return center + radius * np.column_stack([np.cos(angle), np.sin(angle)])
+        if self.path == "line":
+            # back and forth along the middle 80% of the width, tags evenly spaced in y
+            length = 0.8 * self.area[0]
+            s = (self.speed * t + phase / (2 * np.pi) * 2 * length) % (2 * length)
+            x = 0.1 * self.area[0] + np.minimum(s, 2 * length - s)
+            y = self.area[1] * (np.arange(self.tags) + 1) / (self.tags + 1)
+            return np.column_stack([x, y])
+        # random walk: step in a random direction, stay inside the area
+        angle = rng.uniform(0, 2 * np.pi, self.tags)
+        walk += self.speed * dt * np.column_stack([np.cos(angle), np.sin(angle)])
+        np.clip(walk, 0, self.area, out=walk)
+        return walk
+
+    def events(self, start_id: int = 0) -> Iterator[Tuple[float, Dict[str, object]]]:
+        """
+        Endless stream of (time_s, event) in the example.stream data schema.
+
+        Every round measures all tag-anchor pairs at the same tag positions; time
+        advances by 1 / rate per event (UNPACED_INTERVAL if rate is 0). start_id
+        skips ahead (used to resume after a Last-Event-ID), the skipped events are
+        generated but not yielded.
+        """
+        rng = np.random.default_rng(self.seed)
+        interval = 1.0 / self.rate if self.rate > 0 else self.UNPACED_INTERVAL
+        pairs = [(tag, anchor) for tag in range(self.tags) for anchor in range(self.anchors)]
+        round_dt = interval * len(pairs)
+        walk = np.tile(self.area / 2, (self.tags, 1))
+
+        event_id = 0
+        for round_index in itertools.count():
+            t0 = round_index * round_dt
+            tag_positions = self._positions(t0, walk, round_dt, rng)
+            diff = tag_positions[:, None, :] - self.anchor_positions[None, :, :]
+            distances = noisy_distance(np.linalg.norm(diff, axis=2), self.sigma, rng)
+            if event_id + len(pairs) <= start_id:
+                event_id += len(pairs)
+                continue
+            for k, (tag, anchor) in enumerate(pairs):
+                if event_id >= start_id:
+                    yield t0 + k * interval, {
+                        "id": event_id,
+                        "source_id": self.tag_ids[tag],
+                        "destination_id": self.anchor_ids[anchor],
+                        "raw_distance": float(distances[tag, anchor]),
+                    }
+                event_id += 1
+
+    def paced(self, start_id: int = 0, duration: Optional[float] = None) -> Iterator[Dict[str, object]]:
+        """
+        Yield events in real time according to rate (or unpaced if rate is 0).
+
+        Only the wall-clock sleeping depends on rate; the events are those of
+        `events`. duration is measured in wall-clock seconds.
+        """
+        start = time.perf_counter()
+        offset = None
+        for t, event in self.events(start_id):
+            if offset is None:
+                offset = t
+            t -= offset
+            if self.rate > 0:
+                if duration is not None and t >= duration:
+                    return
+                delay = start + t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            elif duration is not None and time.perf_counter() - start >= duration:
+                return
+            yield event
+
+
+def format_sse(event: Dict[str, object]) -> str:
+    """One update in the example.stream format, with an id line for resuming."""
+    return f"event : update\nid: {event['id']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+class _SSEHandler(BaseHTTPRequestHandler):
+    generator: LoadGenerator = None
+    duration: Optional[float] = None
+
+    def do_GET(self):
+        last_id = self.headers.get("Last-Event-ID")
+        start_id = int(last_id) + 1 if last_id and last_id.isdigit() else 0
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            self.wfile.write(b'event: connected\ndata: {"status":"connected"}\n\n')
+            # unpaced or high-rate streams are written in blocks to keep syscalls down
+            block = 64 if self.generator.rate == 0 or self.generator.rate > 1000 else 1
+            batch = []
+            for event in self.generator.paced(start_id, self.duration):
+                batch.append(format_sse(event))
+                if len(batch) < block:
+                    continue
+                self.wfile.write("".join(batch).encode("utf-8"))
+                self.wfile.flush()
+                batch = []
+            if batch:
+                self.wfile.write("".join(batch).encode("utf-8"))
+        except (BrokenPipeError, ConnectionResetError):
+            _LOG.info("SSE client %s disconnected", self.client_address[0])
+
+    def log_message(self, format, *args):
+        _LOG.debug(format, *args)
+
+
+def serve_sse(generator: LoadGenerator, host: str = "127.0.0.1", port: int = 8765,
+              duration: Optional[float] = None) -> ThreadingHTTPServer:
+    """
+    Start an SSE server on a background thread; every client gets its own stream.
+
+    Returns:
+        The server; call shutdown() and server_close() to stop it
+    """
+    handler = type("SSEHandler", (_SSEHandler,), {"generator": generator, "duration": duration})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="load-generator-sse", daemon=True).start()
+    _LOG.info("Serving synthetic SSE on http://%s:%d/", host, server.server_address[1])
+    return server
+
+
+def encode_mqtt_batch(events: List[Dict[str, object]], fmt: str = "json") -> bytes:
+    """Encode a batch of events as one MQTT payload in a data.mqtt_decoders format."""
+    if fmt == "binary":
+        return encode_binary([(e["source_id"], e["destination_id"], e["raw_distance"]) for e in events],
+                             first_id=events[0]["id"] if events else 0)
+    return json.dumps(events, separators=(",", ":")).encode("utf-8")
+
+
+class MockMQTTEndpoint:
+    """Delivers generated batches to an `MQTTStreamer`-style on_message(topic, payload) callback."""
+
+    def __init__(self, generator: LoadGenerator, on_message: Callable[[str, bytes], None],
+                 topic: str = "gdop/ranges", batch: int = 50, fmt: str = "json"):
+        self.generator = generator
+        self.on_message = on_message
+        self.topic = topic
+        self.batch = batch
+        self.fmt = fmt
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self, duration: Optional[float] = None):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+
+        def _run():
+            batch = []
+            for event in self.generator.paced(duration=duration):
+                if self._stop_event.is_set():
+                    return
+                batch.append(event)
+                if len(batch) >= self.batch:
+                    self.on_message(self.topic, encode_mqtt_batch(batch, self.fmt))
+                    batch = []
+            if batch:
+                self.on_message(self.topic, encode_mqtt_batch(batch, self.fmt))
+
+        self._thread = threading.Thread(target=_run, name="load-generator-mqtt", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+def publish_mqtt(generator: LoadGenerator, host: str, port: int = 1883, topic: str = "gdop/ranges",
+                 batch: int = 50, fmt: str = "json", duration: Optional[float] = None):
+    """Publish generated batches to a real broker until duration has passed (blocks)."""
+    if mqtt is None:
+        raise RuntimeError("paho-mqtt is not installed")
+    client = mqtt.Client()
+    client.connect(host, port)
+    client.loop_start()
+    try:
+        endpoint = MockMQTTEndpoint(generator, lambda t, payload: client.publish(t, payload), topic, batch, fmt)
+        endpoint.start(duration)
+        endpoint._thread.join()
+    finally:
+        client.loop_stop()
+        client.disconnect()
+
+
+def _parse_mqtt_spec(spec: str) -> Tuple[str, int, str]:
+    host, port, topic = spec, 1883, "gdop/ranges"
+    if host.startswith("mqtt://"):
+        host = host[len("mqtt://"):]
+    if "/" in host:
+        host, topic = host.split("/", 1)
+    if ":" in host:
+        host, port_s = host.split(":", 1)
+        port = int(port_s)
+    return host, port, topic
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic range stream for GDOP (SSE on localhost or MQTT).")
+    parser.add_argument("--tags", type=int, default=1)
+    parser.add_argument("--anchors", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=100.0, help="events per second, 0 = as fast as possible")
+    parser.add_argument("--sigma", type=float, default=0.5, help="range noise in metres")
+    parser.add_argument("--path", choices=PATHS, default="circle")
+    parser.add_argument("--speed", type=float, default=1.0, help="tag speed in m/s")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duration", type=float, default=None, help="seconds per stream (default: endless)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mqtt", default=None, help="publish to host[:port][/topic] instead of serving SSE")
+    parser.add_argument("--mqtt-format", choices=("json", "binary"), default="json")
+    parser.add_argument("--batch", type=int, default=50, help="ranges per MQTT message")
+    parser.add_argument("--scenario-json", default=None, help="write a matching scenario.json to this path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    generator = LoadGenerator(args.tags, args.anchors, args.rate, args.sigma, args.path,
+                              speed=args.speed, seed=args.seed)
+    if args.scenario_json:
+        with open(args.scenario_json, "w") as f:
+            json.dump(generator.scenario_json(), f, indent=4)
+
+    if args.mqtt:
+        host, port, topic = _parse_mqtt_spec(args.mqtt)
+        publish_mqtt(generator, host, port, topic, args.batch, args.mqtt_format, args.duration)
+        return
+
+    server = serve_sse(generator, args.host, args.port, args.duration)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Payload decoders for MQTT range messages.
+
+Gateways publish ranges in one of three formats:
+    json     one object in the SSE schema
+             {"id": 17, "source_id": 7, "destination_id": 1, "raw_distance": 110.58}
+    json     an array of such objects (gateways batch ~50 ranges per message)
+    binary   consecutive fixed-width little-endian records, see `BINARY_RECORD`
+
+Every decoder turns a payload into a list of (source_id, destination_id,
+distance) tuples with the station ids as strings, ready to be queued as
+`data.ingestion.RangeUpdate`s and applied in one batch.
+
+Usage:
+    ranges, error = decode_payload(payload)             # auto-detect format
+    ranges, error = decode_payload(payload, "binary")
+
+Auto-detection is a guess: a binary batch may start with the byte of '{' or
+'['. A payload that looks like JSON but fails to decode as such is therefore
+decoded as binary if its length fits. Set the format explicitly where the
+gateway's format is known.
+
+Additional formats can be added with `register_decoder`.
+"""
+
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+_LOG = logging.getLogger(__name__)
+
+Range = Tuple[str, str, float]
+
+# 16 bytes per range: message id, source station id, destination station id, distance in metres
+BINARY_RECORD = np.dtype([
+    ("id", "<u4"),
+    ("source_id", "<u4"),
+    ("destination_id", "<u4"),
+    ("raw_distance", "<f4"),
+])
+
+_DECODERS: Dict[str, Callable[[bytes], List[Range]]] = {}
+
+
+def register_decoder(name: str, decoder: Callable[[bytes], List[Range]]):
+    """Make decoder available to `decode_payload` under name."""
+    _DECODERS[name] = decoder
+
+
+def available_decoders() -> List[str]:
+    return list(_DECODERS)
+
+
+def _json_range(item: dict) -> Range:
+    return str(item["source_id"]), str(item["destination_id"]), float(item["raw_distance"])
+
+
+def decode_json(payload: bytes) -> List[Range]:
+    """Decode a single JSON object or a JSON array of objects in the SSE schema."""
+    data = json.loads(payload.decode("utf-8"))
+    if isinstance(data, dict):
+        return [_json_range(data)]
+    return [_json_range(item) for item in data]
+
+
+def decode_binary(payload: bytes) -> List[Range]:
+    """Decode consecutive `BINARY_RECORD`s."""
+    if len(payload) % BINARY_RECORD.itemsize:
+        raise ValueError(f"Binary payload of {len(payload)} bytes is not a multiple of "
+                         f"{BINARY_RECORD.itemsize}-byte records")
+    records = np.frombuffer(payload, dtype=BINARY_RECORD)
+    return list(zip(records["source_id"].astype(str).tolist(),
+                    records["destination_id"].astype(str).tolist(),
+                    records["raw_distance"].astype(float).tolist()))
+
+
+def encode_binary(ranges, first_id: int = 0) -> bytes:
+    """Pack (source_id, destination_id, distance) tuples as `BINARY_RECORD`s; ids must be numeric."""
+    records = np.zeros(len(ranges), dtype=BINARY_RECORD)
+    if len(ranges):
+        source, destination, distance = zip(*ranges)
+        records["id"] = np.arange(first_id, first_id + len(ranges))
+        records["source_id"] = np.asarray(source, dtype=np.uint32)
+        records["destination_id"] = np.asarray(destination, dtype=np.uint32)
+        records["raw_distance"] = distance
+    return records.tobytes()
+
+
+register_decoder("json", decode_json)
+register_decoder("binary", decode_binary)
+
+
+def _looks_like_json(payload: bytes) -> bool:
+    if payload.lstrip(b" \t\r\n")[:1] not in (b"{", b"["):
+        return False
+    try:
+        payload.decode("utf-8")
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def detect_format(payload: bytes) -> str:
+    """
+    Guess the payload format: UTF-8 text starting with '{' or '[' whose length is
+    no multiple of the binary record size is JSON, anything else is binary.
+    """
+    if _looks_like_json(payload) and len(payload) % BINARY_RECORD.itemsize:
+        return "json"
+    return "binary"
+
+
+def _candidate_formats(payload: bytes) -> List[str]:
+    """Formats to try for 'auto', most likely first."""
+    if not _looks_like_json(payload):
+        return ["binary"]
+    if len(payload) % BINARY_RECORD.itemsize:
+        return ["json"]
+    # could be either: JSON text of a fitting length or binary records starting with 0x7B/0x5B
+    return ["json", "binary"]
+
+
+def decode_payload(payload: bytes, fmt: str = "auto") -> Tuple[List[Range], Optional[str]]:
+    """
+    Decode an MQTT payload into ranges.
+
+    Args:
+        payload: Raw message payload
+        fmt: Registered decoder name or 'auto' to detect it from the payload
+
+    Returns:
+        Tuple of (ranges, error_message)
+    """
+    if fmt == "auto":
+        candidates = _candidate_formats(payload)
+        for candidate in candidates[:-1]:
+            try:
+                return _DECODERS[candidate](payload), None
+            except Exception as e:
+                _LOG.debug("Payload is not %s (%s), trying %s", candidate, e, candidates[-1])
+        fmt = candidates[-1]
+    decoder = _DECODERS.get(fmt)
+    if decoder is None:
+        return [], f"Unknown MQTT payload format: {fmt}"
+    try:
+        return decoder(payload), None
+    except Exception as e:
+        _LOG.debug("Failed to decode %s payload: %s", fmt, e)
+        return [], f"Error decoding {fmt} payload: {str(e)}"
@@ -11,8 +11,8 @@ Usage:
     streamer.stop()
 
 The on_message_cb will be called with the (topic, payload_bytes) for each
-incoming message. This module does not parse payloads - the caller should
-implement parsing and updating the Scenario.
+incoming message. This module does not parse payloads - see
+data.mqtt_decoders for the supported range formats.
 """
 
 from typing import Callable, Optional
@@ -0,0 +1,356 @@
+"""
+Record and replay of range streams for GDOP.
+
+`StreamRecorder` appends every update pushed into an `IngestionQueue` to a
+compact binary log. `Replayer` feeds such a log, an SSE capture like
+data/example.stream or the merged rtt-log CSVs of a workspace scenario back
+through the same queue, in real time (x1), faster (xN) or as fast as possible.
+Replaying at maximum speed doubles as an ingestion throughput benchmark:
+
+    python -m data.replay data/example.stream --speed max
+    python -m data.replay recording.gdoprec --speed 10
+    python -m data.replay "workspace/1 PD" --speed max
+
+Recording layout (little-endian, append-only):
+    8 bytes   magic b"GDOPREC1"
+    records   1 byte type followed by
+              NAME   uint32 id, uint16 length, UTF-8 name
+              RANGE  float64 timestamp (s), uint32 scenario, source and destination
+                     name ids, float64 distance
+Names (scenarios and stations) are written once and referenced by id afterwards.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import struct
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from data.async_sse import SSEParser
+from data.import_measurements import merge_scenario_logs
+from data.importer import resolve_log_rows
+from data.ingestion import IngestionQueue, RangeUpdate, apply_updates
+from simulation.station import Station
+
+_LOG = logging.getLogger(__name__)
+
+MAGIC = b"GDOPREC1"
+RECORDING_SUFFIX = ".gdoprec"
+_NAME = 1
+_RANGE = 2
+_NAME_HEADER = struct.Struct("<BIH")
+_RANGE_RECORD = struct.Struct("<BdIIId")
+# bytes read from a recording at a time
+_READ_CHUNK = 1 << 16
+
+# (timestamp_s or None, source, destination, distance); source/destination are names or stations
+ReplayItem = Tuple[Optional[float], object, object, float]
+
+
+def _station_name(station) -> str:
+    return str(station.name) if isinstance(station, Station) else str(station)
+
+
+class StreamRecorder:
+    """Append-only recorder, attach with `queue.add_tap(recorder.record_many)`."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._names = {}
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        end = 0
+        if not new_file:
+            # continue an existing recording: its name ids stay valid
+            end = len(MAGIC)
+            with open(path, "rb") as f:
+                for end, record in _parse_records(f, path):
+                    if record[0] == _NAME:
+                        self._names[record[1]] = record[2]
+        self._file = open(path, "r+b" if not new_file else "wb")
+        if new_file:
+            self._file.write(MAGIC)
+        else:
+            # drop a record cut off by an interrupted recording, so appended records stay aligned
+            self._file.truncate(end)
+            self._file.seek(end)
+        self.count = 0
+
+    def _name_id(self, name: str, out: List[bytes]) -> int:
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names[name] = len(self._names)
+            encoded = name.encode("utf-8")
+            out.append(_NAME_HEADER.pack(_NAME, name_id, len(encoded)) + encoded)
+        return name_id
+
+    def record_many(self, updates: Iterable[RangeUpdate]):
+        """Append updates; safe to call from any thread."""
+        with self._lock:
+            if self._file is None:
+                return
+            out = []
+            for update in updates:
+                scenario_id = self._name_id(str(getattr(update.scenario, "name", "")), out)
+                source_id = self._name_id(_station_name(update.source), out)
+                destination_id = self._name_id(_station_name(update.destination), out)
+                out.append(_RANGE_RECORD.pack(_RANGE, update.timestamp, scenario_id, source_id,
+                                              destination_id, update.distance))
+                self.count += 1
+            self._file.write(b"".join(out))
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _parse_records(f, path) -> Iterator[Tuple[int, tuple]]:
+    """
+    Yield (end offset, record) for every complete record of the open recording f.
+
+    The file is read in chunks of _READ_CHUNK bytes, so a recording of any length
+    is parsed in constant memory. A record cut off at the end is not yielded.
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"'{path}' is not a GDOP stream recording")
+    data = b""
+    # file offset of data[0]
+    offset = len(MAGIC)
+    pos = 0
+    while True:
+        record = None
+        if pos < len(data):
+            kind = data[pos]
+            if kind == _NAME:
+                if pos + _NAME_HEADER.size <= len(data):
+                    _, name_id, length = _NAME_HEADER.unpack_from(data, pos)
+                    start = pos + _NAME_HEADER.size
+                    if start + length <= len(data):
+                        record = (_NAME, data[start:start + length].decode("utf-8"), name_id)
+                        end = start + length
+            elif kind == _RANGE:
+                if pos + _RANGE_RECORD.size <= len(data):
+                    record = (_RANGE,) + _RANGE_RECORD.unpack_from(data, pos)[1:]
+                    end = pos + _RANGE_RECORD.size
+            else:
+                raise ValueError(f"Corrupt recording '{path}' at byte {offset + pos}")
+        if record is None:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                # end of the recording; a partial record left by an interrupted recording is ignored
+                return
+            data = data[pos:] + chunk
+            offset += pos
+            pos = 0
+            continue
+        pos = end
+        yield offset + pos, record
+
+
+def _iter_records(path) -> Iterator[tuple]:
+    """Yield (NAME, name, id) and (RANGE, timestamp, scenario_id, source_id, destination_id, distance)."""
+    with open(path, "rb") as f:
+        for _, record in _parse_records(f, path):
+            yield record
+
+
+def recording_items(path, scenario_name: Optional[str] = None) -> Iterator[ReplayItem]:
+    """Ranges of a recording, optionally only those recorded for scenario_name."""
+    names = {}
+    for record in _iter_records(path):
+        if record[0] == _NAME:
+            names[record[2]] = record[1]
+            continue
+        _, timestamp, scenario_id, source_id, destination_id, distance = record
+        if scenario_name is not None and names[scenario_id] != scenario_name:
+            continue
+        yield timestamp, names[source_id], names[destination_id], distance
+
+
+def event_stream_items(path) -> Iterator[ReplayItem]:
+    """Ranges of an SSE capture such as data/example.stream (no timestamps)."""
+    parser = SSEParser()
+    with open(path, "r", encoding="utf-8") as f:
+        # read line by line; the final empty line dispatches an event left unterminated
+        for line in itertools.chain(f, [""]):
+            event = parser.feed_line(line.rstrip("\r\n"))
+            if event is None or event.event not in ("update", "message"):
+                continue
+            try:
+                data = json.loads(event.data)
+                yield None, str(data["source_id"]), str(data["destination_id"]), data["raw_distance"]
+            except (ValueError, KeyError) as e:
+                _LOG.warning("Skipping malformed event in %s: %s", path, e)
+
+
+def workspace_log_items(scenario_obj, scenario_name: str, workspace_dir: str = "workspace") -> Iterator[ReplayItem]:
+    """Ranges of all rtt-log CSVs of a workspace scenario in time order, resolved to its stations."""
+    for row in merge_scenario_logs(scenario_name, workspace_dir):
+        for anchor, tag, distance in resolve_log_rows(scenario_obj, [row]):
+            yield row["time(ms)"] / 1000.0, anchor, tag, distance
+
+
+class Replayer:
+    """Pushes replay items into an `IngestionQueue` at a chosen speed."""
+
+    # pacing for sources without timestamps, in seconds between events at x1
+    DEFAULT_INTERVAL = 0.01
+    # updates pushed at once when replaying at maximum speed
+    BATCH_SIZE = 1024
+
+    def __init__(self, queue: IngestionQueue, speed: Optional[float] = 1.0, interval: float = DEFAULT_INTERVAL):
+        """
+        Args:
+            queue: Target queue, e.g. `MainWindow.ingestion_queue`
+            speed: Replay speed factor; None or 0 replays as fast as possible
+            interval: Seconds between events of sources without timestamps (at x1)
+        """
+        self.queue = queue
+        self.speed = speed
+        self.interval = interval
+        self._thread = None
+        self._stop_event = threading.Event()
+        self.last_stats = None
+
+    def replay(self, scenario, items: Iterable[ReplayItem]) -> dict:
+        """
+        Replay items into the queue for scenario; blocks until done or stopped.
+
+        Returns:
+            Dict with events, seconds and events_per_second
+        """
+        unpaced = not self.speed
+        start = time.perf_counter()
+        first = None
+        count = 0
+        batch = []
+        for index, (timestamp, source, destination, distance) in enumerate(items):
+            if self._stop_event.is_set():
+                break
+            if timestamp is None:
+                timestamp = index * self.interval
+            if first is None:
+                first = timestamp
+            count += 1
+            if unpaced:
+                batch.append(RangeUpdate(scenario, source, destination, distance, timestamp))
+                if len(batch) >= self.BATCH_SIZE:
+                    self.queue.push_many(batch)
+                    batch = []
+                continue
+            delay = start + (timestamp - first) / self.speed - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            self.queue.push(scenario, source, destination, distance, timestamp)
+        if batch:
+            self.queue.push_many(batch)
+
+        seconds = time.perf_counter() - start
+        self.last_stats = {"events": count, "seconds": seconds,
+                           "events_per_second": count / seconds if seconds > 0 else float("inf")}
+        return self.last_stats
+
+    def start(self, scenario, items: Iterable[ReplayItem], on_done=None):
+        """Replay on a background thread; on_done is called with the stats."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+
+        def _run():
+            try:
+                stats = self.replay(scenario, items)
+                if on_done is not None:
+                    on_done(stats)
+            except Exception as e:
+                _LOG.warning("Replay failed: %s", e)
+
+        self._thread = threading.Thread(target=_run, name="replay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+def source_items(path, scenario_obj, workspace_dir: str = "workspace") -> Iterator[ReplayItem]:
+    """Pick the reader for path: a recording, an SSE capture or a workspace scenario folder."""
+    if os.path.isdir(path):
+        scenario_dir = os.path.normpath(path)
+        return workspace_log_items(scenario_obj, os.path.basename(scenario_dir), os.path.dirname(scenario_dir) or ".")
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            return recording_items(path)
+    return event_stream_items(path)
+
+
+def parse_speed(text: str) -> Optional[float]:
+    """'max' -> None, 'x10' or '10' -> 10.0."""
+    text = text.strip().lower()
+    if text in ("max", "0"):
+        return None
+    return float(text.lstrip("x"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recording, SSE capture or workspace scenario "
+                                                 "through the ingestion path and report the throughput.")
+    parser.add_argument("source", help="recording (.gdoprec), SSE capture (.stream) or workspace/<scenario> folder")
+    parser.add_argument("--speed", default="max", help="x1, x10, ... or max (default)")
+    parser.add_argument("--policy", choices=IngestionQueue.POLICIES, default=IngestionQueue.LATEST)
+    parser.add_argument("--drain-ms", type=float, default=33.0, help="interval of the simulated GUI drain")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    from simulation.scenario import Scenario
+    if os.path.isdir(args.source):
+        from data.importer import import_scenario
+        scenario_dir = os.path.normpath(args.source)
+        ok, message, scenario = import_scenario(os.path.basename(scenario_dir), os.path.dirname(scenario_dir) or ".")
+        if not ok:
+            parser.error(message)
+    else:
+        # unknown station names become tags on first use
+        scenario = Scenario("replay")
+
+    queue = IngestionQueue(args.policy, capacity=1000000)
+    applied = [0, 0]
+    done = threading.Event()
+
+    def _drain():
+        while True:
+            finished = done.is_set()
+            updates = queue.drain()
+            if updates:
+                apply_updates(updates)
+                applied[0] += len(updates)
+                applied[1] += 1
+            if finished:
+                return
+            time.sleep(args.drain_ms / 1000.0)
+
+    drainer = threading.Thread(target=_drain, daemon=True)
+    drainer.start()
+    stats = Replayer(queue, parse_speed(args.speed)).replay(scenario, source_items(args.source, scenario))
+    done.set()
+    drainer.join()
+
+    print(f"events: {stats['events']}  time: {stats['seconds']:.3f} s  "
+          f"throughput: {stats['events_per_second']:.0f} events/s")
+    print(f"applied: {applied[0]} in {applied[1]} batches  queue: {queue.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Session snapshots for GDOP.
+
+Stores all loaded scenarios (stations, measurements, aggregation method, tag
+truth and computed tracks) in a single binary file so a session can be reopened
+without re-importing and re-aggregating the workspace CSVs.
+
+File layout:
+    8 bytes   magic b"GDOPSES1"
+    8 bytes   little-endian uint64 length of the JSON header
+    n bytes   UTF-8 JSON header (scenario metadata and array descriptors)
+    ...       raw little-endian arrays, each aligned to ARRAY_ALIGNMENT bytes;
+              descriptor offsets are relative to the first aligned byte after the header
+
+Arrays are memory-mapped on load, so reopening costs one header parse plus the
+construction of the station objects. Everything a loaded scenario keeps is
+copied out of the mapping (station positions, relations, track columns), so no
+view outlives `load_session` and the file can be replaced while the session is
+open. Saves write a temporary file next to the target and replace it.
+"""
+
+import json
+import os
+import struct
+import tempfile
+from typing import List, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from data.calibration import Calibration
+from simulation import measurements
+from simulation.scenario import Scenario
+from simulation.sandbox_scenario import SandboxScenario
+from simulation.station import Anchor, Tag
+
+_LOG = logging.getLogger(__name__)
+
+MAGIC = b"GDOPSES1"
+ARRAY_ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sQ")
+
+
+def _umask() -> int:
+    # the umask can only be read by setting it
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+
+
+def _scenario_arrays(scenario) -> Tuple[dict, dict]:
+    """Split a scenario into JSON-able metadata and a dict of numpy arrays."""
+    stations = list(scenario.stations)
+    index = {station: i for i, station in enumerate(stations)}
+
+    pairs = []
+    distances = []
+    for pair, distance in scenario.measurements.relation.items():
+        ids = [index.get(station) for station in pair]
+        if None in ids:
+            continue
+        pairs.append(ids)
+        distances.append(distance)
+
+    anchors = [s for s in stations if isinstance(s, Anchor)]
+    arrays = {
+        "anchor_positions": np.array([a.position() for a in anchors], dtype="<f8").reshape(len(anchors), -1),
+        "relation_pairs": np.array(pairs, dtype="<i4").reshape(-1, 2),
+        "relation_distances": np.array(distances, dtype="<f8"),
+    }
+    track = scenario.track
+    if track is not None:
+        for column in track.columns:
+            arrays[f"track:{column}"] = track[column].to_numpy(dtype="<f8")
+
+    truth = scenario.tag_truth
+    meta = {
+        "name": scenario.name,
+        "kind": "sandbox" if isinstance(scenario, SandboxScenario) else "scenario",
+        "agg_method": scenario.agg_method,
+        "track_options": scenario.track_options,
+        "robust_positioning": scenario.robust_positioning,
+        "calibration": scenario.calibration.to_dict() if scenario.calibration is not None else None,
+        "sigma": scenario.sigma,
+        "tag_truth": truth.position().tolist() if truth is not None else None,
+        "stations": [{"name": s.name, "type": "ANCHOR" if isinstance(s, Anchor) else "TAG"} for s in stations],
+    }
+    return meta, arrays
+
+
+def save_session(path: str, scenarios) -> Tuple[bool, str]:
+    """
+    Write a snapshot of all scenarios to path.
+
+    Args:
+        path: Target file
+        scenarios: Scenario objects to store
+
+    Returns:
+        Tuple of (success, message)
+    """
+    try:
+        header = {"version": 1, "scenarios": []}
+        blobs = []
+        for scenario in scenarios:
+            meta, arrays = _scenario_arrays(scenario)
+            meta["arrays"] = {}
+            for key, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                meta["arrays"][key] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+                blobs.append((meta["arrays"][key], array))
+            header["scenarios"].append(meta)
+
+        offset = 0
+        for descriptor, array in blobs:
+            descriptor["offset"] = offset
+            offset = _align(offset + array.nbytes)
+        header_bytes = json.dumps(header).encode("utf-8")
+        data_start = _align(_PREFIX.size + len(header_bytes))
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(prefix=".gdop-session-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_PREFIX.pack(MAGIC, len(header_bytes)))
+                f.write(header_bytes)
+                for descriptor, array in blobs:
+                    f.seek(data_start + descriptor["offset"])
+                    f.write(array.tobytes())
+            # mkstemp creates the file private to the user; keep the permissions of the file being replaced,
+            # or give a new file the ones open() would have
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o666 & ~_umask())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return True, f"Saved {len(header['scenarios'])} scenarios to '{path}'."
+
+    except Exception as e:
+        _LOG.exception("Error saving session: %s", e)
+        return False, f"Error saving session: {str(e)}"
+
+
+def _build_scenario(meta: dict, arrays: dict):
+    if meta.get("kind") == "sandbox":
+        scenario = SandboxScenario(meta["name"])
+    else:
+        scenario = Scenario(meta["name"])
+    scenario.sigma = meta.get("sigma", 0.0)
+    scenario.agg_method = meta.get("agg_method")
+    scenario.track_options = meta.get("track_options")
+    scenario.robust_positioning = meta.get("robust_positioning", False)
+    if meta.get("calibration") is not None:
+        scenario.calibration = Calibration.from_dict(meta["calibration"])
+
+    anchor_positions = iter(arrays["anchor_positions"])
+    stations = []
+    for st in meta["stations"]:
+        if st["type"] == "ANCHOR":
+            stations.append(Anchor(next(anchor_positions), st["name"], scenario))
+        else:
+            stations.append(Tag(scenario, st["name"]))
+    scenario.stations = stations
+
+    truth = meta.get("tag_truth")
+    scenario.tag_truth = Anchor(truth, 'TAG_TRUTH', scenario) if truth is not None else None
+
+    scenario.measurements = measurements.Measurements()
+    scenario.measurements.relation = {
+        frozenset((stations[i], stations[j])): distance
+        for (i, j), distance in zip(arrays["relation_pairs"].tolist(), arrays["relation_distances"].tolist())
+    }
+
+    track_columns = {key.split(":", 1)[1]: array for key, array in arrays.items() if key.startswith("track:")}
+    # copy: the arrays are views of the session file's mapping, which is released once loading returns
+    scenario.track = pd.DataFrame(track_columns, copy=True) if track_columns else None
+    return scenario
+
+
+def load_session(path: str) -> Tuple[Optional[List[object]], Optional[str]]:
+    """
+    Load the scenarios of a session snapshot written by `save_session`.
+
+    Args:
+        path: Snapshot file
+
+    Returns:
+        Tuple of (scenarios, error_message)
+    """
+    try:
+        with open(path, "rb") as f:
+            magic, header_length = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC:
+                return None, f"'{path}' is not a GDOP session file."
+            header = json.loads(f.read(header_length).decode("utf-8"))
+        data_start = _align(_PREFIX.size + header_length)
+
+        # one read-only mapping of the whole file; every array is a view into it
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        scenarios = []
+        for meta in header["scenarios"]:
+            arrays = {}
+            for key, descriptor in meta["arrays"].items():
+                dtype = np.dtype(descriptor["dtype"])
+                shape = tuple(descriptor["shape"])
+                start = data_start + descriptor["offset"]
+                nbytes = dtype.itemsize * int(np.prod(shape))
+                arrays[key] = buffer[start:start + nbytes].view(dtype).reshape(shape)
+            scenarios.append(_build_scenario(meta, arrays))
+
+        return scenarios, None
+
+    except Exception as e:
+        _LOG.exception("Error loading session: %s", e)
+        return None, f"Error loading session: {str(e)}"
@@ -1,10 +1,13 @@
 import threading
 import logging
+from collections import deque
 
 import requests
 from sseclient import SSEClient
 import json
 
+from data.async_sse import default_service
+
 
 _LOG = logging.getLogger(__name__)
 
@@ -21,9 +24,13 @@ class SSEUpdate:
 
 
 class SSEStreamingData:
+    # only the most recent updates are kept for inspection; long sessions must not grow without bound
+    MAX_UPDATES = 1000
+
     def __init__(self):
         self.status = None
-        self.updates = []
+        self.updates = deque(maxlen=self.MAX_UPDATES)
+        self.received = 0
 
     def update_status(self, status):
         self.status = status
@@ -36,6 +43,7 @@ class SSEStreamingData:
             raw_distance=update_data["raw_distance"]
         )
         self.updates.append(update)
+        self.received += 1
 
 
 def process_sse_data(data, scenario):
@@ -43,10 +51,36 @@ def process_sse_data(data, scenario):
     destination_station = scenario.get_station_by_name(str(data["destination_id"]))
     raw_distance = data["raw_distance"]
     scenario.measurements.update_relation(frozenset([source_station, destination_station]), raw_distance)
-    scenario.window.trilat_plot.measurements_changed.emit()
 
 
-def fetch_sse_streaming_data(url, scenario):
+def handle_sse_event(event, streaming_data, scenario, on_update=None, sink=None):
+    """Apply one SSE event (anything with .event and .data) to the scenario.
+
+    With a sink (e.g. `data.ingestion.IngestionQueue`) the range is queued
+    instead of being written into the scenario from the streaming thread.
+    """
+    if event.event == "connected":
+        try:
+            status_data = json.loads(event.data)
+            streaming_data.update_status(status_data["status"])
+            _LOG.info("SSE status updated: %s", streaming_data.status)
+        except json.JSONDecodeError as e:
+            _LOG.warning("Error decoding 'connected' event data: %s", e)
+    elif event.event in ["update", "message"]:
+        try:
+            update_data = json.loads(event.data)
+            streaming_data.add_update(update_data)
+            if sink is not None:
+                sink.push(scenario, str(update_data["source_id"]), str(update_data["destination_id"]), update_data["raw_distance"])
+            else:
+                process_sse_data(update_data, scenario)
+            if on_update is not None:
+                on_update()
+        except json.JSONDecodeError as e:
+            _LOG.warning("Error decoding event data: %s", e)
+
+
+def fetch_sse_streaming_data(url, scenario, on_update=None):
     streaming_data = SSEStreamingData()
 
     try:
@@ -55,20 +89,7 @@ def fetch_sse_streaming_data(url, scenario):
         client = SSEClient(response)
 
         for event in client.events():
-            if event.event == "connected":
-                try:
-                    status_data = json.loads(event.data)
-                    streaming_data.update_status(status_data["status"])
-                    _LOG.info("SSE status updated: %s", streaming_data.status)
-                except json.JSONDecodeError as e:
-                    _LOG.warning("Error decoding 'connected' event data: %s", e)
-            elif event.event in ["update", "message"]:
-                try:
-                    update_data = json.loads(event.data)
-                    streaming_data.add_update(update_data)
-                    process_sse_data(update_data, scenario)
-                except json.JSONDecodeError as e:
-                    _LOG.warning("Error decoding event data: %s", e)
+            handle_sse_event(event, streaming_data, scenario, on_update)
     except requests.RequestException as e:
         _LOG.error("Error fetching streaming data: %s", e)
     except Exception as e:
@@ -86,4 +107,46 @@ class SSEStreamer:
         if self.streaming_thread.is_alive():
             self.streaming_thread.join(timeout=1)
             if self.streaming_thread.is_alive():
-                _LOG.warning("SSEStreamer thread did not stop gracefully.")
\ No newline at end of file
+                _LOG.warning("SSEStreamer thread did not stop gracefully.")
+
+
+class _PendingPushes(list):
+    """Sink for handle_sse_event that only records the push arguments."""
+
+    def push(self, *args):
+        self.append(args)
+
+
+class AsyncSSEStreamer:
+    """Feeds an SSE stream into a scenario via the shared asyncio `SSEService`.
+
+    Unlike `SSEStreamer`, stopping cancels the connection immediately and
+    dropped connections are resumed with backoff and Last-Event-ID.
+    """
+
+    def __init__(self, url, scenario, on_update=None, service=None, sink=None):
+        self.url = url
+        self.scenario = scenario
+        self.on_update = on_update
+        self.sink = sink
+        self.streaming_data = SSEStreamingData()
+        self.service = service or default_service()
+        self.stream_id = self.service.subscribe(self.url, self._on_event, self.streaming_data.update_status)
+
+    async def _on_event(self, event):
+        push_async = getattr(self.sink, "push_async", None)
+        if push_async is None:
+            handle_sse_event(event, self.streaming_data, self.scenario, self.on_update, self.sink)
+            return
+        # queue asynchronously, so a blocking sink policy waits without stalling the shared loop
+        pending = _PendingPushes()
+        handle_sse_event(event, self.streaming_data, self.scenario, None, pending)
+        for args in pending:
+            await push_async(*args)
+        if pending and self.on_update is not None:
+            self.on_update()
+
+    def stop_streaming(self):
+        if self.stream_id is not None:
+            self.service.unsubscribe(self.stream_id)
+            self.stream_id = None
@@ -0,0 +1,148 @@
+"""
+Tail-follow streamer for rtt-log CSVs that are still being written.
+
+The phone logger appends one line per range measurement. `CSVTail` remembers
+the byte offset it has consumed and parses only the complete lines appended
+since the last read; `TailStreamer` polls it on a background thread and hands
+new rows to a callback, the same way `MQTTStreamer` delivers messages.
+
+Usage:
+    streamer = TailStreamer(on_rows)
+    streamer.start("workspace/1 PD/rtt-log-2025-10-31-07-30-42.csv")
+    streamer.stop()
+
+The on_rows callback is called with a list of row dicts keyed by the normalized
+column names (e.g. 'time(ms)', 'est._range(m)', 'ap-ssid').
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import csv
+import os
+import threading
+import logging
+
+from data.import_measurements import _clean_col, _parse_value
+
+_LOG = logging.getLogger(__name__)
+
+
+class CSVTail:
+    # bytes read backwards from the end at a time when looking for the last complete line
+    TAIL_CHUNK = 65536
+
+    def __init__(self, path, from_start: bool = False):
+        self.path = Path(path)
+        self.offset = 0
+        self.columns: Optional[List[str]] = None
+        # (device, inode) of the file followed; another one means the file was replaced
+        self._identity = None
+        if not from_start:
+            # skip existing rows but still pick up the header
+            self._read_header()
+
+    def _read_header(self):
+        """
+        Parse the header and skip the existing rows. While the header line is still
+        incomplete nothing is consumed; read_new_rows then picks it up once it is.
+        """
+        with self.path.open("rb") as f:
+            st = os.fstat(f.fileno())
+            self._identity = (st.st_dev, st.st_ino)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                s = raw.decode("utf-8").strip()
+                if s and not s.startswith("//"):
+                    self.columns = self._parse_header(s)
+                    break
+            if self.columns is None:
+                return
+            # skip up to the last complete line; a row still being written is read later
+            size = f.seek(0, os.SEEK_END)
+            start = max(f.tell() - self.TAIL_CHUNK, 0)
+            while True:
+                f.seek(start)
+                chunk = f.read(size - start)
+                newline = chunk.rfind(b"\n")
+                if newline >= 0 or start == 0:
+                    self.offset = start + newline + 1
+                    return
+                start = max(start - self.TAIL_CHUNK, 0)
+
+    @staticmethod
+    def _parse_header(line: str) -> List[str]:
+        header = next(csv.reader([line.lstrip("#").strip()], skipinitialspace=True))
+        return [_clean_col(c) for c in header]
+
+    def read_new_rows(self) -> List[Dict[str, object]]:
+        """Parse the complete lines appended since the previous call."""
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return []
+        size = st.st_size
+        identity = (st.st_dev, st.st_ino)
+        if size < self.offset or (self._identity is not None and identity != self._identity):
+            # file was truncated or replaced: start over
+            _LOG.info("%s was truncated or replaced, re-reading from the start", self.path)
+            self.offset = 0
+            self.columns = None
+        self._identity = identity
+        if size == self.offset:
+            return []
+
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        complete = data[:data.rfind(b"\n") + 1]
+        self.offset += len(complete)
+
+        rows = []
+        for line in complete.decode("utf-8").splitlines():
+            s = line.strip()
+            if not s or s.startswith("//"):
+                continue
+            if self.columns is None or s.startswith("#"):
+                self.columns = self._parse_header(s)
+                continue
+            values = next(csv.reader([line], skipinitialspace=True))
+            rows.append({col: _parse_value(val) for col, val in zip(self.columns, values)})
+        return rows
+
+
+class TailStreamer:
+    def __init__(self, on_rows: Callable[[List[Dict[str, object]]], None], poll_interval: float = 0.2):
+        self.on_rows = on_rows
+        self.poll_interval = poll_interval
+        self.tail: Optional[CSVTail] = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self, path, from_start: bool = False):
+        """Start following path; existing rows are skipped unless from_start is set."""
+        if self._thread is not None:
+            # already started
+            return
+
+        self.tail = CSVTail(path, from_start=from_start)
+        self._stop_event.clear()
+
+        def _run():
+            while not self._stop_event.is_set():
+                try:
+                    rows = self.tail.read_new_rows()
+                    if rows:
+                        self.on_rows(rows)
+                except Exception as e:
+                    _LOG.warning("Error following %s: %s", path, e)
+                self._stop_event.wait(self.poll_interval)
+
+        self._thread = threading.Thread(target=_run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
@@ -0,0 +1,103 @@
+"""
+Workspace watcher for GDOP.
+
+Detects new, changed or appended rtt-log CSVs and scenario.json edits below the
+workspace directory so that only the affected scenarios need to be re-imported.
+The watcher polls file sizes and modification times, which works on every
+platform and for network shares; a poll only stats the files and never reads them.
+
+Usage:
+    watcher = WorkspaceWatcher("workspace")
+    for scenario_name, changes in watcher.poll().items():
+        ...
+"""
+
+import os
+from typing import Dict, List, Tuple
+import logging
+
+_LOG = logging.getLogger(__name__)
+
+
+class WorkspaceChange:
+    NEW = "new"
+    CHANGED = "changed"
+    APPENDED = "appended"
+    REMOVED = "removed"
+
+    def __init__(self, scenario, path, kind):
+        self.scenario = scenario
+        self.path = path
+        self.kind = kind
+
+    @property
+    def is_config(self):
+        return os.path.basename(self.path) == "scenario.json"
+
+    def __repr__(self):
+        return f"WorkspaceChange(scenario={self.scenario}, path={self.path}, kind={self.kind})"
+
+
+class WorkspaceWatcher:
+    def __init__(self, workspace_dir: str = "workspace"):
+        self.workspace_dir = workspace_dir
+        # path -> (scenario, size, mtime_ns) as seen by the previous poll
+        self._files = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[str, int, int]]:
+        files = {}
+        try:
+            scenario_entries = list(os.scandir(self.workspace_dir))
+        except FileNotFoundError:
+            return files
+
+        for scenario_entry in scenario_entries:
+            if not scenario_entry.is_dir():
+                continue
+            try:
+                for entry in os.scandir(scenario_entry.path):
+                    if not entry.is_file():
+                        continue
+                    if not (entry.name.endswith(".csv") or entry.name == "scenario.json"):
+                        continue
+                    st = entry.stat()
+                    files[entry.path] = (scenario_entry.name, st.st_size, st.st_mtime_ns)
+            except OSError as e:
+                _LOG.warning("Failed to scan %s: %s", scenario_entry.path, e)
+        return files
+
+    def scenarios(self) -> List[str]:
+        """Names of the scenario folders that contain at least one CSV file (as of the last poll)."""
+        return sorted({scenario for path, (scenario, _, _) in self._files.items() if path.endswith(".csv")})
+
+    def poll(self) -> Dict[str, List[WorkspaceChange]]:
+        """
+        Compare the workspace against the previous poll.
+
+        Returns:
+            Dict mapping each affected scenario name to its list of changes
+            (empty dict if nothing changed).
+        """
+        current = self._scan()
+        changes: Dict[str, List[WorkspaceChange]] = {}
+
+        for path, (scenario, size, mtime_ns) in current.items():
+            previous = self._files.get(path)
+            if previous is None:
+                kind = WorkspaceChange.NEW
+            elif previous[1:] == (size, mtime_ns):
+                continue
+            elif size > previous[1]:
+                kind = WorkspaceChange.APPENDED
+            else:
+                kind = WorkspaceChange.CHANGED
+            changes.setdefault(scenario, []).append(WorkspaceChange(scenario, path, kind))
+
+        for path, (scenario, _, _) in self._files.items():
+            if path not in current:
+                changes.setdefault(scenario, []).append(WorkspaceChange(scenario, path, WorkspaceChange.REMOVED))
+
+        self._files = current
+        if changes:
+            _LOG.info("Workspace changes in %d scenario(s): %s", len(changes), ", ".join(sorted(changes)))
+        return changes
@@ -0,0 +1,259 @@
+"""
+Headless export of all workspace scenarios for GDOP.
+
+Renders the trilateration view of every scenario (anchors, range circles, tag
+estimate, tag truth, optional track and GDOP heatmap) plus one comparison
+chart of the first-tag GDOP of all scenarios, as PNG and/or SVG. Only the Agg
+backend is used and PyQt is never imported, so it runs on servers and in CI.
+Every scenario is imported and rendered in its own process:
+
+    python export.py --out reports
+    python export.py workspace --format png svg --heatmap --window-ms 1000 --jobs 8
+    python export.py --scenarios "1 PD" "2 PD" --robust --calibration linear
+
+Files are written to <out>/<scenario>.<format> and <out>/comparison.<format>.
+"""
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import logging
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.collections import EllipseCollection, LineCollection
+import numpy as np
+
+from data.importer import get_available_scenarios, import_scenario
+from simulation import geometry
+from simulation.decimation import bucket_size_for, lttb_indices
+
+_LOG = logging.getLogger(__name__)
+
+FORMATS = ("png", "svg")
+FIGURE_SIZE = (8, 6)
+STATION_DOT_SIZE = 100
+# margin around anchors, estimate and truth in the trilateration view (position units)
+VIEW_MARGIN = 3.0
+HEATMAP_RESOLUTION = 200
+# heatmap colors are clipped here; larger GDOP values are all drawn as poor geometry
+HEATMAP_MAX_GDOP = 10.0
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r"[^\w.\- ]+", "_", name).strip() or "scenario"
+
+
+def _view_limits(points: np.ndarray) -> Tuple[float, float, float, float]:
+    points = points[np.isfinite(points).all(axis=1)]
+    if len(points) == 0:
+        return -15.0, 15.0, -15.0, 15.0
+    low = points.min(axis=0) - VIEW_MARGIN
+    high = points.max(axis=0) + VIEW_MARGIN
+    return low[0], high[0], low[1], high[1]
+
+
+def render_trilateration(scenario, heatmap: bool = False, heatmap_resolution: int = HEATMAP_RESOLUTION):
+    """
+    Draw the trilateration view of a scenario into a new Agg figure.
+
+    Returns:
+        Tuple of (figure, first-tag GDOP)
+    """
+    anchors = scenario.get_anchor_list()
+    anchor_positions = scenario.anchor_positions().reshape(-1, 2)
+    tags = scenario.get_tag_list()
+    tag_positions = np.array([tag.position() for tag in tags], dtype=float).reshape(-1, 2)
+    truth = scenario.tag_truth.position()[:2] if scenario.tag_truth is not None else None
+
+    fig, ax = plt.subplots(figsize=FIGURE_SIZE)
+    ax.set_title(scenario.name)
+    ax.grid(True, linestyle='--', linewidth=0.5, alpha=0.5)
+    points = [anchor_positions, tag_positions] + ([truth[None, :]] if truth is not None else [])
+    xmin, xmax, ymin, ymax = _view_limits(np.concatenate(points))
+
+    gdop = 0.0
+    if len(tags) and np.isfinite(tag_positions[0]).all() and len(anchor_positions):
+        gdop = float(geometry.dilution_of_precision_batch(anchor_positions, tag_positions[:1])[0])
+
+    if heatmap and len(anchor_positions) >= 2:
+        xs = np.linspace(xmin, xmax, heatmap_resolution)
+        ys = np.linspace(ymin, ymax, heatmap_resolution)
+        grid = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+        values = geometry.dilution_of_precision_batch(anchor_positions, grid).reshape(len(ys), len(xs))
+        image = ax.imshow(np.clip(values, 0, HEATMAP_MAX_GDOP), origin='lower', extent=(xmin, xmax, ymin, ymax),
+                          cmap='viridis_r', alpha=0.6, vmin=0, vmax=HEATMAP_MAX_GDOP, zorder=0, aspect='auto')
+        fig.colorbar(image, ax=ax, label='GDOP')
+
+    # range circles: distance from every anchor to the first tag's estimate, +- sigma
+    if len(tags) and np.isfinite(tag_positions[0]).all() and len(anchor_positions):
+        distances = geometry.euclidean_distances(anchor_positions, tag_positions[0])
+        sigma = scenario.sigma
+        radii = np.concatenate([distances + sigma, np.maximum(0.0, distances - sigma)])
+        ax.add_collection(EllipseCollection(
+            2 * radii, 2 * radii, np.zeros(len(radii)), units='xy',
+            offsets=np.concatenate([anchor_positions, anchor_positions]), offset_transform=ax.transData,
+            facecolors='none', edgecolors='blue', linestyles='dotted'), autolim=False)
+
+    located = tag_positions[np.isfinite(tag_positions).all(axis=1)]
+    if len(located) and len(anchor_positions):
+        segments = [[anchor, tag] for tag in located for anchor in anchor_positions]
+        ax.add_collection(LineCollection(segments, colors='red', linestyles='dashed', alpha=0.5), autolim=False)
+
+    track = scenario.track
+    if track is not None and len(track):
+        x, y = track['x'].to_numpy(dtype=float), track['y'].to_numpy(dtype=float)
+        # a few vertices per pixel are enough, also for SVG
+        kept = lttb_indices(x, y, bucket_size_for(len(x), fig.get_figwidth() * fig.dpi))
+        ax.plot(x[kept], y[kept], color='purple', alpha=0.6, linewidth=1, zorder=1)
+
+    if len(anchor_positions):
+        ax.scatter(anchor_positions[:, 0], anchor_positions[:, 1], c='blue', s=STATION_DOT_SIZE, zorder=3)
+        for anchor, position in zip(anchors, anchor_positions):
+            ax.text(position[0], position[1], anchor.name, ha='center', va='center', zorder=4)
+    if truth is not None:
+        ax.scatter([truth[0]], [truth[1]], c='green', s=STATION_DOT_SIZE, zorder=3)
+    for tag, position in zip(tags, tag_positions):
+        if np.isfinite(position).all():
+            ax.plot(position[0], position[1], 'rx', markersize=10, zorder=4)
+            ax.text(position[0], position[1], tag.name, ha='center', va='bottom', color='red', zorder=4)
+
+    ax.set_xlim(xmin, xmax)
+    ax.set_ylim(ymin, ymax)
+    # after imshow, which resets the aspect; keeps the range circles round
+    ax.set_aspect('equal', adjustable='box')
+    return fig, gdop
+
+
+def render_comparison(names: List[str], gdop_values: List[float]):
+    """Bar chart of the first-tag GDOP per scenario, like the comparison plot of the app."""
+    fig, ax = plt.subplots(figsize=(max(6.0, 0.4 * len(names)), 4))
+    ax.set_title('First-tag GDOP per scenario')
+    ax.set_ylabel('GDOP')
+    x = range(len(names))
+    # a singular geometry (infinite GDOP) gets an empty bar with its label
+    ax.bar(x, [v if np.isfinite(v) else 0.0 for v in gdop_values], color='orange')
+    ax.set_xticks(x)
+    ax.set_xticklabels(names, rotation=90)
+    finite = [v for v in gdop_values if np.isfinite(v)]
+    ax.set_ylim(0, max(12, max(finite) * 1.2 if finite else 12))
+    for i, v in enumerate(gdop_values):
+        ax.text(i, v if np.isfinite(v) else 0, f"{v:.2f}", ha='center', va='bottom')
+    fig.tight_layout()
+    return fig
+
+
+def _save(fig, out_dir: str, name: str, formats) -> List[str]:
+    paths = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{_file_name(name)}.{fmt}")
+        fig.savefig(path, format=fmt)
+        paths.append(path)
+    plt.close(fig)
+    return paths
+
+
+def export_scenario(name: str, workspace_dir: str, out_dir: str, formats=("png",), agg_method: str = "lowest",
+                    window_ms: Optional[float] = None, robust: bool = False, calibration: Optional[str] = None,
+                    heatmap: bool = False) -> dict:
+    """
+    Import one scenario and write its trilateration view (runs in a worker process).
+
+    Returns:
+        Dict with name, gdop, paths and error (None on success)
+    """
+    start = time.perf_counter()
+    try:
+        ok, message, scenario = import_scenario(name, workspace_dir, agg_method=agg_method, window_ms=window_ms,
+                                                robust=robust, calibration=calibration)
+        if not ok:
+            return {"name": name, "gdop": float("nan"), "paths": [], "error": message}
+        fig, gdop = render_trilateration(scenario, heatmap=heatmap)
+        paths = _save(fig, out_dir, name, formats)
+        return {"name": name, "gdop": gdop, "paths": paths, "error": None, "seconds": time.perf_counter() - start}
+    except Exception as e:
+        _LOG.exception("Error exporting scenario '%s': %s", name, e)
+        return {"name": name, "gdop": float("nan"), "paths": [], "error": f"Error exporting scenario: {str(e)}"}
+
+
+def export_workspace(workspace_dir: str = "workspace", out_dir: str = "exports", formats=("png",),
+                     scenarios: Optional[List[str]] = None, jobs: Optional[int] = None, **options) -> Tuple[List[dict], Optional[str]]:
+    """
+    Export every scenario of the workspace (or the given ones) in parallel, plus the comparison chart.
+
+    Args:
+        workspace_dir: Directory containing the scenario folders
+        out_dir: Target directory, created if missing
+        formats: Any of FORMATS
+        scenarios: Scenario names; default all scenarios of the workspace
+        jobs: Worker processes; default one per CPU
+        **options: Passed to export_scenario (agg_method, window_ms, robust, calibration, heatmap)
+
+    Returns:
+        Tuple of (per-scenario results in scenario order, error_message)
+    """
+    if scenarios is None:
+        scenarios, error = get_available_scenarios(workspace_dir)
+        if error:
+            return [], error
+    if not scenarios:
+        return [], f"No scenarios to export in '{workspace_dir}'."
+    if options.get("calibration"):
+        # fit once up front; the workers then read the cached calibration
+        from data.calibration import load_or_fit_calibration
+        _, error = load_or_fit_calibration(workspace_dir, options["calibration"] == "rssi")
+        if error:
+            return [], error
+    os.makedirs(out_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(export_scenario, name, workspace_dir, out_dir, tuple(formats), **options)
+                   for name in scenarios]
+        results = [future.result() for future in futures]
+
+    exported = [r for r in results if r["error"] is None]
+    if exported:
+        fig = render_comparison([r["name"] for r in exported], [r["gdop"] for r in exported])
+        _save(fig, out_dir, "comparison", formats)
+    return results, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the trilateration view of every workspace scenario and "
+                                                 "a GDOP comparison chart without a GUI.")
+    parser.add_argument("workspace", nargs="?", default="workspace", help="workspace directory (default: workspace)")
+    parser.add_argument("--out", default="exports", help="output directory (default: exports)")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["png"], dest="formats")
+    parser.add_argument("--scenarios", nargs="+", help="scenario names (default: all)")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--agg", default="lowest", choices=("newest", "lowest", "mean", "median"))
+    parser.add_argument("--window-ms", type=float, help="also compute and draw a track with this window")
+    parser.add_argument("--robust", action="store_true", help="reject outlier ranges (RANSAC)")
+    parser.add_argument("--calibration", choices=("linear", "rssi"), help="apply the per-AP range calibration")
+    parser.add_argument("--heatmap", action="store_true", help="draw a GDOP heatmap behind the view")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    start = time.perf_counter()
+    results, error = export_workspace(args.workspace, args.out, args.formats, args.scenarios, args.jobs,
+                                      agg_method=args.agg, window_ms=args.window_ms, robust=args.robust,
+                                      calibration=args.calibration, heatmap=args.heatmap)
+    if error:
+        parser.error(error)
+    for r in results:
+        if r["error"]:
+            print(f"{r['name']}: FAILED {r['error']}")
+        else:
+            print(f"{r['name']}: GDOP {r['gdop']:.2f}  ({r['seconds']:.1f} s)")
+    failed = sum(1 for r in results if r["error"])
+    print(f"exported {len(results) - failed} of {len(results)} scenarios to '{args.out}' "
+          f"in {time.perf_counter() - start:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,6 +13,12 @@ class ComparisonPlot(QObject):
     """Draw a simple bar chart where each bar is the GDOP of the first tag
     in a scenario.
 
+    The GDOP of every scenario comes from the window's ComputeWorker, which
+    caches it together with its `Scenario.revision`, so a refresh only
+    recomputes the scenarios that changed since the last one.
+    Bars and value labels are created once and updated in place; the axes are
+    only rebuilt when scenarios are added, removed or renamed.
+
     Expected usage:
       plot = ComparisonPlot(window, scenarios)
       plot.update_data()
@@ -23,6 +29,8 @@ class ComparisonPlot(QObject):
     tags_changed = pyqtSignal()
     measurements_changed = pyqtSignal()
 
+    MIN_YLIM = 12
+
     def __init__(self, window, app_scenarios):
         super().__init__()
         self.window = window
@@ -32,37 +40,62 @@ class ComparisonPlot(QObject):
         self.ax.set_title('First-tag GDOP per scenario')
         self.ax.set_ylabel('GDOP')
 
+        self._names = None
+        self._values = []
+        self._bars = []
+        self._texts = []
+        self._dirty = True
+
+    def _gdop(self, scenario):
+        """Newest computed GDOP of the scenario's first tag (0.0 until its first result arrives)."""
+        result = self.window.compute_worker.result(scenario)
+        return result.gdop if result is not None else 0.0
+
     def update_data(self, anchors=False, tags=False, measurements=False):
         """Compute GDOP for the first tag of each scenario and update the bar chart.
 
         Signature accepts optional flags for compatibility with MainWindow.update_all().
         """
-        scenario_names = []
-        gdop_values = []
-
-        for s in self.scenarios:
-            scenario_names.append(getattr(s, 'name', str(s)))
-            tags = s.get_tag_list()
-            if tags and len(tags) > 0:
-                try:
-                    gdop = tags[0].dilution_of_precision()
-                except Exception:
-                    gdop = 0.0
-            else:
-                gdop = 0.0
-            gdop_values.append(float(gdop))
-
-        # draw bars
+        scenario_names = [getattr(s, 'name', str(s)) for s in self.scenarios]
+        gdop_values = [self._gdop(s) for s in self.scenarios]
+
+        if scenario_names != self._names:
+            self._rebuild(scenario_names, gdop_values)
+        elif gdop_values != self._values:
+            for i, (bar, text, v) in enumerate(zip(self._bars, self._texts, gdop_values)):
+                if v != self._values[i]:
+                    bar.set_height(v)
+                    text.set_position((i, v))
+                    text.set_text(f"{v:.2f}")
+            self._values = gdop_values
+            self._update_ylim()
+            self._dirty = True
+
+    def _rebuild(self, scenario_names, gdop_values):
+        """Recreate bars, ticks and labels for a new set of scenarios."""
         self.ax.clear()
+        self.ax.set_title('First-tag GDOP per scenario')
+        self.ax.set_ylabel('GDOP')
         x = range(len(scenario_names))
-        self.ax.bar(x, gdop_values, color='orange')
+        self._bars = list(self.ax.bar(x, gdop_values, color='orange'))
         self.ax.set_xticks(x)
         self.ax.set_xticklabels(scenario_names, rotation=90)
-        self.ax.set_ylim(0, max(12, max(gdop_values) * 1.2 if gdop_values else 12))
-        for i, v in enumerate(gdop_values):
-            self.ax.text(i, v, f"{v:.2f}", ha='center', va='bottom')
+        self._texts = [self.ax.text(i, v, f"{v:.2f}", ha='center', va='bottom') for i, v in enumerate(gdop_values)]
+        self._names = scenario_names
+        self._values = gdop_values
+        self._update_ylim()
+        self._dirty = True
+
+    def _update_ylim(self):
+        top = max(self.MIN_YLIM, max(self._values) * 1.2 if self._values else self.MIN_YLIM)
+        if self.ax.get_ylim() != (0, top):
+            self.ax.set_ylim(0, top)
 
     def redraw(self):
+        # nothing changed since the last draw; Qt repaints the cached canvas on its own
+        if not self._dirty:
+            return
+        self._dirty = False
         try:
             self.fig.canvas.draw_idle()
         except Exception:
@@ -0,0 +1,255 @@
+"""
+Off-GUI-thread computation of tag positions and GDOP.
+
+`ComputeWorker.request` takes a snapshot (`Scenario.snapshot`) of every
+scenario whose revision has no result yet and hands the snapshots to a worker
+thread. Every result is tagged with the revision it was computed for; the views
+read the newest result with `ComputeWorker.result` and `results_ready` asks
+for a refresh when new results arrive. While the worker is busy, further
+requests are merged and sent as one batch afterwards, and a result older than
+the one already stored is discarded.
+
+With background=False the same requests are computed synchronously on the
+calling thread, which is what small scenarios need to stay lag-free.
+
+While the user drags a station, `request(..., changed=[station])` only solves
+again the tags that depend on a changed station, directly or through the ranges
+between tags, and reuses the other positions of the previous result. Such a result is marked partial and computed
+again in full by the next request without changed stations.
+"""
+
+import logging
+import weakref
+from typing import Optional
+
+import numpy as np
+from PyQt5.QtCore import QCoreApplication, QObject, QThread, pyqtSignal, pyqtSlot
+
+from simulation import geometry
+
+_LOG = logging.getLogger(__name__)
+
+
+class ScenarioResult:
+    def __init__(self, revision, sequence: int, tag_positions: np.ndarray, gdop: float, partial: bool = False):
+        """
+        Args:
+            revision: `Scenario.revision` of the snapshot the result was computed on
+            sequence: Submission number; a higher one is newer
+            tag_positions: (n, 2) positions of the scenario's tags, in tag list order
+            gdop: GDOP of the first tag (0.0 without tags)
+            partial: Only the dependents of changed stations were solved, see compute_scenario
+        """
+        self.revision = revision
+        self.sequence = sequence
+        self.tag_positions = tag_positions
+        self.gdop = gdop
+        self.partial = partial
+
+
+def compute_scenario(scenario, revision=None, sequence: int = 0, previous=None, changed=None) -> ScenarioResult:
+    """
+    Positions of all tags and the GDOP of the first one.
+
+    Args:
+        scenario: Scenario (or snapshot) to compute
+        revision: Revision the result is tagged with
+        sequence: Submission number of the result
+        previous: Tag positions of an earlier result of the same tags and ranges
+        changed: Stations moved since previous; only their dependent tags are solved again
+    """
+    tags = scenario.get_tag_list()
+    partial = previous is not None and bool(changed) and len(previous) == len(tags)
+    if partial:
+        dependents = _dependent_tags(scenario, tags, changed)
+        tag_positions = np.array([tag.position() if tag in dependents else previous[i] for i, tag in enumerate(tags)],
+                                 dtype=float).reshape(-1, 2)
+    else:
+        tag_positions = np.array([tag.position() for tag in tags], dtype=float).reshape(-1, 2)
+    gdop = 0.0
+    if tags:
+        try:
+            anchor_positions = scenario.anchor_positions()
+            gdop = float(geometry.dilution_of_precision(
+                anchor_positions, tag_positions[0], geometry.euclidean_distances(anchor_positions, tag_positions[0])))
+        except Exception:
+            gdop = 0.0
+    return ScenarioResult(revision, sequence, tag_positions, gdop, partial)
+
+
+def _dependent_tags(scenario, tags, changed) -> set:
+    """Tags whose position depends on a changed station, also through ranges to other dependent tags."""
+    tags = set(tags)
+    dependents = set()
+    frontier = set(changed)
+    while frontier:
+        reached = {s for pair in scenario.measurements.relation if not pair.isdisjoint(frontier)
+                   for s in pair if s in tags and s not in dependents}
+        dependents |= reached
+        frontier = reached
+    return dependents
+
+
+class _Worker(QObject):
+    finished = pyqtSignal(object)
+
+    @pyqtSlot(object)
+    def compute(self, jobs):
+        """jobs: list of (key, revision, sequence, snapshot, previous positions, changed station indices)"""
+        results = []
+        for key, revision, sequence, snapshot, previous, changed in jobs:
+            try:
+                # the snapshot keeps the station order, so indices map to its copies
+                changed = [snapshot.stations[i] for i in changed]
+                results.append((key, compute_scenario(snapshot, revision, sequence, previous, changed)))
+            except Exception as e:
+                _LOG.exception("Error computing scenario '%s': %s", snapshot.name, e)
+        self.finished.emit(results)
+
+
+class ComputeWorker(QObject):
+    # emitted on the GUI thread after new results were stored
+    results_ready = pyqtSignal()
+    _submit = pyqtSignal(object)
+
+    def __init__(self, background: bool = True, parent=None):
+        super().__init__(parent)
+        self._background = background
+        self._thread = None
+        self._worker = None
+        self._busy = False
+        # key -> (scenario, changed stations or None for a full computation), for requests made while busy
+        self._pending = {}
+        self._sequence = 0
+        # scenario -> newest ScenarioResult, and the revision last sent to the worker
+        self._results = weakref.WeakKeyDictionary()
+        self._submitted = weakref.WeakKeyDictionary()
+        self._submitted_partial = weakref.WeakKeyDictionary()
+        self._scenarios = weakref.WeakValueDictionary()
+        self.computed = 0
+        self.discarded = 0
+
+    @property
+    def background(self) -> bool:
+        return self._background
+
+    @background.setter
+    def background(self, value: bool):
+        self._background = bool(value)
+
+    @property
+    def busy(self) -> bool:
+        return self._busy
+
+    def _start_thread(self):
+        self._thread = QThread(self)
+        self._worker = _Worker()
+        self._worker.moveToThread(self._thread)
+        self._submit.connect(self._worker.compute)
+        self._worker.finished.connect(self._on_finished)
+        self._thread.finished.connect(self._worker.deleteLater)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker thread; results still being computed are dropped."""
+        if self._thread is not None:
+            self._thread.quit()
+            self._thread.wait()
+            self._thread = None
+            self._worker = None
+        self._busy = False
+        self._pending.clear()
+
+    def result(self, scenario) -> Optional[ScenarioResult]:
+        """Newest result of scenario, possibly computed for an older revision (see is_current)."""
+        return self._results.get(scenario)
+
+    def is_current(self, scenario) -> bool:
+        result = self._results.get(scenario)
+        return result is not None and result.revision == scenario.revision
+
+    def request(self, scenarios, changed=None):
+        """
+        Compute every scenario whose current revision has neither a result nor a pending computation.
+
+        Args:
+            scenarios: Scenarios to bring up to date
+            changed: Stations moved since the last request (e.g. the one being dragged); if given,
+                only their dependent tags are solved again. Without it, partial results are
+                computed again in full.
+        """
+        changed = set(changed) if changed else None
+        for scenario in scenarios:
+            revision = scenario.revision
+            result = self._results.get(scenario)
+            if result is not None and result.revision == revision and (changed or not result.partial):
+                continue
+            if self._submitted.get(scenario) == revision and (changed or not self._submitted_partial.get(scenario)):
+                continue
+            if not self._background:
+                self._sequence += 1
+                previous = self._previous_positions(scenario, revision, changed)
+                self._store(scenario, compute_scenario(scenario, revision, self._sequence, previous, changed))
+                continue
+            key = id(scenario)
+            if key in self._pending:
+                # merged requests are partial only if all of them were
+                pending = self._pending[key][1]
+                changed_here = pending | changed if pending is not None and changed is not None else None
+            else:
+                changed_here = changed
+            self._pending[key] = (scenario, changed_here)
+        if self._pending and not self._busy:
+            self._send()
+
+    def _previous_positions(self, scenario, revision, changed):
+        """Tag positions of the stored result if only station positions changed since, else None."""
+        result = self._results.get(scenario)
+        # revision[:3] covers the scenario settings, the ranges and the station list (see Scenario.revision)
+        if not changed or result is None or result.revision[:3] != revision[:3]:
+            return None
+        return result.tag_positions
+
+    def _send(self):
+        if self._thread is None:
+            self._start_thread()
+        jobs = []
+        for key, (scenario, changed) in self._pending.items():
+            self._sequence += 1
+            revision = scenario.revision
+            previous = self._previous_positions(scenario, revision, changed)
+            indices = [i for i, s in enumerate(scenario.stations) if s in changed] if previous is not None else []
+            self._scenarios[key] = scenario
+            self._submitted[scenario] = revision
+            self._submitted_partial[scenario] = bool(indices)
+            jobs.append((key, revision, self._sequence, scenario.snapshot(), previous, indices))
+        self._pending.clear()
+        self._busy = True
+        self._submit.emit(jobs)
+
+    def _store(self, scenario, result: ScenarioResult) -> bool:
+        current = self._results.get(scenario)
+        if current is not None and current.sequence > result.sequence:
+            self.discarded += 1
+            return False
+        self._results[scenario] = result
+        self.computed += 1
+        return True
+
+    def _on_finished(self, results):
+        self._busy = False
+        stored = False
+        for key, result in results:
+            scenario = self._scenarios.get(key)
+            if scenario is None:
+                # scenario was removed meanwhile
+                self.discarded += 1
+                continue
+            stored |= self._store(scenario, result)
+        if self._pending:
+            self._send()
+        if stored:
+            self.results_ready.emit()
@@ -14,4 +14,13 @@ class DisplayConfig():
         self.showGDOP = True
 
         self.showTagLabels = True
-        self.dragAnchors = True
\ No newline at end of file
+        # draw Kalman-smoothed tag positions (with 2-sigma ellipses) instead of raw trilateration
+        self.showSmoothedTags = False
+        # imported track and live trail of every tag; decimated with "lttb" or "minmax"
+        self.showTrajectories = True
+        self.trajectoryDecimation = "lttb"
+        self.dragAnchors = True
+        # while dragging, redraw only the moving artists over a cached background
+        self.useBlitting = True
+        # compute tag positions and GDOP in a worker thread (see ComputeWorker)
+        self.computeInBackground = True
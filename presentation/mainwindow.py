@@ -1,11 +1,12 @@
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtWidgets import (
     QMainWindow,
     QTabWidget,
     QVBoxLayout,
     QWidget,
     QSplitter,
-    QSizePolicy
+    QSizePolicy,
+    QFileDialog
 )
 
 from matplotlib.backends.backend_qt5agg import (
@@ -14,6 +15,11 @@ from matplotlib.backends.backend_qt5agg import (
 )
 
 import presentation
+from data.session import save_session, load_session
+from data.ingestion import IngestionQueue, apply_epochs, apply_updates
+from simulation.epochs import EpochCollector
+from presentation.refresh_scheduler import RefreshScheduler
+from presentation.compute_worker import ComputeWorker
 from presentation.tabs import (
     SandboxTab,
     DisplayTab,
@@ -29,21 +35,34 @@ class MainWindow(QMainWindow):
     SIGMA_SLIDER_MAX = 5
     SIGMA_SLIDER_RESOLUTION = 100
     SIGMA_INPUT_STEP = 0.1
+    SESSION_FILE_FILTER = "GDOP session (*.gdop);;All files (*)"
+    INGESTION_INTERVAL_MS = 33
 
     def __init__(self, gdop_app):
         super().__init__()
         self._gdop_app = gdop_app
         self._scenario = gdop_app.scenarios[0] if gdop_app.scenarios else None
         self._display_config = presentation.DisplayConfig()
+        # tag positions and GDOP are computed on scenario snapshots, off the GUI thread
+        self._compute_worker = ComputeWorker(self._display_config.computeInBackground, parent=self)
         self._trilat_plot = presentation.TrilatPlot(self, self._scenario)
         self._comparison_plot = presentation.ComparisonPlot(self, self._gdop_app.scenarios)
-
-        self.trilat_plot.anchors_changed.connect(lambda: self.update_all(anchors=True, tags=False, measurements=False))
-        self.trilat_plot.tags_changed.connect(lambda: self.update_all(anchors=False, tags=True, measurements=False))
-        self.trilat_plot.measurements_changed.connect(lambda: self.update_all(anchors=False, tags=False, measurements=True))
-        self.comparison_plot.anchors_changed.connect(lambda: self.update_all(anchors=True, tags=False, measurements=False))
-        self.comparison_plot.tags_changed.connect(lambda: self.update_all(anchors=False, tags=True, measurements=False))
-        self.comparison_plot.measurements_changed.connect(lambda: self.update_all(anchors=False, tags=False, measurements=True))
+        # streamers push into this queue from their threads; drained on the GUI thread
+        self._ingestion_queue = IngestionQueue()
+        # groups streamed anchor-tag ranges into per-tag epochs; None applies every range directly
+        self._epoch_collector = EpochCollector()
+        # all views are refreshed through here, at most once per frame
+        self._refresh_scheduler = RefreshScheduler(self.update_all, parent=self)
+        # what the views skipped while the trilateration plot was being dragged, see update_all
+        self._deferred = {"anchors": False, "tags": False, "measurements": False}
+
+        self.trilat_plot.anchors_changed.connect(lambda: self.request_refresh(anchors=True))
+        self.trilat_plot.tags_changed.connect(lambda: self.request_refresh(tags=True))
+        self.trilat_plot.measurements_changed.connect(lambda: self.request_refresh(measurements=True))
+        self.comparison_plot.anchors_changed.connect(lambda: self.request_refresh(anchors=True))
+        self.comparison_plot.tags_changed.connect(lambda: self.request_refresh(tags=True))
+        self.comparison_plot.measurements_changed.connect(lambda: self.request_refresh(measurements=True))
+        self.compute_worker.results_ready.connect(lambda: self.request_refresh(tags=True))
 
         self.setWindowTitle(MainWindow.WINDOW_TITLE)
 
@@ -104,11 +123,29 @@ class MainWindow(QMainWindow):
         horizontal_splitter.setStretchFactor(1, 1)
         main_layout.addWidget(horizontal_splitter)
 
+        self.create_menu()
+
         status_bar = self.statusBar()
         status_bar.showMessage("")
 
         self.update_all()
 
+        self._ingestion_timer = QTimer(self)
+        self._ingestion_timer.timeout.connect(self.drain_ingestion_queue)
+        self._ingestion_timer.start(self.INGESTION_INTERVAL_MS)
+
+    def drain_ingestion_queue(self):
+        """Apply all queued stream updates at once and request a single refresh."""
+        updates = self.ingestion_queue.drain()
+        epochs = self.epoch_collector
+        changed = apply_updates(updates, epochs) if updates else set()
+        if epochs is not None:
+            changed |= apply_epochs(epochs.flush())
+        if changed:
+            self.request_refresh(measurements=True)
+        if updates:
+            self.data_tab.update_stream_stats()
+
     def create_tabs(self):
         self.tree_tab = TreeTab(self)
         self.display_tab = DisplayTab(self)
@@ -120,21 +157,95 @@ class MainWindow(QMainWindow):
         self.tab_widget.addTab(self.data_tab.get_widget(), self.data_tab.tab_name)
         self.tab_widget.addTab(self.sandbox_tab.get_widget(), self.sandbox_tab.tab_name)
 
+    def create_menu(self):
+        file_menu = self.menuBar().addMenu("File")
+        file_menu.addAction("Open Session…", self.open_session_dialog)
+        file_menu.addAction("Save Session…", self.save_session_dialog)
+
+    def save_session_dialog(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Session", "session.gdop", self.SESSION_FILE_FILTER)
+        if not path:
+            return
+        ok, message = save_session(path, self.app.scenarios)
+        self.statusBar().showMessage(message, 5000 if ok else 0)
+
+    def open_session_dialog(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Session", "", self.SESSION_FILE_FILTER)
+        if path:
+            self.open_session(path)
+
+    def open_session(self, path):
+        scenarios, error = load_session(path)
+        if error or not scenarios:
+            self.statusBar().showMessage(error or f"Session '{path}' contains no scenarios.", 0)
+            return
+        if self._epoch_collector is not None:
+            # pending epochs belong to the tags of the replaced scenarios
+            self._epoch_collector.clear()
+        # replace in place: tabs and plots hold references to the list
+        self.app.scenarios[:] = scenarios
+        self.tree_tab._activate_scenario(scenarios[0])
+        self.statusBar().showMessage(f"Opened session '{path}' ({len(scenarios)} scenarios)", 5000)
+
+    def request_refresh(self, anchors=False, tags=False, measurements=False):
+        """Mark views dirty; they are refreshed together with the next frame (see RefreshScheduler)."""
+        self._refresh_scheduler.request(anchors=anchors, tags=tags, measurements=measurements)
+
     def update_all(self, anchors=True, tags=True, measurements=True):
-        if anchors:
-            self.trilat_plot.update_anchors()
-            self.tree_tab.update()
-        
+        """
+        Refresh all views immediately; prefer request_refresh, which caps the frame rate.
+
+        While a station is dragged in the trilateration plot, only that plot follows
+        (see TrilatPlot.interacting); tree, sandbox and comparison are refreshed once,
+        with everything that changed meanwhile, by the first refresh after the release.
+        """
+        measure = self._refresh_scheduler.measure
+        if self.trilat_plot.interacting:
+            self._deferred["anchors"] |= anchors
+            self._deferred["tags"] |= tags
+            self._deferred["measurements"] |= measurements
+            with measure("compute"):
+                # the other scenarios do not change during the drag
+                self.compute_worker.request([self.trilat_plot.scenario], changed=[self.trilat_plot.dragging_point])
+            with measure("trilat"):
+                if anchors:
+                    self.trilat_plot.update_anchors()
+                self.trilat_plot.update_data(anchors=anchors, tags=tags, measurements=measurements)
+                self.trilat_plot.redraw()
+            return
+
+        anchors |= self._deferred["anchors"]
+        tags |= self._deferred["tags"]
+        measurements |= self._deferred["measurements"]
+        self._deferred = dict.fromkeys(self._deferred, False)
+
+        with measure("compute"):
+            scenarios = list(self.app.scenarios)
+            if self.trilat_plot.scenario not in scenarios:
+                scenarios.append(self.trilat_plot.scenario)
+            self.compute_worker.request(scenarios)
+
+        if anchors or tags or measurements:
+            with measure("tree"):
+                self.tree_tab.update()
+
         if (tags or measurements):
-            self.sandbox_tab.update_sandbox()
-            self.tree_tab.update()
+            with measure("sandbox"):
+                self.sandbox_tab.update_sandbox()
 
-        self.trilat_plot.update_data(anchors=anchors, tags=tags, measurements=measurements)
-        self.trilat_plot.redraw()
+        with measure("trilat"):
+            if anchors:
+                self.trilat_plot.update_anchors()
+            self.trilat_plot.update_data(anchors=anchors, tags=tags, measurements=measurements)
+            self.trilat_plot.redraw()
 
-        self.comparison_plot.update_data(anchors=anchors, tags=tags, measurements=measurements)
-        self.comparison_plot.redraw()
+        with measure("comparison"):
+            self.comparison_plot.update_data(anchors=anchors, tags=tags, measurements=measurements)
+            self.comparison_plot.redraw()
 
+    def closeEvent(self, event):
+        self.compute_worker.stop()
+        super().closeEvent(event)
 
     @property
     #TODO rename to trilat_plot after streamlining all references
@@ -149,6 +260,29 @@ class MainWindow(QMainWindow):
     def display_config(self):
         return self._display_config
 
+    @property
+    def ingestion_queue(self):
+        return self._ingestion_queue
+
+    @property
+    def epoch_collector(self):
+        return self._epoch_collector
+
+    @epoch_collector.setter
+    def epoch_collector(self, value):
+        if self._epoch_collector is not None:
+            # hand out what is still pending before switching
+            apply_epochs(self._epoch_collector.flush(force=True))
+        self._epoch_collector = value
+
+    @property
+    def compute_worker(self):
+        return self._compute_worker
+
+    @property
+    def refresh_scheduler(self):
+        return self._refresh_scheduler
+
     @property
     def trilat_plot(self):
         return self._trilat_plot
@@ -0,0 +1,110 @@
+"""
+Frame-rate capped refresh of the GDOP views.
+
+Streamers, drags, tabs and imports only mark what changed (anchors, tags,
+measurements) via `RefreshScheduler.request`. The scheduler merges all
+requests and refreshes the views at most once per frame interval, so a burst
+of signals costs a single repaint. The time every view takes to refresh is
+recorded (see `RefreshScheduler.stats`).
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class RefreshScheduler(QObject):
+    # emitted after every refresh, e.g. to show the timings
+    refreshed = pyqtSignal()
+
+    DEFAULT_FRAME_RATE = 30
+
+    def __init__(self, refresh: Callable[..., None], frame_rate: float = DEFAULT_FRAME_RATE, parent=None):
+        """
+        Args:
+            refresh: Called as refresh(anchors=..., tags=..., measurements=...) once per frame
+            frame_rate: Maximum number of refreshes per second
+            parent: Owner of the scheduler's timer
+        """
+        super().__init__(parent)
+        self._refresh = refresh
+        self._dirty = {"anchors": False, "tags": False, "measurements": False}
+        self._last_refresh = float("-inf")
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+        self.frame_rate = frame_rate
+        self.requests = 0
+        self.refreshes = 0
+        # view -> [last_ms, total_ms, count]
+        self._timings: Dict[str, list] = {}
+
+    @property
+    def frame_rate(self) -> float:
+        return self._frame_rate
+
+    @frame_rate.setter
+    def frame_rate(self, value: float):
+        self._frame_rate = max(1.0, float(value))
+
+    @property
+    def pending(self) -> bool:
+        return any(self._dirty.values())
+
+    def request(self, anchors: bool = False, tags: bool = False, measurements: bool = False):
+        """Mark views dirty; they are refreshed with the next frame."""
+        self._dirty["anchors"] |= bool(anchors)
+        self._dirty["tags"] |= bool(tags)
+        self._dirty["measurements"] |= bool(measurements)
+        self.requests += 1
+        if self._timer.isActive() or not self.pending:
+            return
+        # refresh right after the current event, unless the last frame is too recent
+        wait = self._last_refresh + 1.0 / self._frame_rate - time.monotonic()
+        self._timer.start(int(wait * 1000 + 0.5) if wait > 0 else 0)
+
+    def flush(self):
+        """Refresh now if anything is dirty."""
+        self._timer.stop()
+        if not self.pending:
+            return
+        flags = self._dirty
+        # requests made during the refresh go into the next frame
+        self._dirty = {"anchors": False, "tags": False, "measurements": False}
+        self._last_refresh = time.monotonic()
+        with self.measure("total"):
+            self._refresh(**flags)
+        self.refreshes += 1
+        self.refreshed.emit()
+
+    @contextmanager
+    def measure(self, view: str):
+        """Record the duration of the enclosed block as the refresh time of view."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            timing = self._timings.setdefault(view, [0.0, 0.0, 0])
+            timing[0] = elapsed
+            timing[1] += elapsed
+            timing[2] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            Dict with requests, refreshes and per view its last_ms and mean_ms refresh time
+        """
+        return {
+            "requests": self.requests,
+            "refreshes": self.refreshes,
+            "views": {view: {"last_ms": last, "mean_ms": total / count}
+                      for view, (last, total, count) in self._timings.items()},
+        }
+
+    def reset_stats(self):
+        self.requests = 0
+        self.refreshes = 0
+        self._timings.clear()
@@ -5,11 +5,18 @@ Data tab for the GDOP application.
 from PyQt5.QtWidgets import (
     QLineEdit, QPushButton, QVBoxLayout, QWidget,
     QDialog, QListWidget, QListWidgetItem, QDialogButtonBox,
-    QLabel, QRadioButton, QButtonGroup
+    QLabel, QRadioButton, QButtonGroup, QSpinBox, QFileDialog,
+    QCheckBox, QDoubleSpinBox
 )
 from .base_tab import BaseTab
 from PyQt5.QtWidgets import QComboBox, QFormLayout
 from data.mqtt_streamer import MQTTStreamer
+from data.mqtt_decoders import available_decoders, decode_payload
+from data.tail_streamer import TailStreamer
+from data.importer import resolve_log_rows
+from data.ingestion import IngestionQueue, RangeUpdate
+from simulation.epochs import EpochCollector
+from data.replay import RECORDING_SUFFIX, Replayer, StreamRecorder, parse_speed, source_items
 from typing import Optional
 import logging
 
@@ -34,9 +41,27 @@ class DataTab(BaseTab):
         self.stream_mode_off = None
         self.stream_mode_mqtt = None
         self.stream_mode_sse = None
+        self.stream_mode_tail = None
+        self.stream_mode_replay = None
+        self.replay_speed_combo = None
+        self.record_button = None
         self.url_input = None
         # MQTT streamer instance (optional, created lazily)
         self._mqtt_streamer: Optional[MQTTStreamer] = None
+        # CSV tail streamer instance (optional, created lazily)
+        self._tail_streamer: Optional[TailStreamer] = None
+        # scenario currently fed by SSE (may differ from the active one later)
+        self._sse_scenario = None
+        # replay of recordings / captures and recording of incoming updates
+        self._replayer: Optional[Replayer] = None
+        self._recorder: Optional[StreamRecorder] = None
+        # overload handling of the ingestion queue
+        self.policy_combo = None
+        self.capacity_spin = None
+        # grouping of anchor-tag ranges into epochs
+        self.epoch_checkbox = None
+        self.epoch_window_spin = None
+        self.stats_label = None
         # periodic update controls removed - updates come from streamer signals
     # CSV import moved to TreeTab; no csv_import_button here anymore
     
@@ -56,13 +81,15 @@ class DataTab(BaseTab):
 
         # URL input
         self.url_input = QLineEdit()
-        self.url_input.setPlaceholderText("Enter streaming URL")
+        self.url_input.setPlaceholderText("Enter streaming URL or rtt-log CSV path")
         streaming_layout.addWidget(self.url_input)
 
         # container widget is just the radio buttons; we use a button group to manage them
         self.stream_mode_off = QRadioButton("Turn off streaming")
         self.stream_mode_mqtt = QRadioButton("Stream from MQTT")
         self.stream_mode_sse = QRadioButton("Stream from SSE")
+        self.stream_mode_tail = QRadioButton("Follow rtt-log CSV")
+        self.stream_mode_replay = QRadioButton("Replay recording, .stream file or scenario folder")
         # default to off
         self.stream_mode_off.setChecked(True)
 
@@ -70,12 +97,68 @@ class DataTab(BaseTab):
         self.stream_mode_group.addButton(self.stream_mode_off, 0)
         self.stream_mode_group.addButton(self.stream_mode_mqtt, 1)
         self.stream_mode_group.addButton(self.stream_mode_sse, 2)
+        self.stream_mode_group.addButton(self.stream_mode_tail, 3)
+        self.stream_mode_group.addButton(self.stream_mode_replay, 4)
         # connect change
         self.stream_mode_group.buttonClicked.connect(self.update_streaming_config)
 
         streaming_layout.addWidget(self.stream_mode_off)
         streaming_layout.addWidget(self.stream_mode_mqtt)
         streaming_layout.addWidget(self.stream_mode_sse)
+        streaming_layout.addWidget(self.stream_mode_tail)
+        streaming_layout.addWidget(self.stream_mode_replay)
+
+        self.replay_speed_combo = QComboBox()
+        self.replay_speed_combo.addItems(["x1", "x10", "x100", "max"])
+        # auto-detection is a guess, gateways with a known format should set it
+        self.payload_format_combo = QComboBox()
+        self.payload_format_combo.addItem("Auto-detect", "auto")
+        for fmt in available_decoders():
+            self.payload_format_combo.addItem(fmt, fmt)
+        replay_form = QFormLayout()
+        replay_form.addRow("Replay speed:", self.replay_speed_combo)
+        replay_form.addRow("MQTT payload:", self.payload_format_combo)
+        streaming_layout.addLayout(replay_form)
+
+        self.record_button = QPushButton("Record stream...")
+        self.record_button.setCheckable(True)
+        self.record_button.toggled.connect(self.toggle_recording)
+        streaming_layout.addWidget(self.record_button)
+
+        # what to do when updates arrive faster than the GUI applies them
+        overload_form = QFormLayout()
+        self.policy_combo = QComboBox()
+        self.policy_combo.addItem("Latest value per pair", IngestionQueue.LATEST)
+        self.policy_combo.addItem("Keep last N updates", IngestionQueue.KEEP_N)
+        self.policy_combo.addItem("Block producer", IngestionQueue.BLOCK)
+        self.capacity_spin = QSpinBox()
+        self.capacity_spin.setRange(1, 1000000)
+        queue = self.main_window.ingestion_queue
+        self.policy_combo.setCurrentIndex(max(0, self.policy_combo.findData(queue.policy)))
+        self.capacity_spin.setValue(queue.capacity)
+        self.policy_combo.currentIndexChanged.connect(self.update_overload_policy)
+        self.capacity_spin.valueChanged.connect(self.update_overload_policy)
+        overload_form.addRow("On overload:", self.policy_combo)
+        overload_form.addRow("Buffer size:", self.capacity_spin)
+
+        # ranges of a tag are solved together once all anchors reported or the window ran out
+        self.epoch_checkbox = QCheckBox("Group ranges into epochs")
+        self.epoch_window_spin = QDoubleSpinBox()
+        self.epoch_window_spin.setRange(0.05, 10.0)
+        self.epoch_window_spin.setSingleStep(0.1)
+        self.epoch_window_spin.setSuffix(" s")
+        collector = self.main_window.epoch_collector
+        self.epoch_checkbox.setChecked(collector is not None)
+        self.epoch_window_spin.setValue(collector.window if collector is not None else EpochCollector().window)
+        self.epoch_checkbox.toggled.connect(self.update_epoch_config)
+        self.epoch_window_spin.valueChanged.connect(self.update_epoch_config)
+        overload_form.addRow(self.epoch_checkbox)
+        overload_form.addRow("Epoch window:", self.epoch_window_spin)
+        streaming_layout.addLayout(overload_form)
+
+        self.stats_label = QLabel()
+        streaming_layout.addWidget(self.stats_label)
+        self.update_stream_stats()
 
         # Periodic update checkbox
     # Periodic update controls removed (streaming signals handle updates)
@@ -85,15 +168,18 @@ class DataTab(BaseTab):
 
     def update_streaming_config(self):
         """Update streaming configuration based on checkbox state."""
-        # Determine which radio is selected: 0=off,1=mqtt,2=sse
+        # Determine which radio is selected: 0=off,1=mqtt,2=sse,3=csv tail
         selected_id = self.stream_mode_group.checkedId()
+        if selected_id != 2:
+            self._stop_sse_streaming()
+        if selected_id != 3:
+            self._stop_tail_streamer()
+        if selected_id != 4:
+            self._stop_replay()
         if selected_id == 0:
             # Turn off streaming
             # stop SSE streamer if running
-            try:
-                self.scenario.stop_streaming()
-            except Exception:
-                pass
+            self._stop_sse_streaming()
             # stop MQTT streamer if running
             try:
                 if getattr(self, '_mqtt_streamer', None):
@@ -137,19 +223,18 @@ class DataTab(BaseTab):
 
             # create streamer and start
             try:
+                scenario = self.scenario
+                queue = self.main_window.ingestion_queue
+                payload_format = self.payload_format_combo.currentData()
+
                 def _on_mqtt_message(topic_in, payload):
-                    # minimal handler: attempt to decode payload as utf-8 text and log
-                    try:
-                        text = payload.decode('utf-8')
-                    except Exception:
-                        text = str(payload)
-                    # TODO: parse payload and call scenario.update_relation as needed
-                    _LOG.info("MQTT message on %s: %s", topic_in, text)
-                    try:
-                        # briefly notify user a message arrived
-                        self.main_window.statusBar().showMessage(f"MQTT msg on {topic_in}", 2000)
-                    except Exception:
-                        pass
+                    # runs on the paho thread: decode and queue, the GUI applies the batch
+                    ranges, error = decode_payload(payload, payload_format)
+                    if error:
+                        _LOG.warning("MQTT message on %s: %s", topic_in, error)
+                        return
+                    queue.push_many(RangeUpdate(scenario, source, destination, distance)
+                                    for source, destination, distance in ranges)
 
                 # stop existing streamer first
                 if getattr(self, '_mqtt_streamer', None):
@@ -172,7 +257,9 @@ class DataTab(BaseTab):
             # SSE selected - use current behavior
             url = self.url_input.text().strip()
             if url:
-                self.scenario.start_streaming(url)
+                self._stop_sse_streaming()
+                self._sse_scenario = self.scenario
+                self._sse_scenario.start_streaming(url, sink=self.main_window.ingestion_queue)
             else:
                 # revert to off and notify
                 self.stream_mode_off.setChecked(True)
@@ -180,12 +267,130 @@ class DataTab(BaseTab):
                     self.main_window.statusBar().showMessage("Please enter a valid Streaming URL for SSE.", 5000)
                 except Exception:
                     pass
+        elif selected_id == 3:
+            # follow a growing rtt-log CSV
+            path = self.url_input.text().strip()
+            try:
+                self._stop_tail_streamer()
+                scenario = self.scenario
+                queue = self.main_window.ingestion_queue
+                self._tail_streamer = TailStreamer(
+                    lambda rows: queue.push_many(RangeUpdate(scenario, anchor, tag, distance)
+                                                 for anchor, tag, distance in resolve_log_rows(scenario, rows)))
+                self._tail_streamer.start(path)
+                try:
+                    self.main_window.statusBar().showMessage(f"Following {path}", 5000)
+                except Exception:
+                    pass
+            except Exception as e:
+                _LOG.warning("Failed to follow CSV '%s': %s", path, e)
+                self._tail_streamer = None
+                self.stream_mode_off.setChecked(True)
+                try:
+                    self.main_window.statusBar().showMessage("Please enter the path of an existing rtt-log CSV.", 5000)
+                except Exception:
+                    pass
+        elif selected_id == 4:
+            # replay through the same ingestion path as live streams
+            path = self.url_input.text().strip()
+            try:
+                self._stop_replay()
+                scenario = self.scenario
+                items = source_items(path, scenario)
+                self._replayer = Replayer(self.main_window.ingestion_queue,
+                                          parse_speed(self.replay_speed_combo.currentText()))
+                self._replayer.start(scenario, items,
+                                     on_done=lambda stats: _LOG.info("Replay of %s finished: %s", path, stats))
+                try:
+                    self.main_window.statusBar().showMessage(f"Replaying {path}", 5000)
+                except Exception:
+                    pass
+            except Exception as e:
+                _LOG.warning("Failed to replay '%s': %s", path, e)
+                self._replayer = None
+                self.stream_mode_off.setChecked(True)
+                try:
+                    self.main_window.statusBar().showMessage("Please enter a recording, .stream file or scenario folder.", 5000)
+                except Exception:
+                    pass
         else:
             # No selection or unknown id - treat as off
-            self.scenario.stop_streaming()
+            self._stop_sse_streaming()
             _LOG.info("Streaming turned off (unknown selection).")
             try:
                 self.main_window.statusBar().showMessage("Streaming turned off.", 3000)
             except Exception:
                 pass
 
+    def update_overload_policy(self):
+        """Apply the selected overload policy and buffer size to the ingestion queue."""
+        self.main_window.ingestion_queue.configure(self.policy_combo.currentData(), self.capacity_spin.value())
+
+    def update_epoch_config(self):
+        """Enable, disable or re-time the epoch grouping of streamed ranges."""
+        window = self.epoch_window_spin.value()
+        collector = self.main_window.epoch_collector
+        if not self.epoch_checkbox.isChecked():
+            self.main_window.epoch_collector = None
+        elif collector is None:
+            self.main_window.epoch_collector = EpochCollector(window)
+        else:
+            collector.configure(window)
+
+    def update_stream_stats(self):
+        """Show the received/coalesced/dropped counters of the ingestion queue."""
+        if self.stats_label is None:
+            return
+        stats = self.main_window.ingestion_queue.stats()
+        text = f"Received: {stats['received']}  Coalesced: {stats['coalesced']}  Dropped: {stats['dropped']}"
+        collector = self.main_window.epoch_collector
+        if collector is not None:
+            text += f"\nEpochs: {collector.epochs_out} from {collector.ranges_in} ranges"
+        self.stats_label.setText(text)
+
+    def toggle_recording(self, checked):
+        """Start or stop recording every update pushed into the ingestion queue."""
+        queue = self.main_window.ingestion_queue
+        if not checked:
+            if self._recorder is not None:
+                queue.remove_tap(self._recorder.record_many)
+                self._recorder.close()
+                try:
+                    self.main_window.statusBar().showMessage(
+                        f"Recorded {self._recorder.count} updates to {self._recorder.path}", 5000)
+                except Exception:
+                    pass
+                self._recorder = None
+            self.record_button.setText("Record stream...")
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self.main_window, "Record Stream", "",
+                                              f"GDOP stream recordings (*{RECORDING_SUFFIX})")
+        if not path:
+            self.record_button.setChecked(False)
+            return
+        if not path.endswith(RECORDING_SUFFIX):
+            path += RECORDING_SUFFIX
+        try:
+            self._recorder = StreamRecorder(path)
+        except Exception as e:
+            _LOG.warning("Failed to start recording to '%s': %s", path, e)
+            self.record_button.setChecked(False)
+            return
+        queue.add_tap(self._recorder.record_many)
+        self.record_button.setText("Stop recording")
+
+    def _stop_replay(self):
+        if self._replayer is not None:
+            self._replayer.stop()
+            self._replayer = None
+
+    def _stop_sse_streaming(self):
+        if self._sse_scenario is not None:
+            self._sse_scenario.stop_streaming()
+            self._sse_scenario = None
+
+    def _stop_tail_streamer(self):
+        if self._tail_streamer is not None:
+            self._tail_streamer.stop()
+            self._tail_streamer = None
@@ -2,7 +2,7 @@
 Display tab for the GDOP application.
 """
 
-from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem, QCheckBox
+from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem, QCheckBox, QSpinBox, QLabel, QWidget, QHBoxLayout, QComboBox
 from .base_tab import BaseTab
 
 
@@ -22,7 +22,14 @@ class DisplayTab(BaseTab):
         self.right_click_anchors_checkbox = None
         self.gdop_checkbox = None
         self.tag_labels_checkbox = None
+        self.smoothed_tags_checkbox = None
+        self.trajectories_checkbox = None
+        self.decimation_combo = None
         self.drag_anchors_checkbox = None
+        self.blitting_checkbox = None
+        self.background_compute_checkbox = None
+        self.frame_rate_spin = None
+        self.timings_label = None
     
     @property
     def tab_name(self):
@@ -86,6 +93,18 @@ class DisplayTab(BaseTab):
         self.display_tree.setItemWidget(tag_labels_item, 0, tag_labels_checkbox)
         self.tag_labels_checkbox = tag_labels_checkbox  # Save reference
 
+        self.smoothed_tags_checkbox = QCheckBox("Smooth Tag Positions (Kalman)")
+        self.smoothed_tags_checkbox.setChecked(self.display_config.showSmoothedTags)
+        self.smoothed_tags_checkbox.stateChanged.connect(self.update_display_config)
+        smoothed_tags_item = QTreeWidgetItem(tag_anchor_node)
+        self.display_tree.setItemWidget(smoothed_tags_item, 0, self.smoothed_tags_checkbox)
+
+        self.trajectories_checkbox = QCheckBox("Show Tag Trajectories")
+        self.trajectories_checkbox.setChecked(self.display_config.showTrajectories)
+        self.trajectories_checkbox.stateChanged.connect(self.update_display_config)
+        trajectories_item = QTreeWidgetItem(tag_anchor_node)
+        self.display_tree.setItemWidget(trajectories_item, 0, self.trajectories_checkbox)
+
         # Interaction section
         interaction_node = QTreeWidgetItem(self.display_tree, ["Interaction"])
         self.right_click_anchors_checkbox = QCheckBox("Enable Right-Click Anchor Control")
@@ -107,6 +126,54 @@ class DisplayTab(BaseTab):
         drag_anchors_item = QTreeWidgetItem(interaction_node)
         self.display_tree.setItemWidget(drag_anchors_item, 0, self.drag_anchors_checkbox)
 
+        self.blitting_checkbox = QCheckBox("Fast Redraw While Dragging (Blitting)")
+        self.blitting_checkbox.setChecked(self.display_config.useBlitting)
+        self.blitting_checkbox.stateChanged.connect(self.update_display_config)
+        blitting_item = QTreeWidgetItem(interaction_node)
+        self.display_tree.setItemWidget(blitting_item, 0, self.blitting_checkbox)
+
+        # Performance section
+        performance_node = QTreeWidgetItem(self.display_tree, ["Performance"])
+        scheduler = self.main_window.refresh_scheduler
+        frame_rate_widget = QWidget()
+        frame_rate_layout = QHBoxLayout(frame_rate_widget)
+        frame_rate_layout.setContentsMargins(0, 0, 0, 0)
+        frame_rate_layout.addWidget(QLabel("Max Refresh Rate"))
+        self.frame_rate_spin = QSpinBox()
+        self.frame_rate_spin.setRange(1, 120)
+        self.frame_rate_spin.setSuffix(" Hz")
+        self.frame_rate_spin.setValue(int(scheduler.frame_rate))
+        self.frame_rate_spin.valueChanged.connect(self.update_frame_rate)
+        frame_rate_layout.addWidget(self.frame_rate_spin)
+        frame_rate_item = QTreeWidgetItem(performance_node)
+        self.display_tree.setItemWidget(frame_rate_item, 0, frame_rate_widget)
+
+        decimation_widget = QWidget()
+        decimation_layout = QHBoxLayout(decimation_widget)
+        decimation_layout.setContentsMargins(0, 0, 0, 0)
+        decimation_layout.addWidget(QLabel("Trajectory Decimation"))
+        self.decimation_combo = QComboBox()
+        self.decimation_combo.addItem("LTTB", "lttb")
+        self.decimation_combo.addItem("Min/Max", "minmax")
+        self.decimation_combo.setCurrentIndex(max(0, self.decimation_combo.findData(self.display_config.trajectoryDecimation)))
+        self.decimation_combo.currentIndexChanged.connect(self.update_display_config)
+        decimation_layout.addWidget(self.decimation_combo)
+        decimation_item = QTreeWidgetItem(performance_node)
+        self.display_tree.setItemWidget(decimation_item, 0, decimation_widget)
+
+        self.background_compute_checkbox = QCheckBox("Compute Positions in Background")
+        self.background_compute_checkbox.setChecked(self.display_config.computeInBackground)
+        self.background_compute_checkbox.stateChanged.connect(self.update_display_config)
+        background_compute_item = QTreeWidgetItem(performance_node)
+        self.display_tree.setItemWidget(background_compute_item, 0, self.background_compute_checkbox)
+
+        self.timings_label = QLabel("")
+        self.timings_label.setToolTip("Last refresh time per view (mean in parentheses)")
+        timings_item = QTreeWidgetItem(performance_node)
+        self.display_tree.setItemWidget(timings_item, 0, self.timings_label)
+        performance_node.setExpanded(True)
+        scheduler.refreshed.connect(self.update_timings)
+
         return self.display_tree
 
     def update_display_config(self):
@@ -121,6 +188,23 @@ class DisplayTab(BaseTab):
         self.display_config.rightClickAnchors = self.right_click_anchors_checkbox.isChecked()
         self.display_config.showGDOP = self.gdop_checkbox.isChecked()
         self.display_config.showTagLabels = self.tag_labels_checkbox.isChecked()
+        self.display_config.showSmoothedTags = self.smoothed_tags_checkbox.isChecked()
         self.display_config.dragAnchors = self.drag_anchors_checkbox.isChecked()
-
-        self.main_window.update_all()
+        self.display_config.useBlitting = self.blitting_checkbox.isChecked()
+        self.display_config.showTrajectories = self.trajectories_checkbox.isChecked()
+        self.display_config.trajectoryDecimation = self.decimation_combo.currentData()
+        self.display_config.computeInBackground = self.background_compute_checkbox.isChecked()
+        self.main_window.compute_worker.background = self.display_config.computeInBackground
+
+        self.main_window.request_refresh(anchors=True, tags=True, measurements=True)
+
+    def update_frame_rate(self):
+        self.main_window.refresh_scheduler.frame_rate = self.frame_rate_spin.value()
+
+    def update_timings(self):
+        if self.timings_label is None:
+            return
+        stats = self.main_window.refresh_scheduler.stats()
+        parts = [f"{view} {timing['last_ms']:.0f} ms ({timing['mean_ms']:.0f})"
+                 for view, timing in stats["views"].items()]
+        self.timings_label.setText(", ".join(parts) + f" | {stats['refreshes']} frames / {stats['requests']} requests")
@@ -49,12 +49,12 @@ class SandboxTab(BaseTab):
     def slider_changed(self):
         """Handle slider value changes."""
         self.scenario.sigma = self.slider.value() / self.SIGMA_SLIDER_RESOLUTION
-        self.main_window.update_all()
+        self.main_window.request_refresh(anchors=True, tags=True, measurements=True)
 
     def sigma_input_changed(self):
         """Handle sigma input value changes."""
         self.scenario.sigma = self.sigma_input.value()
-        self.main_window.update_all()
+        self.main_window.request_refresh(anchors=True, tags=True, measurements=True)
         
     def update_sandbox(self):
         """Update sandbox controls with current scenario values."""
@@ -0,0 +1,404 @@
+"""
+Item model and delegate behind the Tree tab.
+
+`ScenarioTreeModel` exposes the workspace scenarios, and for imported ones
+their stations and measurements, to a QTreeView:
+
+    scenario            check state = imported, bold = active
+        Stations        one row per station (name, anchor position)
+        Measurements    one row per measurement (pair, distance)
+
+The model keeps its own row lists and `sync` compares them with the scenarios,
+so a refresh only emits the inserts, removes and value changes that actually
+happened instead of rebuilding the tree. Rows are rendered by the view on
+demand, which keeps tens of thousands of measurements cheap. Row actions
+(activate, edit, delete) are painted and handled by `ActionDelegate`
+instead of per-row widgets.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from PyQt5.QtCore import QAbstractItemModel, QEvent, QModelIndex, QRect, Qt, pyqtSignal
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton, QToolTip
+
+from simulation.station import Anchor
+
+NAME_COLUMN = 0
+VALUE_COLUMN = 1
+
+ACTIVATE = "activate"
+EDIT = "edit"
+DELETE = "delete"
+# action -> (button text, tooltip)
+ACTIONS = {
+    ACTIVATE: ("⏿", "Activate this scenario in the main plot"),
+    EDIT: ("✎", "Edit station (name and coordinates)"),
+    DELETE: ("␡", "Delete station"),
+}
+
+
+class _Node:
+    """Scenario or group row; leaf rows (stations, measurements) have no node of their own."""
+
+    __slots__ = ("parent", "row", "name", "scenario", "kind", "children", "items", "values")
+
+    def __init__(self, parent, row, name, scenario=None, kind=None):
+        self.parent = parent
+        self.row = row
+        self.name = name
+        self.scenario = scenario
+        # None for scenario rows, "stations" or "measurements" for groups
+        self.kind = kind
+        self.children: List["_Node"] = []
+        # stations or measurement pairs shown below a group, and what their rows showed last
+        self.items: list = []
+        self.values: list = []
+
+
+class ScenarioTreeModel(QAbstractItemModel):
+    HEADERS = ("Name", "Value")
+    STATIONS = "stations"
+    MEASUREMENTS = "measurements"
+
+    def __init__(self, scenarios: Callable[[], list], active: Callable[[], object],
+                 toggle: Optional[Callable[[str, int], None]] = None, parent=None):
+        """
+        Args:
+            scenarios: Returns the imported scenarios
+            active: Returns the scenario shown in the main plot
+            toggle: Called with (scenario_name, Qt check state) when a scenario's check box is clicked
+            parent: Qt parent
+        """
+        super().__init__(parent)
+        self._scenarios = scenarios
+        self._active = active
+        self._toggle = toggle
+        self._root = _Node(None, 0, "")
+        self._active_scenario = None
+
+    # --- structure --------------------------------------------------------
+
+    def _node(self, index: QModelIndex) -> _Node:
+        """Node of a scenario or group index (the root for an invalid index)."""
+        if not index.isValid():
+            return self._root
+        return index.internalPointer().children[index.row()]
+
+    def is_leaf(self, index: QModelIndex) -> bool:
+        return index.isValid() and index.internalPointer().kind is not None
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        # every index points at its parent node
+        return self.createIndex(row, column, self._node(parent))
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent_node = index.internalPointer()
+        if parent_node is self._root:
+            return QModelIndex()
+        return self.createIndex(parent_node.row, 0, parent_node.parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        if self.is_leaf(parent):
+            return 0
+        node = self._node(parent)
+        return len(node.items) if node.kind is not None else len(node.children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    # --- content ----------------------------------------------------------
+
+    def item(self, index: QModelIndex):
+        """Station, measurement pair, or scenario node of an index."""
+        if self.is_leaf(index):
+            return index.internalPointer().items[index.row()]
+        return self._node(index)
+
+    def scenario_of(self, index: QModelIndex):
+        node = index.internalPointer() if self.is_leaf(index) else self._node(index)
+        while node is not None and node.parent is not self._root:
+            node = node.parent
+        return node.scenario if node is not None else None
+
+    def actions(self, index: QModelIndex) -> List[str]:
+        """Buttons shown for a row (in the value column)."""
+        if index.column() != VALUE_COLUMN or not index.isValid():
+            return []
+        if self.is_leaf(index):
+            return [EDIT, DELETE] if index.internalPointer().kind == self.STATIONS else []
+        node = self._node(index)
+        if node.kind is None and node.scenario is not None and node.scenario is not self._active_scenario:
+            return [ACTIVATE]
+        return []
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+
+        if self.is_leaf(index):
+            group = index.internalPointer()
+            entry = group.items[index.row()]
+            if role != Qt.DisplayRole:
+                return None
+            if group.kind == self.STATIONS:
+                if column == NAME_COLUMN:
+                    return str(entry.name)
+                if isinstance(entry, Anchor):
+                    x, y = entry.position()[:2]
+                    return f"({x:.2f}, {y:.2f})"
+                return "tag"
+            if column == NAME_COLUMN:
+                first, second = tuple(entry)
+                return f"{first.name} ↔ {second.name}"
+            distance = group.scenario.measurements.relation.get(entry)
+            return f"{distance:.2f}" if distance is not None else ""
+
+        node = self._node(index)
+        if node.kind is not None:
+            if role == Qt.DisplayRole:
+                if column == NAME_COLUMN:
+                    return "Stations" if node.kind == self.STATIONS else "Measurements"
+                return str(len(node.items))
+            return None
+
+        if role == Qt.DisplayRole:
+            if column == NAME_COLUMN:
+                return node.name
+            return "active" if node.scenario is not None and node.scenario is self._active_scenario else ""
+        if role == Qt.CheckStateRole and column == NAME_COLUMN:
+            return Qt.Checked if node.scenario is not None else Qt.Unchecked
+        if role == Qt.FontRole and node.scenario is not None and node.scenario is self._active_scenario:
+            font = QFont()
+            font.setBold(True)
+            return font
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if not self.is_leaf(index) and index.column() == NAME_COLUMN:
+            node = self._node(index)
+            # the active scenario cannot be removed
+            if node.kind is None and (node.scenario is None or node.scenario is not self._active_scenario):
+                flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or self.is_leaf(index) or self._toggle is None:
+            return False
+        node = self._node(index)
+        if node.kind is not None:
+            return False
+        self._toggle(node.name, Qt.Checked if value == Qt.Checked else Qt.Unchecked)
+        # the toggle may have been cancelled; the check state always follows the scenarios
+        self.sync()
+        return True
+
+    # --- incremental updates ----------------------------------------------
+
+    def set_scenario_names(self, names: List[str]):
+        """Set the scenario rows (workspace scenarios); rows keep their children where names persist."""
+        wanted = list(dict.fromkeys(names))
+        current = [child.name for child in self._root.children]
+        if current != wanted:
+            keep = set(wanted)
+            self._remove_runs(QModelIndex(), self._root.children,
+                              [row for row, name in enumerate(current) if name not in keep],
+                              renumber=True)
+            present = {child.name for child in self._root.children}
+            for name in wanted:
+                if name in present:
+                    continue
+                # insert in the position of the wanted order among the present rows
+                row = sum(1 for child in self._root.children if wanted.index(child.name) < wanted.index(name))
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._root.children.insert(row, _Node(self._root, row, name))
+                self._renumber(self._root.children)
+                self.endInsertRows()
+                present.add(name)
+        self.sync()
+
+    def sync(self):
+        """Bring the rows in line with the scenarios, emitting only the changes."""
+        imported: Dict[str, object] = {}
+        for scenario in self._scenarios():
+            imported.setdefault(str(scenario.name), scenario)
+        active = self._active()
+        previous_active = self._active_scenario
+        self._active_scenario = active
+
+        for node in self._root.children:
+            scenario = imported.get(node.name)
+            scenario_index = self.createIndex(node.row, NAME_COLUMN, self._root)
+            if scenario is not node.scenario:
+                if node.children:
+                    self.beginRemoveRows(scenario_index, 0, len(node.children) - 1)
+                    node.children = []
+                    self.endRemoveRows()
+                node.scenario = scenario
+                if scenario is not None:
+                    self.beginInsertRows(scenario_index, 0, 1)
+                    node.children = [_Node(node, 0, "Stations", scenario, self.STATIONS),
+                                     _Node(node, 1, "Measurements", scenario, self.MEASUREMENTS)]
+                    self.endInsertRows()
+                self._changed(self._root, node.row)
+            elif scenario is not None and (scenario is active) != (scenario is previous_active):
+                self._changed(self._root, node.row)
+
+            renamed = False
+            for group in node.children:
+                if group.kind == self.STATIONS:
+                    renamed = self._sync_items(group, list(scenario.stations))
+                else:
+                    self._sync_items(group, list(scenario.measurements.relation), all_changed=renamed)
+
+    def _sync_items(self, group: _Node, wanted: list, all_changed: bool = False) -> bool:
+        """Sync the rows of a group; returns whether a station name changed."""
+        group_index = self.createIndex(group.row, NAME_COLUMN, group.parent)
+        if group.items != wanted:
+            # new rows are appended (stations and measurements are only ever appended);
+            # anything else is an order change and replaces the rows
+            keep = set(wanted)
+            self._remove_runs(group_index, group.items, [row for row, item in enumerate(group.items) if item not in keep])
+            present = set(group.items)
+            added = [item for item in wanted if item not in present]
+            if added:
+                self.beginInsertRows(group_index, len(group.items), len(group.items) + len(added) - 1)
+                group.items.extend(added)
+                self.endInsertRows()
+            if group.items != wanted:
+                self._remove_runs(group_index, group.items, list(range(len(group.items))))
+                self.beginInsertRows(group_index, 0, len(wanted) - 1)
+                group.items = list(wanted)
+                self.endInsertRows()
+            self._changed(group.parent, group.row)
+
+        # report only rows whose name, position or distance changed
+        values = self._values(group)
+        old = group.values
+        if all_changed:
+            changed = list(range(len(values)))
+        elif values == old:
+            changed = []
+        else:
+            changed = [row for row, value in enumerate(values) if row >= len(old) or old[row] != value]
+        renamed = group.kind == self.STATIONS and any(
+            row < len(old) and old[row][0] != values[row][0] for row in changed)
+        group.values = values
+        runs = []
+        for row in changed:
+            if runs and row == runs[-1][1] + 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        for first, last in runs:
+            self.dataChanged.emit(self.createIndex(first, NAME_COLUMN, group),
+                                  self.createIndex(last, VALUE_COLUMN, group), [Qt.DisplayRole])
+        return renamed
+
+    def _values(self, group: _Node) -> list:
+        if group.kind == self.STATIONS:
+            return [(station.name, tuple(station.position()) if isinstance(station, Anchor) else None)
+                    for station in group.items]
+        # measurement rows also show station names; a rename marks all of them changed (see sync)
+        relation = group.scenario.measurements.relation
+        return [relation.get(pair) for pair in group.items]
+
+    def _remove_runs(self, parent_index: QModelIndex, rows_list: list, rows: List[int], renumber: bool = False):
+        """Remove the given rows, one beginRemoveRows per contiguous run (from the end)."""
+        runs = []
+        for row in rows:
+            if runs and row == runs[-1][1] + 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        for first, last in reversed(runs):
+            self.beginRemoveRows(parent_index, first, last)
+            del rows_list[first:last + 1]
+            if renumber:
+                self._renumber(rows_list)
+            self.endRemoveRows()
+
+    @staticmethod
+    def _renumber(nodes: List[_Node]):
+        for row, node in enumerate(nodes):
+            node.row = row
+
+    def _changed(self, parent_node: _Node, row: int):
+        self.dataChanged.emit(self.createIndex(row, NAME_COLUMN, parent_node),
+                              self.createIndex(row, VALUE_COLUMN, parent_node))
+
+    def scenario_index(self, scenario) -> QModelIndex:
+        for node in self._root.children:
+            if node.scenario is scenario:
+                return self.createIndex(node.row, NAME_COLUMN, self._root)
+        return QModelIndex()
+
+
+class ActionDelegate(QStyledItemDelegate):
+    """Paints the row actions of `ScenarioTreeModel.actions` as buttons and reports clicks."""
+
+    action_triggered = pyqtSignal(object, str)
+
+    BUTTON_WIDTH = 26
+
+    def _button_rects(self, option, actions) -> List[QRect]:
+        rect = option.rect
+        return [QRect(rect.right() - (len(actions) - i) * self.BUTTON_WIDTH + 1, rect.top(), self.BUTTON_WIDTH, rect.height())
+                for i in range(len(actions))]
+
+    def paint(self, painter, option, index):
+        actions = index.model().actions(index)
+        if not actions:
+            super().paint(painter, option, index)
+            return
+        rects = self._button_rects(option, actions)
+        text_option = type(option)(option)
+        text_option.rect = QRect(option.rect.left(), option.rect.top(),
+                                 rects[0].left() - option.rect.left(), option.rect.height())
+        super().paint(painter, text_option, index)
+
+        style = option.widget.style() if option.widget is not None else QApplication.style()
+        for action, rect in zip(actions, rects):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = ACTIONS[action][0]
+            button.state = QStyle.State_Enabled
+            style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def _action_at(self, option, index, pos) -> Optional[str]:
+        actions = index.model().actions(index)
+        for action, rect in zip(actions, self._button_rects(option, actions)):
+            if rect.contains(pos):
+                return action
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            action = self._action_at(option, index, event.pos())
+            if action is not None:
+                self.action_triggered.emit(index, action)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if event is not None and event.type() == QEvent.ToolTip:
+            action = self._action_at(option, index, event.pos())
+            if action is not None:
+                QToolTip.showText(event.globalPos(), ACTIONS[action][1], view)
+                return True
+        return super().helpEvent(event, view, option, index)
@@ -1,20 +1,22 @@
 
 from PyQt5.QtWidgets import (
-    QTreeWidget,
-    QTreeWidgetItem,
-    QWidget,
-    QHBoxLayout,
+    QTreeView,
+    QHeaderView,
     QLabel,
-    QPushButton,
     QCheckBox,
 )
 from .base_tab import BaseTab
+from .scenario_tree_model import ScenarioTreeModel, ActionDelegate, ACTIVATE, EDIT, DELETE
 from PyQt5.QtWidgets import QInputDialog
-from simulation.station import Anchor
-from data.importer import get_available_scenarios, validate_scenario_for_import
+from data.importer import get_available_scenarios
 from data import importer as importer_module
-from PyQt5.QtWidgets import QComboBox, QFormLayout, QDialog, QVBoxLayout
-from PyQt5.QtWidgets import QLabel, QDialogButtonBox
+from data.workspace_watcher import WorkspaceWatcher, WorkspaceChange
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QComboBox, QFormLayout, QDialog, QVBoxLayout, QSpinBox
+from PyQt5.QtWidgets import QDialogButtonBox
+import logging
+
+_LOG = logging.getLogger(__name__)
 
 
 class AggregationMethodDialog(QDialog):
@@ -41,6 +43,26 @@ class AggregationMethodDialog(QDialog):
         self.combo.addItems(["lowest", "newest", "mean", "median"])
         self.combo.setCurrentIndex(0)
         form.addRow("Method:", self.combo)
+
+        # optional time-windowed track; 0 keeps the single aggregated position only
+        self.window_spin = QSpinBox()
+        self.window_spin.setRange(0, 600000)
+        self.window_spin.setSingleStep(1000)
+        self.window_spin.setSuffix(" ms")
+        self.window_spin.setSpecialValueText("off")
+        self.window_spin.setToolTip("Slide a time window over the logs and compute a position track")
+        form.addRow("Track window:", self.window_spin)
+
+        self.robust_checkbox = QCheckBox("Reject outlier ranges (RANSAC)")
+        self.robust_checkbox.setToolTip("Drop APs whose range disagrees with the consensus of the others")
+        form.addRow(self.robust_checkbox)
+
+        self.calibration_combo = QComboBox()
+        self.calibration_combo.addItem("off", None)
+        self.calibration_combo.addItem("offset + scale", "linear")
+        self.calibration_combo.addItem("offset + scale + RSSI", "rssi")
+        self.calibration_combo.setToolTip("Correct ranges per AP with a bias model fitted over all logs of the workspace")
+        form.addRow("Range calibration:", self.calibration_combo)
         layout.addLayout(form)
 
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -53,108 +75,132 @@ class AggregationMethodDialog(QDialog):
     def get_method(self):
         return self.combo.currentText()
 
+    def get_track_window(self):
+        return self.window_spin.value() or None
+
+    def get_robust(self):
+        return self.robust_checkbox.isChecked()
+
+    def get_calibration(self):
+        return self.calibration_combo.currentData()
+
 
 class TreeTab(BaseTab):
 
+    WORKSPACE_DIR = "workspace"
+    WORKSPACE_POLL_MS = 2000
+
     def __init__(self, main_window):
         super().__init__(main_window)
         self.tree = None
+        self.model = None
+        self.delegate = None
+        self._selected_scenario = None
+        self._watcher = None
+        self._watch_timer = None
 
     @property
     def tab_name(self):
         return "Tree"
 
     def create_widget(self):
-        self.tree = QTreeWidget()
-        self.tree.setHeaderHidden(True)
-        self.update_tree()
+        self.model = ScenarioTreeModel(lambda: self.main_window.app.scenarios,
+                                       lambda: self.main_window.trilat_plot.scenario,
+                                       toggle=self._toggle_scenario)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.header().setStretchLastSection(False)
+        self.tree.header().resizeSection(1, 200)
+        self.delegate = ActionDelegate(self.tree)
+        self.delegate.action_triggered.connect(self._on_action)
+        self.tree.setItemDelegate(self.delegate)
+        self.tree.doubleClicked.connect(self._on_double_click)
+        self.reload_scenario_names()
+        self._start_workspace_watcher()
         return self.tree
 
-    def update_tree(self):
-        if not self.tree:
-            return
-
-        self.tree.clear()
-
-        app = self.main_window.app
-        scenarios = app.scenarios
-
-        active = self.main_window.trilat_plot.scenario
-
-        scenario_names, error_message = get_available_scenarios()
-        for scen_name in scenario_names:
-            scen_node = QTreeWidgetItem(self.tree)
-            #scen_node.setExpanded(True)
-
-            row_widget = QWidget()
-            row_layout = QHBoxLayout()
-            row_layout.setContentsMargins(0, 0, 0, 0)
-
-            checkbox = QCheckBox()
-            is_imported = scen_name in [s.name for s in scenarios]
-            checkbox.setChecked(is_imported)
-            checkbox.stateChanged.connect(lambda state, name=scen_name: self._toggle_scenario(name, state))
-
-            name_label = QLabel(scen_name)
+    def _start_workspace_watcher(self):
+        """Poll the workspace so logger drops re-import only the affected scenarios."""
+        self._watcher = WorkspaceWatcher(self.WORKSPACE_DIR)
+        self._watch_timer = QTimer(self.tree)
+        self._watch_timer.timeout.connect(self._poll_workspace)
+        self._watch_timer.start(self.WORKSPACE_POLL_MS)
 
-            row_layout.addWidget(checkbox)
-            row_layout.addWidget(name_label)
-            row_layout.addStretch()
-
-            if is_imported:
-                scen = next(s for s in scenarios if s.name == scen_name)
-
-                if active is not scen:
-                    activate_button = QPushButton("⏿")
-                    activate_button.setToolTip("Activate this scenario in the main plot")
-                    activate_button.clicked.connect(lambda checked, s=scen: self._activate_scenario(s))
-
-                    row_layout.addWidget(activate_button)
-
-                if active is scen:
-                    self.tree.setCurrentItem(scen_node)
-                    checkbox.setEnabled(False)  # Prevent unchecking the active scenario
-
-                stations_node = QTreeWidgetItem(scen_node, ["Stations"]) 
-                #stations_node.setExpanded(True)
-                for station in scen.stations:
-                    station_node = QTreeWidgetItem(stations_node)
-
-                    station_widget = QWidget()
-                    layout = QHBoxLayout()
-                    layout.setContentsMargins(0, 0, 0, 0)
-
-                    name_label = QLabel(station.name)
-                    rename_button = QPushButton("✎")
-                    rename_button.setToolTip("Edit station (name and coordinates)")
-                    rename_button.clicked.connect(lambda checked, s=station: self.rename_station_dialog(s))
-
-                    delete_button = QPushButton("␡")
-                    delete_button.setToolTip("Delete station")
-                    delete_button.clicked.connect(lambda checked, s=station: self._delete_station(s))
-
-                    layout.addWidget(name_label)
-                    layout.addStretch()
-                    layout.addWidget(rename_button)
-                    layout.addWidget(delete_button)
-                    station_widget.setLayout(layout)
+    def _poll_workspace(self):
+        changes = self._watcher.poll()
+        if not changes:
+            return
 
-                    self.tree.setItemWidget(station_node, 0, station_widget)
+        imported = {s.name: s for s in self.main_window.app.scenarios}
+        refreshed = []
+        config_changed = False
+        for scen_name, scen_changes in changes.items():
+            scen = imported.get(scen_name)
+            if scen is None:
+                continue
+            reload_config = any(c.is_config for c in scen_changes)
+            ok, message = importer_module.refresh_scenario_data(scen, scen_name, workspace_dir=self.WORKSPACE_DIR, reload_config=reload_config)
+            if ok:
+                refreshed.append(scen_name)
+                config_changed = config_changed or reload_config
+            else:
+                _LOG.warning(message)
+
+        if refreshed:
+            self.main_window.request_refresh(anchors=config_changed, measurements=True)
+            try:
+                self.main_window.statusBar().showMessage(f"Re-imported {', '.join(refreshed)}", 3000)
+            except Exception:
+                pass
+        if any(c.kind in (WorkspaceChange.NEW, WorkspaceChange.REMOVED) for scen_changes in changes.values() for c in scen_changes):
+            # scenario folders may have appeared or disappeared
+            self.reload_scenario_names()
 
-                measurements_node = QTreeWidgetItem(scen_node, ["Measurements"]) 
-                #measurements_node.setExpanded(True)
-                for pair, distance in scen.measurements.relation.items():
-                    station1, station2 = pair
+    def reload_scenario_names(self):
+        """Re-read the scenario folders of the workspace (only needed when folders were added or removed)."""
+        if self.model is None:
+            return
+        scenario_names, error_message = get_available_scenarios(self.WORKSPACE_DIR)
+        if error_message:
+            _LOG.info(error_message)
+        self.model.set_scenario_names(scenario_names)
+        self._select_active()
 
-                    label = f"{station1.name} ↔ {station2.name}: {distance:.2f}"
-                    QTreeWidgetItem(measurements_node, [label])
-            row_widget.setLayout(row_layout)
+    def update_tree(self):
+        """Apply scenario, station and measurement changes to the tree incrementally."""
+        if self.model is None:
+            return
+        self.model.sync()
+        if self.main_window.trilat_plot.scenario is not self._selected_scenario:
+            self._select_active()
 
-            self.tree.setItemWidget(scen_node, 0, row_widget)
+    def _select_active(self):
+        active = self.main_window.trilat_plot.scenario
+        self._selected_scenario = active
+        index = self.model.scenario_index(active)
+        if index.isValid():
+            self.tree.setCurrentIndex(index)
 
     def update(self):
         self.update_tree()
 
+    def _on_action(self, index, action):
+        item = self.model.item(index)
+        if action == ACTIVATE:
+            self._activate_scenario(item.scenario)
+        elif action == EDIT:
+            self.rename_station_dialog(item)
+        elif action == DELETE:
+            self._delete_station(item)
+
+    def _on_double_click(self, index):
+        if index.isValid() and not index.parent().isValid():
+            scenario = self.model.scenario_of(index)
+            if scenario is not None and scenario is not self.main_window.trilat_plot.scenario:
+                self._activate_scenario(scenario)
+
     def rename_station_dialog(self, station):
         new_name, ok = QInputDialog.getText(self.main_window, "Rename Station", "New name:", text=station.name)
         if ok and new_name and new_name != station.name:
@@ -162,7 +208,7 @@ class TreeTab(BaseTab):
 
     def rename_station(self, station, new_name):
         station.name = new_name
-        self.main_window.update_all()
+        self.main_window.request_refresh(anchors=True, tags=True, measurements=True)
 
     def _delete_station(self, station):
         try:
@@ -171,7 +217,7 @@ class TreeTab(BaseTab):
             app = self.main_window.app
             for scen in app.scenarios:
                 scen.remove_station(station)
-        self.main_window.update_all()
+        self.main_window.request_refresh(anchors=True, tags=True, measurements=True)
         # TODO implement station removal function in station (stations need to know their scenario)
 
     def _activate_scenario(self, scen):
@@ -183,7 +229,7 @@ class TreeTab(BaseTab):
             plot.sandbox_tag = None
         # TODO fix SandboxTag handling
         plot.init_artists()
-        self.main_window.update_all()
+        self.main_window.request_refresh(anchors=True, tags=True, measurements=True)
 
     def _remove_scenario(self, scen):
         app = self.main_window.app
@@ -193,7 +239,7 @@ class TreeTab(BaseTab):
             plot.scenario = None
             plot.sandbox_tag = None
             plot.init_artists()
-        self.main_window.update_all()
+        self.main_window.request_refresh(anchors=True, tags=True, measurements=True)
 
     def _toggle_scenario(self, scen_name, state):
         from PyQt5.QtCore import Qt
@@ -228,9 +274,12 @@ class TreeTab(BaseTab):
             return
 
         agg_method = agg_dialog.get_method()
+        window_ms = agg_dialog.get_track_window()
+        robust = agg_dialog.get_robust()
+        calibration = agg_dialog.get_calibration()
 
         try:
-            success, message, imported_scenario = importer_module.import_scenario(scen_name, workspace_dir="workspace", agg_method=agg_method)
+            success, message, imported_scenario = importer_module.import_scenario(scen_name, workspace_dir="workspace", agg_method=agg_method, window_ms=window_ms, robust=robust, calibration=calibration)
         except Exception as e:
             success = False
             message = f"Import raised exception: {e}"
@@ -264,7 +313,7 @@ class TreeTab(BaseTab):
                     self.main_window.scenarios_tab.update()
             except Exception:
                 pass
-            self.main_window.update_all()
+            self.main_window.request_refresh(anchors=True, tags=True, measurements=True)
             try:
                 self.main_window.statusBar().showMessage(f"Imported scenario '{scen_name}' ({agg_method})", 5000)
             except Exception:
@@ -0,0 +1,236 @@
+"""
+Trajectory layer for the trilateration plot.
+
+Every trajectory is a `DecimatedLine`: a Line2D that keeps the full path in
+growable buffers and, right before it is drawn, decimates the part inside the
+current view to about one bucket per horizontal pixel (see
+simulation.decimation). Zooming or panning therefore re-decimates only the
+visible range, once per draw, and an hour-long track never draws more than a
+few vertices per pixel.
+
+Points appended by a live stream are decimated incrementally: complete buckets
+of the current bucket size are added to the drawn vertices, the incomplete
+rest is drawn as is. The whole line is decimated again when the view changes
+or the incremental part has grown as large as the last full decimation.
+"""
+
+import numpy as np
+from matplotlib.lines import Line2D
+
+from simulation.decimation import bucket_size_for, decimate_indices, DECIMATION_METHODS
+
+
+class DecimatedLine(Line2D):
+    INITIAL_CAPACITY = 256
+
+    def __init__(self, method: str = "lttb", **kwargs):
+        super().__init__([], [], **kwargs)
+        self._method = method
+        self._path_x = np.empty(self.INITIAL_CAPACITY)
+        self._path_y = np.empty(self.INITIAL_CAPACITY)
+        self._count = 0
+        # state of the last decimation
+        self._view = None
+        self._full = np.empty((0, 2))
+        self._streamed = []
+        self._streamed_count = 0
+        self._bucket_size = 1
+        self._done = 0
+        self._last_kept = None
+        # whether the drawn vertices end with the path point just before _done
+        self._connected = True
+
+    @property
+    def method(self) -> str:
+        return self._method
+
+    @method.setter
+    def method(self, value: str):
+        if value not in DECIMATION_METHODS:
+            raise ValueError(f"Unknown decimation method '{value}'")
+        if value != self._method:
+            self._method = value
+            self._invalidate()
+
+    def __len__(self):
+        return self._count
+
+    def vertex_count(self) -> int:
+        """Number of vertices drawn by the last draw."""
+        return len(self.get_xdata(orig=False))
+
+    def _invalidate(self):
+        self._view = None
+        self.stale = True
+
+    def set_path(self, x, y):
+        """Replace the whole path."""
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        self._path_x = x.copy()
+        self._path_y = y.copy()
+        self._count = len(x)
+        self._invalidate()
+
+    def append(self, x: float, y: float):
+        """Add one point to the end of the path."""
+        if self._count == len(self._path_x):
+            capacity = max(self.INITIAL_CAPACITY, 2 * len(self._path_x))
+            self._path_x = np.resize(self._path_x, capacity)
+            self._path_y = np.resize(self._path_y, capacity)
+        self._path_x[self._count] = x
+        self._path_y[self._count] = y
+        self._count += 1
+        self.stale = True
+
+    def clear(self):
+        self._count = 0
+        self._invalidate()
+
+    def _view_key(self):
+        ax = self.axes
+        return ax.get_xlim() + ax.get_ylim() + (int(ax.bbox.width), self._method)
+
+    def _decimate_view(self, view):
+        """Decimate the visible part of the path from scratch."""
+        xmin, xmax = sorted(view[0:2])
+        ymin, ymax = sorted(view[2:4])
+        n = self._count
+        x, y = self._path_x[:n], self._path_y[:n]
+        inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        # keep the neighbours of visible points, so segments crossing the view border are drawn
+        shown = inside.copy()
+        shown[1:] |= inside[:-1]
+        shown[:-1] |= inside[1:]
+        indices = np.flatnonzero(shown)
+
+        self._bucket_size = bucket_size_for(len(indices), max(view[4], 1))
+        pieces = []
+        self._last_kept = None
+        if len(indices):
+            # contiguous runs of shown points, separated by a NaN vertex
+            breaks = np.flatnonzero(np.diff(indices) > 1)
+            starts = np.concatenate([[indices[0]], indices[breaks + 1]])
+            stops = np.concatenate([indices[breaks], [indices[-1]]]) + 1
+            for start, stop in zip(starts, stops):
+                kept = decimate_indices(x[start:stop], y[start:stop], self._bucket_size, self._method) + start
+                if pieces:
+                    pieces.append(np.full((1, 2), np.nan))
+                pieces.append(np.column_stack([x[kept], y[kept]]))
+            if stops[-1] == n and len(pieces[-1]):
+                self._last_kept = tuple(pieces[-1][-1])
+        self._connected = n == 0 or (len(indices) > 0 and indices[-1] == n - 1)
+        self._full = np.concatenate(pieces) if pieces else np.empty((0, 2))
+        self._streamed = []
+        self._streamed_count = 0
+        self._done = n
+
+    def _decimate_appended(self):
+        """Decimate the complete buckets appended since the last decimation."""
+        n = self._count
+        buckets = (n - self._done) // self._bucket_size
+        if buckets == 0:
+            return
+        start, stop = self._done, self._done + buckets * self._bucket_size
+        x, y = self._path_x[start:stop], self._path_y[start:stop]
+        previous = self._last_kept if self._method == "lttb" else None
+        self._streamed.append(self._connection(start))
+        kept = decimate_indices(x, y, self._bucket_size, self._method, previous)
+        vertices = np.column_stack([x[kept], y[kept]])
+        self._streamed.append(vertices)
+        self._streamed_count += len(vertices)
+        if len(vertices):
+            self._last_kept = tuple(vertices[-1])
+            self._connected = True
+        self._done = stop
+
+    def _connection(self, start):
+        """Vertices that connect the drawn line to the path point before start, if the view cut it off."""
+        if self._connected or start == 0:
+            return np.empty((0, 2))
+        self._connected = True
+        return np.array([[np.nan, np.nan], [self._path_x[start - 1], self._path_y[start - 1]]])
+
+    def _refresh(self):
+        view = self._view_key()
+        if view != self._view:
+            self._decimate_view(view)
+            self._view = view
+        elif self._count > self._done:
+            self._decimate_appended()
+            if self._streamed_count > max(len(self._full), view[4]):
+                self._decimate_view(view)
+
+        tail = np.column_stack([self._path_x[self._done:self._count], self._path_y[self._done:self._count]])
+        if len(tail):
+            # the connection is drawn, but only kept once the tail turns into a streamed chunk
+            connected = self._connected
+            tail = np.concatenate([self._connection(self._done), tail])
+            self._connected = connected
+        vertices = np.concatenate([self._full] + self._streamed + [tail])
+        super().set_data(vertices[:, 0], vertices[:, 1])
+
+    def draw(self, renderer):
+        if self.axes is not None and self.get_visible():
+            self._refresh()
+        super().draw(renderer)
+
+
+class TrajectoryLayer:
+    def __init__(self, ax, method: str = "lttb"):
+        """
+        Args:
+            ax: Axes to draw the trajectories in
+            method: Decimation method, one of simulation.decimation.DECIMATION_METHODS
+        """
+        self._ax = ax
+        self._method = method
+        self._lines = {}
+        self._visible = True
+
+    @property
+    def method(self) -> str:
+        return self._method
+
+    @method.setter
+    def method(self, value: str):
+        self._method = value
+        for line in self._lines.values():
+            line.method = value
+
+    def _line(self, key, style):
+        line = self._lines.get(key)
+        if line is None:
+            line = DecimatedLine(self._method, **style)
+            line.set_visible(self._visible)
+            self._ax.add_line(line)
+            self._lines[key] = line
+        return line
+
+    def set_path(self, key, x, y, **style):
+        """Replace the trajectory of key (created with style on first use)."""
+        self._line(key, style).set_path(x, y)
+
+    def append(self, key, x: float, y: float, **style):
+        self._line(key, style).append(x, y)
+
+    def remove(self, key):
+        line = self._lines.pop(key, None)
+        if line is not None:
+            line.remove()
+
+    def clear(self):
+        for key in list(self._lines):
+            self.remove(key)
+
+    def keys(self):
+        return list(self._lines)
+
+    def artists(self):
+        return list(self._lines.values())
+
+    def set_visible(self, visible: bool):
+        self._visible = bool(visible)
+        for line in self._lines.values():
+            if line.get_visible() != self._visible:
+                line.set_visible(self._visible)
@@ -1,11 +1,15 @@
+import time
+
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.patches import Circle
+from matplotlib.collections import EllipseCollection, LineCollection
 
 from PyQt5.QtCore import pyqtSignal, QObject
 
-from simulation import station
+from simulation import geometry, station
 from simulation import SandboxScenario
+from simulation.tracking import MultiTagTracker, covariance_ellipses
+from presentation.trajectory import TrajectoryLayer
 
 
 class TrilatPlot(QObject):
@@ -16,6 +20,11 @@ class TrilatPlot(QObject):
     STATION_DOT_SIZE = 100
     STATION_COLOR = 'blue'
     CIRCLE_LINESTYLE = 'dotted'
+    # distance labels are only drawn for lines at least this long on screen, and at most this many
+    LABEL_MIN_PIXELS = 40
+    MAX_DISTANCE_LABELS = 100
+    # trajectory layer key of the scenario's imported track; live trails are keyed by their Tag
+    TRACK_KEY = "track"
 
     def __init__(self, window, scenario):
         super().__init__()
@@ -31,18 +40,38 @@ class TrilatPlot(QObject):
 
         self.anchor_plots = []
         self.anchor_scatter = None
-        self.circle_pairs = []
+        # bigger and smaller circle of every anchor in one collection
+        self.anchor_circles = None
         self.tag_estimate_scatter = None
-
-        self.anchor_pair_lines = []
+        # Kalman smoothing of the tag estimates (display_config.showSmoothedTags)
+        self.tracker = MultiTagTracker()
+        self.tag_covariance_ellipses = None
+        # imported track and live tag trails (display_config.showTrajectories)
+        self.trajectories = TrajectoryLayer(self.ax_trilat, self.display_config.trajectoryDecimation)
+        self._trajectory_scenario = None
+        self._trajectory_track = None
+
+        self.anchor_pair_collection = None
+        self.tag_anchor_collection = None
+        # pools of reusable Text artists, see _place_labels
         self.anchor_pair_texts = []
-        self.tag_anchor_lines = []
         self.tag_anchor_texts = []
         self.tag_name_texts = []
         self.anchor_name_texts = []
+        self._label_data = None
+        self._updating = False
+        # compute worker result the tags were last drawn from
+        self._tag_result = None
+        # measurements revision of the last result added to the trails and the tracker
+        self._trail_revision = None
 
         self.lines_plot = []
 
+        # blitting state (display_config.useBlitting): background without the moving artists
+        self._blitting = False
+        self._background = None
+        self._background_limits = None
+
         self.sandbox_tag = next((tag for tag in self.scenario.get_tag_list() if tag.name == "SANDBOX_TAG"), None)
         if self.sandbox_tag:
             self.tag_truth_plot = self.ax_trilat.scatter(self.scenario.tag_truth.position()[0], self.scenario.tag_truth.position()[1], c='green', s=self.STATION_DOT_SIZE, picker=True)
@@ -58,272 +87,342 @@ class TrilatPlot(QObject):
         self.fig.canvas.mpl_connect('motion_notify_event', self.on_mouse_move)
 
         self.fig.canvas.mpl_connect('resize_event', self._on_resize)
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        self.ax_trilat.callbacks.connect('xlim_changed', self._on_limits_changed)
+        self.ax_trilat.callbacks.connect('ylim_changed', self._on_limits_changed)
 
         self.init_artists()
 
 
     def update_anchors(self):
-        anchor_positions = self.scenario.anchor_positions()
+        anchor_positions = self.scenario.anchor_positions().reshape(-1, 2)
 
         # Update or create the anchor scatter
         if self.anchor_scatter is None:
-            if len(anchor_positions) > 0:
-                offsets = np.array(anchor_positions)
-                self.anchor_scatter = self.ax_trilat.scatter(offsets[:, 0], offsets[:, 1], c=self.STATION_COLOR, s=self.STATION_DOT_SIZE, picker=True)
-            else:
-                # create an empty 2D offsets array to avoid matplotlib IndexError
-                empty_offsets = np.empty((0, 2))
-                self.anchor_scatter = self.ax_trilat.scatter([], [], c=self.STATION_COLOR, s=self.STATION_DOT_SIZE, picker=True)
+            self.anchor_scatter = self.ax_trilat.scatter(anchor_positions[:, 0], anchor_positions[:, 1], c=self.STATION_COLOR, s=self.STATION_DOT_SIZE, picker=True)
         else:
-            if len(anchor_positions) > 0:
-                self.anchor_scatter.set_offsets(np.array(anchor_positions))
-            else:
-                # matplotlib expects a (N,2) array; provide empty shape to avoid indexing errors
-                self.anchor_scatter.set_offsets(np.empty((0, 2)))
-
-        # Ensure there are circle pairs for each anchor; create if missing
-        if len(self.circle_pairs) < len(anchor_positions):
-            for i in range(len(self.circle_pairs), len(anchor_positions)):
-                c1 = Circle((0, 0), 0, edgecolor=self.STATION_COLOR, facecolor='none', fill=False, linestyle=self.CIRCLE_LINESTYLE, linewidth=1.0, zorder=1)
-                c2 = Circle((0, 0), 0, edgecolor=self.STATION_COLOR, facecolor='none', fill=False, linestyle=self.CIRCLE_LINESTYLE, linewidth=1.0, zorder=1)
-                c1.set_visible(False)
-                c2.set_visible(False)
-                self.ax_trilat.add_patch(c1)
-                self.ax_trilat.add_patch(c2)
-                self.circle_pairs.append((c1, c2))
-
-        # If there are more circle_pairs than anchors (after removals), hide extras
-        for idx, (c1, c2) in enumerate(self.circle_pairs):
-            if idx < len(anchor_positions):
-                c1.set_visible(True)
-                c2.set_visible(True)
-                c1.set_center(anchor_positions[idx])
-                c2.set_center(anchor_positions[idx])
-            else:
-                c1.set_visible(False)
-                c2.set_visible(False)
+            self.anchor_scatter.set_offsets(anchor_positions)
 
-        # Keep anchor name texts in sync (hide extras)
-        for idx in range(len(anchor_positions), len(self.anchor_name_texts)):
-            try:
-                self.anchor_name_texts[idx].set_visible(False)
-            except Exception:
-                pass
+        # every anchor has a bigger and a smaller circle; radii are set in update_data
+        if self.anchor_circles is not None and len(self.anchor_circles.get_offsets()) != 2 * len(anchor_positions):
+            self._set_anchor_circles(anchor_positions, np.zeros(2 * len(anchor_positions)))
+
+    def _set_anchor_circles(self, anchor_positions, radii):
+        diameters = 2 * radii
+        self.anchor_circles.set_widths(diameters)
+        self.anchor_circles.set_heights(diameters)
+        self.anchor_circles.set_angles(np.zeros(len(diameters)))
+        self.anchor_circles.set_offsets(np.concatenate([anchor_positions, anchor_positions]).reshape(-1, 2))
+
+    @property
+    def interacting(self) -> bool:
+        """
+        True while a station is dragged. The plot then updates at reduced detail: no distance
+        or tag name labels, tag-anchor lines only from the dragged anchor, and trajectories
+        stay in the blitting background until the release.
+        """
+        return self.dragging_point is not None
 
     def update_data(self, anchors=False, tags=False, measurements=False):
 
-        anchor_positions = self.scenario.anchor_positions()
-        title = self.scenario.name
+        anchor_positions = self.scenario.anchor_positions().reshape(-1, 2)
+        anchor_count = len(anchor_positions)
 
-        tag_positions = self.scenario.tag_positions()
+        tag_list = self.scenario.get_tag_list()
+        computed_positions, new_positions = self._computed_tag_positions(tag_list)
+        tag_positions = np.asarray(self._tag_positions(computed_positions, new_positions), dtype=float).reshape(-1, 2)
+        self._update_trajectories(tag_list, computed_positions, new_positions)
         reference_tag = None
-        if self.sandbox_tag is not None:
+        if self.sandbox_tag is not None and self.sandbox_tag in tag_list:
             reference_tag = self.sandbox_tag
-        else:
-            tags = self.scenario.get_tag_list()
-            if len(tags) > 0:
-                reference_tag = tags[0]
+        elif len(tag_list) > 0:
+            reference_tag = tag_list[0]
 
-        if reference_tag is not None:
-            try:
-                distances_truth = reference_tag.distances()
-            except Exception:
-                distances_truth = self.scenario.tag_truth.distances()
+        if reference_tag is not None and anchor_count > 0:
+            # anchor distances to the computed (raw) estimate of the reference tag
+            distances_truth = geometry.euclidean_distances(
+                anchor_positions, computed_positions[tag_list.index(reference_tag)])
         else:
             distances_truth = self.scenario.tag_truth.distances()
 
         # Update tag estimate scatter offsets
         if self.tag_estimate_scatter is not None:
-            if len(tag_positions) > 0:
-                self.tag_estimate_scatter.set_offsets(np.array(tag_positions))
-            else:
-                self.tag_estimate_scatter.set_offsets(np.empty((0, 2)))
+            self.tag_estimate_scatter.set_offsets(tag_positions)
 
         # Update anchor scatter offsets
         if self.anchor_scatter is not None:
-            if len(anchor_positions) > 0:
-                self.anchor_scatter.set_offsets(np.array(anchor_positions))
-            else:
-                self.anchor_scatter.set_offsets(np.empty((0, 2)))
+            self.anchor_scatter.set_offsets(anchor_positions)
 
         if self.scenario.tag_truth:
             self.tag_truth_plot.set_offsets([self.scenario.tag_truth.position()])
 
-        # Update anchor circles: control visibility and radius explicitly. Use visibility toggling
-        if self.display_config.showAnchorCircles:
-            for i, (bigger_circle, smaller_circle) in enumerate(self.circle_pairs):
-                if i < len(anchor_positions):
-                    bigger_circle.set_visible(True)
-                    smaller_circle.set_visible(True)
-                    bigger_circle.set_center(anchor_positions[i])
-                    bigger_circle.set_radius(distances_truth[i] + self.scenario.sigma)
-                    smaller_circle.set_center(anchor_positions[i])
-                    smaller_circle.set_radius(max(0.0, distances_truth[i] - self.scenario.sigma))
-                else:
-                    bigger_circle.set_visible(False)
-                    smaller_circle.set_visible(False)
-        else:
-            for (bigger_circle, smaller_circle) in self.circle_pairs:
-                bigger_circle.set_visible(False)
-                smaller_circle.set_visible(False)
-
-        # Update or create reusable line/text artists for anchor-anchor pairs
-        num_anchor_pairs = max(0, len(anchor_positions) * (len(anchor_positions) - 1) // 2)
-        # ensure enough line artists
-        while len(self.anchor_pair_lines) < num_anchor_pairs:
-            l, = self.ax_trilat.plot([], [], 'b--', alpha=0.5)
-            self.anchor_pair_lines.append(l)
-            t = self.ax_trilat.text(0, 0, '', ha='center', va='center')
-            t.set_visible(False)
-            self.anchor_pair_texts.append(t)
-
-        pair_idx = 0
-        for i in range(len(anchor_positions)):
-            for j in range(i + 1, len(anchor_positions)):
-                if self.display_config.showBetweenAnchorsLines:
-                    xdata = [anchor_positions[i][0], anchor_positions[j][0]]
-                    ydata = [anchor_positions[i][1], anchor_positions[j][1]]
-                    line = self.anchor_pair_lines[pair_idx]
-                    line.set_xdata(xdata)
-                    line.set_ydata(ydata)
-                    line.set_visible(True)
-                else:
-                    self.anchor_pair_lines[pair_idx].set_visible(False)
-
-                xm = (anchor_positions[i][0] + anchor_positions[j][0]) / 2
-                ym = (anchor_positions[i][1] + anchor_positions[j][1]) / 2
-                distance = np.linalg.norm(anchor_positions[i] - anchor_positions[j])
-
-                if self.display_config.showBetweenAnchorsLabels:
-                    t = self.anchor_pair_texts[pair_idx]
-                    t.set_text(f"{distance:.2f}")
-                    t.set_position((xm, ym))
-                    t.set_visible(True)
-                else:
-                    self.anchor_pair_texts[pair_idx].set_visible(False)
-
-                pair_idx += 1
-
-        # Hide any leftover anchor-pair artists that are no longer needed
-        for idx in range(pair_idx, len(self.anchor_pair_lines)):
-            try:
-                self.anchor_pair_lines[idx].set_visible(False)
-            except Exception:
-                pass
-        for idx in range(pair_idx, len(self.anchor_pair_texts)):
-            try:
-                self.anchor_pair_texts[idx].set_visible(False)
-            except Exception:
-                pass
-
-        # Update or create reusable tag-anchor line/text artists
-        needed_tag_anchor = len(tag_positions) * len(anchor_positions)
-        while len(self.tag_anchor_lines) < needed_tag_anchor:
-            l, = self.ax_trilat.plot([], [], 'r--', alpha=0.5)
-            self.tag_anchor_lines.append(l)
-            t = self.ax_trilat.text(0, 0, '', ha='center', va='center')
-            t.set_visible(False)
-            self.tag_anchor_texts.append(t)
-
-        ta_idx = 0
-        for ti, tag_position in enumerate(tag_positions):
-            for ai, anchor_position in enumerate(anchor_positions):
-                if self.display_config.showTagAnchorLines:
-                    xdata = [anchor_position[0], tag_position[0]]
-                    ydata = [anchor_position[1], tag_position[1]]
-                    line = self.tag_anchor_lines[ta_idx]
-                    line.set_xdata(xdata)
-                    line.set_ydata(ydata)
-                    line.set_visible(True)
-                else:
-                    self.tag_anchor_lines[ta_idx].set_visible(False)
-
-                if self.display_config.showTagAnchorLabels:
-                    xm = (anchor_position[0] + tag_position[0]) / 2
-                    ym = (anchor_position[1] + tag_position[1]) / 2
-                    distance = np.linalg.norm(anchor_position - tag_position)
-                    t = self.tag_anchor_texts[ta_idx]
-                    t.set_text(f"{distance:.2f}")
-                    t.set_position((xm, ym))
-                    t.set_visible(True)
-                else:
-                    self.tag_anchor_texts[ta_idx].set_visible(False)
-
-                ta_idx += 1
-
-        # Hide any leftover tag-anchor artists that are no longer needed
-        for idx in range(ta_idx, len(self.tag_anchor_lines)):
-            try:
-                self.tag_anchor_lines[idx].set_visible(False)
-            except Exception:
-                pass
-        for idx in range(ta_idx, len(self.tag_anchor_texts)):
-            try:
-                self.tag_anchor_texts[idx].set_visible(False)
-            except Exception:
-                pass
-
-        # Update/create tag name texts
-        while len(self.tag_name_texts) < len(tag_positions):
-            t = self.ax_trilat.text(0, 0, '', ha='center', va='bottom', color='red')
-            t.set_visible(False)
-            self.tag_name_texts.append(t)
-
-        for i, tag_pos in enumerate(tag_positions):
-            if self.display_config.showTagLabels:
-                t = self.tag_name_texts[i]
-                t.set_text(self.scenario.get_tag_list()[i].name)
-                t.set_position((tag_pos[0], tag_pos[1]))
-                t.set_visible(True)
-            else:
-                self.tag_name_texts[i].set_visible(False)
-
-        # Hide any extra tag name texts beyond current tags
-        for idx in range(len(tag_positions), len(self.tag_name_texts)):
-            try:
-                self.tag_name_texts[idx].set_visible(False)
-            except Exception:
-                pass
-
-        # Update/create anchor name texts
-        while len(self.anchor_name_texts) < len(anchor_positions):
-            t = self.ax_trilat.text(0, 0, '', ha='center', va='center')
-            t.set_visible(False)
-            self.anchor_name_texts.append(t)
-
-        for i in range(len(anchor_positions)):
-            if self.display_config.showAnchorLabels:
-                t = self.anchor_name_texts[i]
-                t.set_text(self.scenario.get_anchor_list()[i].name)
-                t.set_position((anchor_positions[i][0], anchor_positions[i][1]))
-                t.set_visible(True)
+        # Anchor circles: one collection holding the bigger circles followed by the smaller ones
+        if self.anchor_circles is not None:
+            if self.display_config.showAnchorCircles and anchor_count > 0:
+                distances = np.full(anchor_count, np.nan)
+                known = np.asarray(distances_truth, dtype=float).ravel()[:anchor_count]
+                distances[:len(known)] = known
+                sigma = self.scenario.sigma
+                radii = np.concatenate([distances + sigma, np.maximum(0.0, distances - sigma)])
+                self._set_anchor_circles(anchor_positions, np.nan_to_num(radii))
+                self.anchor_circles.set_visible(True)
             else:
-                self.anchor_name_texts[i].set_visible(False)
-
-        # Hide any extra anchor name texts beyond current anchors
-        for idx in range(len(anchor_positions), len(self.anchor_name_texts)):
-            try:
-                self.anchor_name_texts[idx].set_visible(False)
-            except Exception:
-                pass
+                self.anchor_circles.set_visible(False)
+
+        # Anchor-anchor pairs: one segment per pair (upper triangle of the anchor distance matrix)
+        first, second = np.triu_indices(anchor_count, k=1)
+        pair_segments = np.stack([anchor_positions[first], anchor_positions[second]], axis=1)
+        if self.anchor_pair_collection is not None:
+            self.anchor_pair_collection.set_segments(pair_segments)
+            self.anchor_pair_collection.set_visible(self.display_config.showBetweenAnchorsLines and len(pair_segments) > 0)
+
+        # Tag-anchor pairs: every tag with a finite estimate to every anchor (only the dragged one while interacting)
+        located = tag_positions[np.isfinite(tag_positions).all(axis=1)]
+        line_anchors = anchor_positions
+        if self.interacting and isinstance(self.dragging_point, station.Anchor):
+            line_anchors = np.asarray(self.dragging_point.position(), dtype=float)[:2].reshape(1, 2)
+        tag_segments = np.stack([np.repeat(line_anchors[None, :, :], len(located), axis=0).reshape(-1, 2),
+                                 np.repeat(located, len(line_anchors), axis=0)], axis=1)
+        if self.tag_anchor_collection is not None:
+            self.tag_anchor_collection.set_segments(tag_segments)
+            self.tag_anchor_collection.set_visible(self.display_config.showTagAnchorLines and len(tag_segments) > 0)
+
+        # Labels are placed in _update_labels, culled to what the current view shows;
+        # distance labels change with every mouse move of a drag and are left out until the release
+        detailed = not self.interacting
+        self._label_data = {
+            'anchor_pairs': self._segment_labels(pair_segments)
+            if detailed and self.display_config.showBetweenAnchorsLabels else None,
+            'tag_anchor': self._segment_labels(tag_segments)
+            if detailed and self.display_config.showTagAnchorLabels else None,
+            'tag_names': (tag_positions, [tag.name for tag in self.scenario.get_tag_list()])
+            if detailed and self.display_config.showTagLabels else None,
+            'anchor_names': (anchor_positions, [anchor.name for anchor in self.scenario.get_anchor_list()])
+            if self.display_config.showAnchorLabels else None,
+        }
 
         # Ensure trilat plot keeps equal XY scaling (expand X-range if needed)
+        self._updating = True
         try:
             self._adjust_trilat_aspect()
         except Exception:
             pass
+        finally:
+            self._updating = False
+        self._update_labels()
+
+    @staticmethod
+    def _segment_labels(segments):
+        """(midpoints, lengths, texts) for distance labels on segments of shape (n, 2, 2)."""
+        lengths = np.linalg.norm(segments[:, 1] - segments[:, 0], axis=1)
+        return segments.mean(axis=1), lengths, [f"{length:.2f}" for length in lengths]
+
+    def _on_limits_changed(self, ax):
+        # zoom/pan: the labels to show depend on the view
+        if not self._updating:
+            self._update_labels()
+
+    def _update_labels(self):
+        """Show only labels inside the view; distance labels also need their line to be long enough on screen."""
+        data = self._label_data
+        if not data:
+            return
+        (xmin, xmax), (ymin, ymax) = sorted(self.ax_trilat.get_xlim()), sorted(self.ax_trilat.get_ylim())
+        try:
+            pixels_per_unit = self.ax_trilat.bbox.width / max(xmax - xmin, 1e-9)
+        except Exception:
+            pixels_per_unit = 0.0
+
+        def in_view(positions):
+            return ((positions[:, 0] >= xmin) & (positions[:, 0] <= xmax)
+                    & (positions[:, 1] >= ymin) & (positions[:, 1] <= ymax))
+
+        for key, texts in (('anchor_pairs', self.anchor_pair_texts), ('tag_anchor', self.tag_anchor_texts)):
+            shown = []
+            if data[key] is not None:
+                midpoints, lengths, labels = data[key]
+                visible = np.flatnonzero(in_view(midpoints) & (lengths * pixels_per_unit >= self.LABEL_MIN_PIXELS))
+                shown = [(midpoints[i], labels[i]) for i in visible[:self.MAX_DISTANCE_LABELS]]
+            self._place_labels(texts, shown, ha='center', va='center')
+
+        for key, texts, style in (('tag_names', self.tag_name_texts, dict(ha='center', va='bottom', color='red')),
+                                  ('anchor_names', self.anchor_name_texts, dict(ha='center', va='center'))):
+            shown = []
+            if data[key] is not None:
+                positions, names = data[key]
+                visible = np.flatnonzero(np.isfinite(positions).all(axis=1) & in_view(positions))
+                shown = [(positions[i], names[i]) for i in visible if i < len(names)]
+            self._place_labels(texts, shown, **style)
+
+    def _place_labels(self, texts, shown, **style):
+        """Reuse the Text artists in texts for the (position, string) pairs in shown, hide the rest."""
+        while len(texts) < len(shown):
+            t = self.ax_trilat.text(0, 0, '', **style)
+            t.set_animated(self._blitting)
+            texts.append(t)
+        for t, (position, label) in zip(texts, shown):
+            t.set_text(label)
+            t.set_position((position[0], position[1]))
+            t.set_visible(True)
+        for t in texts[len(shown):]:
+            if t.get_visible():
+                t.set_visible(False)
+
+    def _update_trajectories(self, tag_list, positions, new_positions):
+        """Show the scenario's imported track and extend the live trail of every tag with new positions."""
+        layer = self.trajectories
+        if self._trajectory_scenario is not self.scenario:
+            layer.clear()
+            self._trajectory_scenario = self.scenario
+            self._trajectory_track = None
+
+        track = self.scenario.track
+        if track is not self._trajectory_track:
+            self._trajectory_track = track
+            if track is None:
+                layer.remove(self.TRACK_KEY)
+            else:
+                layer.set_path(self.TRACK_KEY, track['x'].to_numpy(), track['y'].to_numpy(),
+                               color='purple', alpha=0.6, linewidth=1, zorder=0.5)
+
+        tags = set(tag_list)
+        for key in layer.keys():
+            if key != self.TRACK_KEY and key not in tags:
+                layer.remove(key)
+        if new_positions:
+            for tag, position in zip(tag_list, positions):
+                if np.isfinite(position).all():
+                    layer.append(tag, position[0], position[1], color='red', alpha=0.4, linewidth=1, zorder=0.5)
+
+        layer.method = self.display_config.trajectoryDecimation
+        layer.set_visible(self.display_config.showTrajectories)
+
+    def _computed_tag_positions(self, tag_list):
+        """
+        Newest raw tag positions of the compute worker, NaN while none matches the current tags.
+
+        Returns:
+            Tuple of (positions, new) where new is True if the positions come from a result
+            that was not drawn yet and was computed on new ranges. Results of anchor or
+            truth moves keep the measurements revision and are not new.
+        """
+        result = self.window.compute_worker.result(self.scenario)
+        if result is None or len(result.tag_positions) != len(tag_list):
+            return np.full((len(tag_list), 2), np.nan), False
+        measurements_revision = result.revision[1]
+        new = result is not self._tag_result and measurements_revision != self._trail_revision
+        self._tag_result = result
+        if new:
+            self._trail_revision = measurements_revision
+        return result.tag_positions, new
+
+    def _tag_positions(self, tag_positions, new_positions):
+        """Tag estimates to draw: raw trilateration or, if enabled, the Kalman-smoothed positions."""
+        if not self.display_config.showSmoothedTags or len(tag_positions) == 0:
+            if self.tag_covariance_ellipses is not None:
+                self.tag_covariance_ellipses.set_visible(False)
+            return tag_positions
+
+        tag_list = self.scenario.get_tag_list()
+        if new_positions or len(self.tracker) == 0:
+            smoothed, covariances = self.tracker.step(tag_list, tag_positions, time.monotonic(),
+                                                      measurement_noise=max(self.scenario.sigma, 0.1))
+        else:
+            # anchors moved or display changed: keep the filter state, only redraw
+            smoothed = self.tracker.positions(tag_list)
+            covariances = self.tracker.covariances(tag_list)
+        smoothed = np.where(np.isfinite(smoothed), smoothed, tag_positions)
+        covariances = np.nan_to_num(covariances)
+
+        widths, heights, angles = covariance_ellipses(covariances)
+        if self.tag_covariance_ellipses is None:
+            self.tag_covariance_ellipses = EllipseCollection(
+                widths, heights, angles, units='xy', offsets=smoothed, offset_transform=self.ax_trilat.transData,
+                facecolors='none', edgecolors='red', linestyles='dotted', zorder=1)
+            self.ax_trilat.add_collection(self.tag_covariance_ellipses, autolim=False)
+        else:
+            self.tag_covariance_ellipses.set_widths(widths)
+            self.tag_covariance_ellipses.set_heights(heights)
+            self.tag_covariance_ellipses.set_angles(angles)
+            self.tag_covariance_ellipses.set_offsets(smoothed)
+        self.tag_covariance_ellipses.set_visible(True)
+        return smoothed
 
     def redraw(self):
-        """Trigger a canvas redraw."""
+        """Trigger a canvas redraw (a blit of the moving artists while dragging with blitting)."""
         try:
+            if self._blitting and self._blit():
+                return
             self.fig.canvas.draw_idle()
         except Exception:
             # best-effort
             pass
 
+    def _dynamic_artists(self):
+        """Artists that change while dragging; everything else is part of the cached background."""
+        artists = [self.anchor_scatter, self.tag_estimate_scatter, self.tag_truth_plot, self.tag_covariance_ellipses,
+                   self.anchor_circles, self.anchor_pair_collection, self.tag_anchor_collection]
+        artists.extend(self.tag_estimate_plots)
+        if not self.interacting:
+            artists.extend(self.trajectories.artists())
+        for lst in (self.anchor_pair_texts, self.tag_anchor_texts, self.tag_name_texts, self.anchor_name_texts):
+            artists.extend(lst)
+        return [artist for artist in artists if artist is not None]
+
+    def _limits(self):
+        return self.ax_trilat.get_xlim() + self.ax_trilat.get_ylim()
+
+    def _start_blitting(self):
+        canvas = self.fig.canvas
+        if not self.display_config.useBlitting or not getattr(canvas, 'supports_blit', False):
+            return
+        self._blitting = True
+        for artist in self._dynamic_artists():
+            artist.set_animated(True)
+        # a full draw without the animated artists; _on_draw captures it as the background
+        canvas.draw()
+
+    def _stop_blitting(self):
+        if not self._blitting:
+            return
+        self._blitting = False
+        self._background = None
+        for artist in self._dynamic_artists():
+            artist.set_animated(False)
+        self.fig.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        """Capture the background after every full draw (resize, zoom, pan) while blitting."""
+        if not self._blitting:
+            return
+        canvas = self.fig.canvas
+        self._background = canvas.copy_from_bbox(self.fig.bbox)
+        self._background_limits = self._limits()
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self._dynamic_artists():
+            # artists created during the drag must not end up in the next background
+            artist.set_animated(True)
+            if artist.get_visible():
+                self.fig.draw_artist(artist)
+
+    def _blit(self):
+        """Redraw the moving artists over the cached background; False if a full draw is needed."""
+        if self._background is None or not np.allclose(self._limits(), self._background_limits, rtol=1e-9, atol=0):
+            # the view changed (e.g. the aspect adjustment): the background is stale
+            return False
+        canvas = self.fig.canvas
+        canvas.restore_region(self._background)
+        self._draw_animated()
+        canvas.blit(self.fig.bbox)
+        return True
+
     def init_artists(self):
         # Remove any existing artists from previous scenarios so switching
         # scenarios doesn't leave stale lines/texts/patches on the axes.
+        self._blitting = False
+        self._background = None
         try:
             # remove scatter artists
             if getattr(self, 'anchor_scatter', None) is not None:
@@ -347,8 +446,19 @@ class TrilatPlot(QObject):
                     pass
                 self.tag_truth_plot = None
 
-            # remove line and text artists
-            for lst_name in ('anchor_pair_lines', 'anchor_pair_texts', 'tag_anchor_lines', 'tag_anchor_texts', 'tag_name_texts', 'anchor_name_texts'):
+            if getattr(self, 'tag_covariance_ellipses', None) is not None:
+                try:
+                    self.tag_covariance_ellipses.remove()
+                except Exception:
+                    pass
+                self.tag_covariance_ellipses = None
+            # the filter state and the trail revision belong to the tags of the previous scenario
+            self.tracker.reset()
+            self._tag_result = None
+            self._trail_revision = None
+
+            # remove text artists
+            for lst_name in ('anchor_pair_texts', 'tag_anchor_texts', 'tag_name_texts', 'anchor_name_texts'):
                 for art in getattr(self, lst_name, []) or []:
                     try:
                         art.remove()
@@ -356,17 +466,15 @@ class TrilatPlot(QObject):
                         pass
                 setattr(self, lst_name, [])
 
-            # remove circle patches
-            for pair in getattr(self, 'circle_pairs', []) or []:
-                try:
-                    pair[0].remove()
-                except Exception:
-                    pass
-                try:
-                    pair[1].remove()
-                except Exception:
-                    pass
-            self.circle_pairs = []
+            # remove line and circle collections
+            for attr in ('anchor_circles', 'anchor_pair_collection', 'tag_anchor_collection'):
+                if getattr(self, attr, None) is not None:
+                    try:
+                        getattr(self, attr).remove()
+                    except Exception:
+                        pass
+                    setattr(self, attr, None)
+            self._label_data = None
         except Exception:
             # best-effort: ignore any cleanup errors
             pass
@@ -384,10 +492,17 @@ class TrilatPlot(QObject):
         except Exception:
             self.tag_truth_plot = None
 
+        self.anchor_circles = EllipseCollection(
+            [], [], [], units='xy', offsets=np.empty((0, 2)), offset_transform=self.ax_trilat.transData,
+            facecolors='none', edgecolors=self.STATION_COLOR, linestyles=self.CIRCLE_LINESTYLE, linewidths=1.0, zorder=1)
+        self.ax_trilat.add_collection(self.anchor_circles, autolim=False)
+        self.anchor_pair_collection = LineCollection([], colors='b', linestyles='--', alpha=0.5)
+        self.ax_trilat.add_collection(self.anchor_pair_collection, autolim=False)
+        self.tag_anchor_collection = LineCollection([], colors='r', linestyles='--', alpha=0.5)
+        self.ax_trilat.add_collection(self.tag_anchor_collection, autolim=False)
+
         # Reset internal lists used to store reusable artists
-        self.anchor_pair_lines = []
         self.anchor_pair_texts = []
-        self.tag_anchor_lines = []
         self.tag_anchor_texts = []
         self.tag_name_texts = []
         self.anchor_name_texts = []
@@ -458,47 +573,62 @@ class TrilatPlot(QObject):
         self.scenario.remove_station(anchor_to_remove)
         self.anchors_changed.emit()
 
+    def _pick_anchor(self, event):
+        """Anchor whose marker is under the mouse (nearest one if several), or None."""
+        if self.anchor_scatter is None or event.x is None or event.y is None:
+            return None
+        # marker radius in pixels (scatter sizes are areas in points^2) plus the pick tolerance, as in contains()
+        radius_px = 0.5 * np.sqrt(self.STATION_DOT_SIZE) * self.fig.dpi / 72.0 + self.anchor_scatter.get_pickradius()
+        to_data = self.ax_trilat.transData.inverted()
+        corners = to_data.transform([[event.x - radius_px, event.y - radius_px],
+                                     [event.x + radius_px, event.y + radius_px]])
+        point = to_data.transform([[event.x, event.y]])[0]
+        # candidates within the marker radius in data units, then the exact test in pixels
+        search = 0.5 * np.max(np.abs(corners[1] - corners[0])) * np.sqrt(2)
+        for anchor in self.scenario.nearest_anchors(point, k=4, max_distance=search):
+            x, y = self.ax_trilat.transData.transform(anchor.position()[:2])
+            if np.hypot(x - event.x, y - event.y) <= radius_px:
+                return anchor
+        return None
+
     def on_mouse_press(self, event):
         if event.inaxes is None:
             return
 
         if event.button == 3 and self.display_config.rightClickAnchors:
-            # Check hit on anchor scatter (reused artist)
-            if self.anchor_scatter is not None:
-                contains, info = self.anchor_scatter.contains(event)
-                if contains:
-                    inds = info.get('ind', [])
-                    if len(inds) > 0:
-                        i = int(inds[0])
-                        self.remove_anchor(i)
-                        return
+            anchor = self._pick_anchor(event)
+            if anchor is not None:
+                self.scenario.remove_station(anchor)
+                self.anchors_changed.emit()
+                return
             # If no anchor hit, add a new one
             self.add_anchor(event.xdata, event.ydata)
             return
 
         # Check for anchor hit to start dragging
-        if self.anchor_scatter is not None:
-            contains, info = self.anchor_scatter.contains(event)
-            if contains:
-                inds = info.get('ind', [])
-                if len(inds) > 0:
-                    i = int(inds[0])
-                    if self.display_config.dragAnchors:
-                        self.dragging_point = self.scenario.get_anchor_list()[i]
-                    return
+        anchor = self._pick_anchor(event)
+        if anchor is not None:
+            if self.display_config.dragAnchors:
+                self.dragging_point = anchor
+                self._start_blitting()
+            return
         if self.tag_truth_plot:
             contains, _ = self.tag_truth_plot.contains(event)
             if contains:
                 self.dragging_point = self.scenario.tag_truth
+                self._start_blitting()
 
     def on_mouse_release(self, event):
-        if self.dragging_point is not None:
+        dragged = self.dragging_point
+        self.dragging_point = None
+        # back to full draws before the final refresh, so it lands in a normal frame
+        self._stop_blitting()
+        if dragged is not None:
             # Finalize: emit anchors_changed if dragging anchor, tags_changed if dragging tag
-            if isinstance(self.dragging_point, station.Anchor):
+            if isinstance(dragged, station.Anchor):
                 self.anchors_changed.emit()
             else:
                 self.tags_changed.emit()
-        self.dragging_point = None
 
     def on_mouse_move(self, event):
         if self.dragging_point is None or event.inaxes is None:
@@ -517,24 +647,5 @@ class TrilatPlot(QObject):
             self.tags_changed.emit()
 
     def request_refresh(self, anchors=False, tags=False, measurements=False):
-        """Request a coalesced refresh. Multiple calls within
-        _refresh_interval_ms will be merged into a single update.
-        """
-        self._pending_refresh["anchors"] = self._pending_refresh["anchors"] or anchors
-        self._pending_refresh["tags"] = self._pending_refresh["tags"] or tags
-        self._pending_refresh["measurements"] = self._pending_refresh["measurements"] or measurements
-        if not self._refresh_timer.isActive():
-            self._refresh_timer.start(self._refresh_interval_ms)
-
-    def _on_refresh_timer(self):
-        flags = self._pending_refresh.copy()
-        # reset pending flags
-        self._pending_refresh = {"anchors": False, "tags": False, "measurements": False}
-
-        # Emit signals for each changed type
-        if flags.get("anchors"):
-            self.anchors_changed.emit()
-        if flags.get("tags"):
-            self.tags_changed.emit()
-        if flags.get("measurements"):
-            self.measurements_changed.emit()
\ No newline at end of file
+        """Request a coalesced refresh; the window's RefreshScheduler merges requests into one per frame."""
+        self.window.request_refresh(anchors=anchors, tags=tags, measurements=measurements)
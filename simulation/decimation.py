@@ -0,0 +1,117 @@
+"""
+Level-of-detail decimation of 2D paths (tag trajectories).
+
+Both methods split the path into buckets of consecutive points and keep a few
+representatives per bucket, so the result has about len / bucket_size points
+no matter how long the path is:
+
+- minmax: the points with the smallest and largest x and y of every bucket
+  (up to four), which preserves the extent of the path exactly.
+- lttb: Largest-Triangle-Three-Buckets; one point per bucket, the one forming
+  the largest triangle with the point kept before and the mean of the next
+  bucket, which preserves the shape with fewer points.
+
+Points with a NaN coordinate are never kept. Functions return sorted indices
+into the input arrays.
+"""
+
+import numpy as np
+
+DECIMATION_METHODS = ("lttb", "minmax")
+
+
+def bucket_size_for(count: int, buckets: int) -> int:
+    """Number of points per bucket so that count points give at most about buckets buckets."""
+    return max(1, -(-int(count) // max(int(buckets), 1)))
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, bucket_size: int) -> np.ndarray:
+    """Indices of the first and last point plus per bucket the points with min/max x and y."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= 2 or bucket_size <= 1:
+        return np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+
+    buckets = -(-n // bucket_size)
+    pad = buckets * bucket_size - n
+    valid = np.isfinite(x) & np.isfinite(y)
+    chosen = [np.array([0, n - 1])]
+    offsets = np.arange(buckets) * bucket_size
+    for values in (x, y):
+        v = np.concatenate([np.where(valid, values, np.nan), np.full(pad, np.nan)]).reshape(buckets, bucket_size)
+        has_value = np.isfinite(v).any(axis=1)
+        low = np.argmin(np.where(np.isfinite(v), v, np.inf), axis=1)
+        high = np.argmax(np.where(np.isfinite(v), v, -np.inf), axis=1)
+        chosen.append((offsets + low)[has_value])
+        chosen.append((offsets + high)[has_value])
+    indices = np.unique(np.concatenate(chosen))
+    return indices[valid[indices]]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, bucket_size: int, previous=None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets over buckets of bucket_size points.
+
+    Args:
+        x, y: Path coordinates
+        bucket_size: Points per bucket
+        previous: (x, y) of the point kept right before this chunk when decimating
+            a path piecewise; the first point is then not kept automatically
+
+    Returns:
+        Sorted indices of the kept points; the last point is always kept
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    valid = np.isfinite(x) & np.isfinite(y)
+    if n <= 2 or bucket_size <= 1:
+        return np.flatnonzero(valid)
+
+    kept = []
+    if previous is None:
+        start = 0
+        while start < n and not valid[start]:
+            start += 1
+        if start >= n:
+            return np.array([], dtype=int)
+        kept.append(start)
+        ax, ay = x[start], y[start]
+        start += 1
+    else:
+        ax, ay = previous
+        start = 0
+    end = n - 1
+
+    edges = np.append(np.arange(start, end, bucket_size), end)
+    if len(edges) > 1:
+        # mean of the valid points of every bucket; the one after the last bucket is the last point
+        counts = np.add.reduceat(valid.astype(float), edges[:-1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_x = np.add.reduceat(np.where(valid, x, 0.0), edges[:-1]) / counts
+            mean_y = np.add.reduceat(np.where(valid, y, 0.0), edges[:-1]) / counts
+        mean_x = np.append(mean_x[1:], x[end])
+        mean_y = np.append(mean_y[1:], y[end])
+
+    for b in range(len(edges) - 1):
+        lo, hi = edges[b], edges[b + 1]
+        nx, ny = mean_x[b], mean_y[b]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((ax - nx) * (by - ay) - (ax - bx) * (ny - ay))
+        area = np.where(valid[lo:hi], np.nan_to_num(area, nan=-1.0), -1.0)
+        best = int(np.argmax(area))
+        if area[best] < 0:
+            continue
+        kept.append(lo + best)
+        ax, ay = x[lo + best], y[lo + best]
+    if valid[end]:
+        kept.append(end)
+    return np.array(kept, dtype=int)
+
+
+def decimate_indices(x: np.ndarray, y: np.ndarray, bucket_size: int, method: str = "lttb", previous=None) -> np.ndarray:
+    """Dispatch to lttb_indices or minmax_indices (previous only applies to lttb)."""
+    if method == "minmax":
+        return minmax_indices(x, y, bucket_size)
+    return lttb_indices(x, y, bucket_size, previous)
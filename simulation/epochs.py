@@ -0,0 +1,163 @@
+"""
+Epoch assembly for streamed ranges.
+
+Streamed ranges to the anchors of a tag arrive one by one and at different
+times. Instead of updating the tag's measurements (and re-solving its position)
+for every single range, an `EpochAssembler` collects the ranges of one tag until
+every anchor has reported or the epoch window has passed, and then emits one
+`Epoch` to be applied at once. The age of the last range from every anchor is
+tracked, so anchors that stopped reporting can be dropped from the solution
+instead of contributing an outdated distance. Assemblers of tags that were
+removed from their scenario are dropped, and ranges to removed anchors are left
+out of an epoch.
+"""
+
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class Epoch:
+    """Ranges of one tag to be solved together."""
+
+    __slots__ = ("tag", "ranges", "stale", "start", "end")
+
+    def __init__(self, tag, ranges: Dict[object, float], stale: Set[object], start: float, end: float):
+        self.tag = tag
+        # anchor -> distance, newest sample per anchor within the epoch
+        self.ranges = ranges
+        # anchors that reported earlier but not within the assembler's max_age
+        self.stale = stale
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Epoch(tag={self.tag}, anchors={len(self.ranges)}, stale={len(self.stale)})"
+
+
+class EpochAssembler:
+    def __init__(self, tag, window: float = 0.5, max_age: float = 5.0):
+        """
+        Args:
+            tag: The tag whose ranges are collected
+            window: Longest time span of one epoch in seconds (range timestamps)
+            max_age: Ranges older than this (seconds) are reported as stale
+        """
+        self.tag = tag
+        self.window = window
+        self.max_age = max_age
+        self._pending: Dict[object, float] = {}
+        self._start = None
+        self._opened_at = None
+        # anchor -> timestamp of its newest range
+        self.last_seen: Dict[object, float] = {}
+
+    def add(self, anchor, distance: float, timestamp: float, anchors: Iterable[object]) -> Optional[Epoch]:
+        """
+        Add one range; returns the finished epoch once all anchors reported or the window is over.
+
+        Args:
+            anchor: Anchor the range was measured to
+            distance: Measured distance
+            timestamp: Time of the measurement in seconds
+            anchors: All anchors of the scenario (the expected reporters)
+        """
+        if self._start is not None and timestamp - self._start >= self.window:
+            # this range belongs to the next epoch: close the current one first
+            finished = self._emit(anchors, timestamp)
+            self._open(anchor, distance, timestamp)
+            return finished
+
+        if self._start is None:
+            self._open(anchor, distance, timestamp)
+        else:
+            self._pending[anchor] = distance
+            self.last_seen[anchor] = max(timestamp, self.last_seen.get(anchor, timestamp))
+
+        anchors = set(anchors)
+        if anchors and anchors <= self._pending.keys():
+            return self._emit(anchors, timestamp)
+        return None
+
+    def _open(self, anchor, distance: float, timestamp: float):
+        self._pending = {anchor: distance}
+        self._start = timestamp
+        self._opened_at = time.monotonic()
+        self.last_seen[anchor] = max(timestamp, self.last_seen.get(anchor, timestamp))
+
+    def flush(self, anchors: Iterable[object], force: bool = False) -> Optional[Epoch]:
+        """Emit a pending epoch that has been open for longer than the window (wall clock)."""
+        if self._start is None:
+            return None
+        if not force and time.monotonic() - self._opened_at < self.window:
+            return None
+        return self._emit(anchors, self._start + self.window)
+
+    def _emit(self, anchors: Iterable[object], now: float) -> Epoch:
+        anchors = set(anchors)
+        # only anchors heard on this stream can go stale; others keep their imported range
+        stale = {anchor for anchor in anchors
+                 if anchor not in self._pending and anchor in self.last_seen
+                 and now - self.last_seen[anchor] > self.max_age}
+        ranges = {anchor: distance for anchor, distance in self._pending.items() if anchor in anchors}
+        epoch = Epoch(self.tag, ranges, stale, self._start, now)
+        self._pending = {}
+        self._start = None
+        self._opened_at = None
+        return epoch
+
+
+class EpochCollector:
+    """One `EpochAssembler` per tag, across scenarios."""
+
+    def __init__(self, window: float = 0.5, max_age: float = 5.0):
+        self.window = window
+        self.max_age = max_age
+        self._assemblers: Dict[object, EpochAssembler] = {}
+        self.ranges_in = 0
+        self.epochs_out = 0
+
+    def configure(self, window: float, max_age: Optional[float] = None):
+        self.window = window
+        if max_age is not None:
+            self.max_age = max_age
+        for assembler in self._assemblers.values():
+            assembler.window = self.window
+            assembler.max_age = self.max_age
+
+    def add(self, tag, anchor, distance: float, timestamp: float) -> Optional[Epoch]:
+        if tag not in tag.scenario.stations:
+            # the tag was removed meanwhile
+            self._assemblers.pop(tag, None)
+            return None
+        assembler = self._assemblers.get(tag)
+        if assembler is None:
+            assembler = self._assemblers[tag] = EpochAssembler(tag, self.window, self.max_age)
+        self.ranges_in += 1
+        epoch = assembler.add(anchor, distance, timestamp, tag.scenario.get_anchor_list())
+        if epoch is not None:
+            self.epochs_out += 1
+        return epoch
+
+    def flush(self, force: bool = False) -> List[Epoch]:
+        """Epochs whose window has run out without all anchors reporting."""
+        self.prune()
+        epochs = []
+        for tag, assembler in self._assemblers.items():
+            epoch = assembler.flush(tag.scenario.get_anchor_list(), force)
+            if epoch is not None:
+                epochs.append(epoch)
+        self.epochs_out += len(epochs)
+        return epochs
+
+    def prune(self):
+        """Drop the assemblers (and pending ranges) of tags no longer in their scenario."""
+        stations = {}
+        for tag in list(self._assemblers):
+            scenario = tag.scenario
+            if id(scenario) not in stations:
+                stations[id(scenario)] = set(scenario.stations)
+            if tag not in stations[id(scenario)]:
+                del self._assemblers[tag]
+
+    def clear(self):
+        self._assemblers.clear()
@@ -1,8 +1,13 @@
-import numpy as np
+import itertools
 import logging
 
+import numpy as np
+
 _LOG = logging.getLogger(__name__)
 
+# upper bound of epochs x subsets x anchors handled at once by ransac_trilateration_batch
+RANSAC_CHUNK_ELEMENTS = 1_000_000
+
 def euclidean_distances(anchor_positions, tag_position, sigma=0.0):
     distances = np.linalg.norm(anchor_positions - tag_position, axis=1)
     if sigma > 0:
@@ -55,6 +60,127 @@ def trilateration(anchor_positions, distances):
     base_solution, _, _, _ = np.linalg.lstsq(A, b, rcond=None)
     return base_solution
 
+def trilateration_batch(anchor_positions, distances):
+    """Solve many trilateration problems against the same anchors in one step.
+
+    distances has shape (n, k) for n epochs and k anchors, NaN marks a missing
+    range. Each epoch uses the linearization of `trilateration` relative to its
+    first valid anchor. Epochs with fewer than dimensions + 1 ranges yield NaN.
+    """
+    anchor_positions = np.asarray(anchor_positions, dtype=float)
+    distances = np.atleast_2d(np.asarray(distances, dtype=float))
+    num_epochs = distances.shape[0]
+    dimensions = anchor_positions.shape[1]
+
+    positions = np.full((num_epochs, dimensions), np.nan)
+    valid = np.isfinite(distances)
+    solvable = valid.sum(axis=1) >= dimensions + 1
+    if not solvable.any():
+        return positions
+
+    valid = valid[solvable]
+    ranges = np.where(valid, distances[solvable], 0.0)
+    rows = np.arange(len(ranges))
+    reference = np.argmax(valid, axis=1)
+
+    squared_norms = np.sum(anchor_positions ** 2, axis=1)
+    A = -2 * (anchor_positions[None, :, :] - anchor_positions[reference][:, None, :])
+    b = ranges ** 2 - ranges[rows, reference][:, None] ** 2 - squared_norms[None, :] + squared_norms[reference][:, None]
+
+    weights = valid.astype(float)
+    weights[rows, reference] = 0.0
+    weighted_A = A * weights[:, :, None]
+    normal_matrix = np.einsum('nki,nkj->nij', weighted_A, A)
+    normal_rhs = np.einsum('nki,nk->ni', weighted_A, b)
+    # pinv instead of solve so degenerate (collinear) epochs fall back to least norm
+    positions[solvable] = np.einsum('nij,nj->ni', np.linalg.pinv(normal_matrix), normal_rhs)
+    return positions
+
+def ransac_trilateration_batch(anchor_positions, distances, threshold=1.5, max_subsets=500, seed=0, chunk_size=None):
+    """Outlier-robust trilateration for many epochs against the same anchors.
+
+    Every minimal anchor subset (dimensions + 1 anchors) of every epoch is solved
+    at once; the linear system of a subset only depends on its anchors, so it is
+    inverted once and applied to all epochs. Each candidate is scored by the number
+    of ranges it explains within threshold metres (ties: smaller squared residual),
+    and the best consensus set is solved again with all its ranges.
+
+    Returns (positions (n, d), inliers (n, k) bool). Epochs without redundant ranges
+    are solved normally with every valid range as inlier. If there are more than
+    max_subsets minimal subsets, a seeded random sample of them is scored.
+
+    Epochs are processed chunk_size at a time (default: as many as keep the
+    epochs x subsets x anchors candidate arrays below RANSAC_CHUNK_ELEMENTS),
+    which bounds the memory of long tracks; the result does not depend on it.
+    """
+    anchor_positions = np.asarray(anchor_positions, dtype=float)
+    distances = np.atleast_2d(np.asarray(distances, dtype=float))
+    num_epochs, num_anchors = distances.shape
+    minimal = anchor_positions.shape[1] + 1
+
+    if num_anchors <= minimal:
+        return trilateration_batch(anchor_positions, distances), np.isfinite(distances)
+
+    subsets = np.array(list(itertools.combinations(range(num_anchors), minimal)))
+    if len(subsets) > max_subsets:
+        subsets = subsets[np.random.default_rng(seed).choice(len(subsets), max_subsets, replace=False)]
+
+    if chunk_size is None:
+        chunk_size = RANSAC_CHUNK_ELEMENTS // (len(subsets) * num_anchors)
+    chunk_size = max(int(chunk_size), 1)
+    positions = np.empty((num_epochs, anchor_positions.shape[1]))
+    inliers = np.empty((num_epochs, num_anchors), dtype=bool)
+    for start in range(0, num_epochs, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        positions[chunk], inliers[chunk] = _ransac_chunk(anchor_positions, distances[chunk], subsets, threshold)
+    return positions, inliers
+
+def _ransac_chunk(anchor_positions, distances, subsets, threshold):
+    """`ransac_trilateration_batch` for one chunk of epochs and the (s, minimal) anchor subsets."""
+    num_epochs, num_anchors = distances.shape
+    minimal = subsets.shape[1]
+
+    valid = np.isfinite(distances)
+    positions = trilateration_batch(anchor_positions, distances)
+    inliers = valid.copy()
+
+    # candidate of every epoch and subset: the linearization of `trilateration` relative to the
+    # subset's first anchor; its matrix only depends on the anchors, so it is inverted once per subset
+    squared_norms = np.sum(anchor_positions ** 2, axis=1)
+    reference, others = subsets[:, 0], subsets[:, 1:]
+    A = -2 * (anchor_positions[others] - anchor_positions[reference][:, None, :])
+    ranges = distances[:, subsets]
+    b = (ranges[:, :, 1:] ** 2 - ranges[:, :, :1] ** 2
+         - squared_norms[others][None, :, :] + squared_norms[reference][None, :, None])
+    # NaN ranges propagate, so candidates of subsets with a missing range are NaN
+    candidates = np.einsum('sij,nsj->nsi', np.linalg.pinv(A), b)
+
+    # (n, s, k): residual of every range against every candidate
+    predicted = np.linalg.norm(candidates[:, :, None, :] - anchor_positions[None, None, :, :], axis=3)
+    with np.errstate(invalid='ignore'):
+        residuals = np.abs(predicted - distances[:, None, :])
+        consensus = residuals < threshold
+    usable = np.isfinite(candidates).all(axis=2)
+
+    # more inliers win; the squared residual (< k * threshold^2) only breaks ties
+    cost = np.where(consensus, residuals ** 2, 0.0).sum(axis=2) / (num_anchors * threshold ** 2 + 1e-12)
+    score = np.where(usable, consensus.sum(axis=2) - cost, -np.inf)
+    best = np.argmax(score, axis=1)
+    epochs = np.arange(num_epochs)
+    best_consensus = consensus[epochs, best]
+
+    robust = np.isfinite(score[epochs, best]) & (valid.sum(axis=1) > minimal) & (best_consensus.sum(axis=1) >= minimal)
+    if robust.any():
+        refit = trilateration_batch(anchor_positions, np.where(best_consensus[robust], distances[robust], np.nan))
+        positions[robust] = refit
+        inliers[robust] = best_consensus[robust]
+    return positions, inliers
+
+def ransac_trilateration(anchor_positions, distances, threshold=1.5):
+    """Single-epoch `ransac_trilateration_batch`; returns (position, inlier mask)."""
+    positions, inliers = ransac_trilateration_batch(anchor_positions, np.asarray(distances, dtype=float)[None, :], threshold)
+    return positions[0], inliers[0]
+
 def geometry_matrix(anchor_positions, tag_position, distances=None):
     if distances is None:
         distances = euclidean_distances(anchor_positions, tag_position)
@@ -70,6 +196,30 @@ def dilution_of_precision(anchor_positions, tag_position, distances=None):
     except np.linalg.LinAlgError:
         return np.inf
 
+def dilution_of_precision_batch(anchor_positions, tag_positions, valid=None):
+    """GDOP for many tag positions at once; valid (n, k) masks unused anchors.
+
+    Rows with a NaN position or a singular geometry yield NaN and inf respectively.
+    """
+    anchor_positions = np.asarray(anchor_positions, dtype=float)
+    tag_positions = np.atleast_2d(np.asarray(tag_positions, dtype=float))
+
+    offsets = tag_positions[:, None, :] - anchor_positions[None, :, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        geometry = offsets / np.linalg.norm(offsets, axis=2)[:, :, None]
+    if valid is not None:
+        geometry = np.where(np.asarray(valid)[:, :, None], geometry, 0.0)
+
+    gdop = np.full(len(tag_positions), np.nan)
+    finite = np.isfinite(geometry).all(axis=(1, 2))
+    information = np.einsum('nki,nkj->nij', geometry[finite], geometry[finite])
+    regular = np.abs(np.linalg.det(information)) > 1e-12
+    traces = np.full(len(information), np.inf)
+    if regular.any():
+        traces[regular] = np.sqrt(np.trace(np.linalg.inv(information[regular]), axis1=1, axis2=2))
+    gdop[finite] = traces
+    return gdop
+
 def angle_vectors(vec_u, vec_v):
     dot_product = np.dot(vec_u, vec_v)
     norm_a = np.linalg.norm(vec_u)
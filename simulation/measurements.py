@@ -2,6 +2,8 @@
 class Measurements:
     def __init__(self) -> None:
         self.relation = {}
+        # incremented on every change, see Scenario.revision
+        self.revision = 0
 
     def find_relation_pair_distance(self, station_pair):
         if not isinstance(station_pair, frozenset):
@@ -22,12 +24,32 @@ class Measurements:
             raise ValueError("Pair must have two elements")
 
         self.relation[pair] = distance
+        self.revision += 1
+
+    def update_relations(self, relations):
+        """Apply several {pair: distance} updates in one step."""
+        for pair in relations:
+            if not isinstance(pair, frozenset):
+                raise ValueError("Pair must be a frozenset")
+            if len(pair) != 2:
+                raise ValueError("Pair must have two elements")
+
+        self.relation.update(relations)
+        self.revision += 1
+
+    def remove_relation(self, pair):
+        if not isinstance(pair, frozenset):
+            raise ValueError("Pair must be a frozenset")
+        if self.relation.pop(pair, None) is not None:
+            self.revision += 1
 
     def clear_unused(self, used_stations):
         self.relation = {pair: distance for pair, distance in self.relation.items() if all(station in used_stations for station in pair)}
+        self.revision += 1
 
     def remove_station(self, station):
         self.relation = {pair: distance for pair, distance in self.relation.items() if station not in pair}
+        self.revision += 1
 
     def __str__(self):
         return f"Measurements(relation={self.relation})"
@@ -5,6 +5,15 @@ from simulation import measurements, station
 from data.sse_streamer import SSEStreamer
 
 
+def noisy_distance(true_distance, sigma, rng=None):
+    """Sandbox range model: Gaussian noise with standard deviation sigma and a bias of +sigma.
+
+    Works on scalars and arrays; pass a numpy Generator for reproducible noise.
+    """
+    normal = rng.normal if rng is not None else np.random.normal
+    return normal(np.asarray(true_distance) + sigma, sigma)
+
+
 class SandboxScenario(Scenario):
 
     def __init__(self, name="Sandbox"):
@@ -28,6 +37,6 @@ class SandboxScenario(Scenario):
             # TODO this ignores the TAG_TRUTH as an Anchor. Make sure it is never used for positioning or GDOP calculation
             if np.array_equal(anchor.position(), tag_truth.position()):
                 continue
-            distance = np.random.normal(anchor.distance_to(tag_truth) + self.sigma, self.sigma)
+            distance = noisy_distance(anchor.distance_to(tag_truth), self.sigma)
             self.measurements.update_relation(frozenset([anchor, tag_estimate]), distance)
 
@@ -1,6 +1,8 @@
 import numpy as np
 
 from simulation import measurements, station
+from simulation.spatial import GridIndex
+from data.sse_streamer import AsyncSSEStreamer
 
 class Scenario:
     def __init__(self, name = "New"):
@@ -9,6 +11,20 @@ class Scenario:
         self._stations = []
         self._sigma = 0.0
         self._tag_truth = station.Anchor([0.0, 0.0], 'TAG_TRUTH')
+        self._track = None
+        # window_ms, step_ms and max_age_ms the track was computed with, to recompute it on re-import
+        self._track_options = None
+        self._agg_method = None
+        self._streamer = None
+        # reject outlier ranges (RANSAC) when tags are positioned
+        self._robust_positioning = False
+        # per-AP range calibration (data.calibration.Calibration) applied to imported and streamed ranges
+        self._calibration = None
+        # incremented on changes of the scenario itself; see revision for the full token
+        self._revision = 0
+        # lazily built by anchor_index, with the station list state it was built for
+        self._anchor_index = None
+        self._anchor_index_key = None
 
     def anchor_positions(self):
         return np.array([anchor.position() for anchor in self.get_anchor_list()])
@@ -22,6 +38,7 @@ class Scenario:
                 return s
         new_station = station.Tag(self, name)
         self.stations.append(new_station)
+        self._revision += 1
         return new_station
 
     def get_tag_list(self):
@@ -30,18 +47,70 @@ class Scenario:
     def get_anchor_list(self):
         return [s for s in self.stations if isinstance(s, station.Anchor)]
 
-    def start_streaming(self, url):
-        # TODO implement streaming
-        pass
+    def start_streaming(self, url, on_update=None, sink=None):
+        self.stop_streaming()
+        self.streamer = AsyncSSEStreamer(url, self, on_update=on_update, sink=sink)
 
     def stop_streaming(self):
-        #TODO implement streaming
-        pass
+        if self.streamer is not None:
+            self.streamer.stop_streaming()
+            self.streamer = None
 
     def remove_station(self, station):
         if station in self.stations:
             self.measurements.remove_station(station)
             self.stations.remove(station)
+            self._revision += 1
+
+    def anchor_index(self):
+        """
+        Spatial index (simulation.spatial.GridIndex) over the anchors. Anchor moves
+        update it in place; it is only rebuilt after stations were added or removed.
+        """
+        key = (self._revision, len(self._stations))
+        if self._anchor_index is None or self._anchor_index_key != key:
+            if self._anchor_index is not None:
+                self._anchor_index.clear()
+            self._anchor_index = GridIndex.from_anchors(self.get_anchor_list())
+            self._anchor_index_key = key
+        return self._anchor_index
+
+    def nearest_anchors(self, point, k=1, max_distance=None):
+        """The k anchors nearest to point (x, y), nearest first."""
+        return [anchor for _, anchor in self.anchor_index().nearest_with_distances(point, k, max_distance)]
+
+    def snapshot(self):
+        """
+        Detached copy of the stations, measurements and positioning settings, safe to
+        compute on in another thread while this scenario keeps changing. Track,
+        streamer and calibration are not copied.
+        """
+        copy = Scenario(self._name)
+        copies = {}
+        for s in self._stations:
+            if isinstance(s, station.Anchor):
+                copies[s] = station.Anchor(s.position(), s.name, copy)
+            else:
+                copies[s] = station.Tag(copy, s.name)
+        copy._stations = list(copies.values())
+        copy._measurements.relation = {frozenset(copies.get(s, s) for s in pair): distance
+                                       for pair, distance in self._measurements.relation.items()}
+        copy._sigma = self._sigma
+        copy._robust_positioning = self._robust_positioning
+        if self._tag_truth is not None:
+            copy._tag_truth = station.Anchor(self._tag_truth.position(), self._tag_truth.name, copy)
+        return copy
+
+    @property
+    def revision(self):
+        """
+        Token that changes whenever anything affecting positions or DOP changes:
+        the scenario's own settings, its measurements, or the name or position of
+        any station (including the tag truth). Compare tokens for equality only.
+        """
+        truth = self._tag_truth.revision if self._tag_truth is not None else 0
+        return (self._revision, self._measurements.revision, len(self._stations),
+                sum(s.revision for s in self._stations) + truth)
 
     @property
     def name(self):
@@ -58,6 +127,7 @@ class Scenario:
     @measurements.setter
     def measurements(self, value):
         self._measurements = value
+        self._revision += 1
 
     @property
     def stations(self):
@@ -66,6 +136,7 @@ class Scenario:
     @stations.setter
     def stations(self, value):
         self._stations = list(value)
+        self._revision += 1
 
     @property
     def sigma(self):
@@ -74,6 +145,7 @@ class Scenario:
     @sigma.setter
     def sigma(self, value):
         self._sigma = float(value)
+        self._revision += 1
 
     @property
     def streamer(self):
@@ -89,4 +161,47 @@ class Scenario:
     
     @tag_truth.setter
     def tag_truth(self, value):
-        self._tag_truth = value
\ No newline at end of file
+        self._tag_truth = value
+        self._revision += 1
+
+    @property
+    def track(self):
+        return self._track
+
+    @track.setter
+    def track(self, value):
+        self._track = value
+
+    @property
+    def track_options(self):
+        return self._track_options
+
+    @track_options.setter
+    def track_options(self, value):
+        self._track_options = dict(value) if value else None
+
+    @property
+    def agg_method(self):
+        return self._agg_method
+
+    @agg_method.setter
+    def agg_method(self, value):
+        self._agg_method = value
+
+    @property
+    def robust_positioning(self):
+        return self._robust_positioning
+
+    @robust_positioning.setter
+    def robust_positioning(self, value):
+        self._robust_positioning = bool(value)
+        self._revision += 1
+
+    @property
+    def calibration(self):
+        return self._calibration
+
+    @calibration.setter
+    def calibration(self, value):
+        self._calibration = value
+        self._revision += 1
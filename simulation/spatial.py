@@ -0,0 +1,204 @@
+"""
+Uniform-grid spatial index over anchor positions.
+
+Anchors are hashed into square cells (dict of cell -> anchors), so picking,
+radius and k-nearest queries only look at the cells around the query point
+instead of all anchors; a query that would visit more cells than there are
+anchors (sparse or degenerate layouts) scans the anchors directly. An anchor
+knows the index it is in and reports its moves (`Anchor.update_position`), so
+the index stays current without being rebuilt; `Scenario.anchor_index`
+rebuilds it only when stations are added or removed.
+
+Usage:
+    index = scenario.anchor_index()
+    anchor = index.nearest([2.0, 3.5], k=1, max_distance=0.5)
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class GridIndex:
+    MIN_CELL_SIZE = 1e-3
+
+    def __init__(self, cell_size: float = 1.0):
+        """
+        Args:
+            cell_size: Edge length of a grid cell in position units
+        """
+        self._cell_size = max(float(cell_size), self.MIN_CELL_SIZE)
+        self._cells: Dict[Tuple[int, int], list] = {}
+        # item -> (position, cell)
+        self._items: Dict[Hashable, Tuple[np.ndarray, Tuple[int, int]]] = {}
+        # bounding box of all cells ever occupied, limits the ring search
+        self._bounds = None
+
+    @classmethod
+    def from_anchors(cls, anchors) -> "GridIndex":
+        """Index for anchors with a cell size giving about one anchor per cell."""
+        anchors = list(anchors)
+        cell_size = 1.0
+        if len(anchors) > 1:
+            positions = np.array([anchor.position()[:2] for anchor in anchors], dtype=float)
+            # the larger extent keeps cells sensible for colinear layouts, whose area is ~0
+            extent = float(np.ptp(positions, axis=0).max())
+            if extent > 0:
+                cell_size = extent / math.sqrt(len(anchors))
+        index = cls(cell_size)
+        for anchor in anchors:
+            index.insert(anchor)
+        return index
+
+    @property
+    def cell_size(self) -> float:
+        return self._cell_size
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, anchor):
+        return anchor in self._items
+
+    def _cell(self, position) -> Tuple[int, int]:
+        return (math.floor(position[0] / self._cell_size), math.floor(position[1] / self._cell_size))
+
+    def _add(self, anchor, position):
+        position = np.asarray(position, dtype=float)[:2]
+        cell = self._cell(position)
+        self._cells.setdefault(cell, []).append(anchor)
+        self._items[anchor] = (position, cell)
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[1], cell[0], cell[1]]
+        else:
+            b = self._bounds
+            b[0], b[1], b[2], b[3] = min(b[0], cell[0]), min(b[1], cell[1]), max(b[2], cell[0]), max(b[3], cell[1])
+
+    def _discard(self, anchor):
+        _, cell = self._items.pop(anchor)
+        members = self._cells[cell]
+        members.remove(anchor)
+        if not members:
+            del self._cells[cell]
+
+    def insert(self, anchor):
+        """Add anchor; it reports its later moves to this index."""
+        if anchor in self._items:
+            self._discard(anchor)
+        self._add(anchor, anchor.position())
+        anchor._spatial_index = self
+
+    def remove(self, anchor):
+        if anchor in self._items:
+            self._discard(anchor)
+        if getattr(anchor, "_spatial_index", None) is self:
+            anchor._spatial_index = None
+
+    def clear(self):
+        for anchor in list(self._items):
+            self.remove(anchor)
+        self._bounds = None
+
+    def move(self, anchor, position):
+        """Update the position of an indexed anchor (called by Anchor.update_position)."""
+        if anchor not in self._items:
+            return
+        position = np.asarray(position, dtype=float)[:2]
+        _, cell = self._items[anchor]
+        if self._cell(position) == cell:
+            self._items[anchor] = (position, cell)
+        else:
+            self._discard(anchor)
+            self._add(anchor, position)
+
+    def within(self, point, radius: float) -> List:
+        """Anchors at most radius away from point, nearest first."""
+        point = np.asarray(point, dtype=float)[:2]
+        cx, cy = self._cell(point)
+        reach = int(math.ceil(radius / self._cell_size))
+        if (2 * reach + 1) ** 2 > len(self._items):
+            found = self._scan(point, radius)
+        else:
+            found = []
+            for x in range(cx - reach, cx + reach + 1):
+                for y in range(cy - reach, cy + reach + 1):
+                    for anchor in self._cells.get((x, y), ()):
+                        distance = math.dist(point, self._items[anchor][0])
+                        if distance <= radius:
+                            found.append((distance, anchor))
+        found.sort(key=lambda entry: entry[0])
+        return [anchor for _, anchor in found]
+
+    def nearest(self, point, k: int = 1, max_distance: Optional[float] = None):
+        """
+        The k anchors nearest to point.
+
+        Args:
+            point: Query position (only x and y are used)
+            k: Number of anchors
+            max_distance: Ignore anchors farther away than this
+
+        Returns:
+            List of up to k anchors, nearest first; with k=1 the anchor itself or None
+        """
+        result = self.nearest_with_distances(point, k, max_distance)
+        if k == 1:
+            return result[0][1] if result else None
+        return [anchor for _, anchor in result]
+
+    def nearest_with_distances(self, point, k: int = 1, max_distance: Optional[float] = None) -> List[Tuple[float, object]]:
+        """Like nearest, but returns (distance, anchor) pairs."""
+        if not self._items or k < 1:
+            return []
+        point = np.asarray(point, dtype=float)[:2]
+        limit = math.inf if max_distance is None else float(max_distance)
+        cx, cy = self._cell(point)
+        x0, y0, x1, y1 = self._bounds
+        # rings beyond this one contain no occupied cell
+        last_ring = max(cx - x0, x1 - cx, cy - y0, y1 - cy, 0)
+        if max_distance is not None:
+            last_ring = min(last_ring, int(math.ceil(limit / self._cell_size)))
+
+        best = []
+        ring = 0
+        while ring <= last_ring:
+            if (2 * ring + 1) ** 2 > len(self._items):
+                # the rings so far would cover more cells than there are anchors
+                best = self._scan(point, limit)
+                break
+            for cell in self._ring_cells(cx, cy, ring):
+                for anchor in self._cells.get(cell, ()):
+                    distance = math.dist(point, self._items[anchor][0])
+                    if distance <= limit:
+                        best.append((distance, anchor))
+            if len(best) >= k:
+                best.sort(key=lambda entry: entry[0])
+                del best[k:]
+                # anchors in the next rings are at least ring * cell_size away
+                if best[-1][0] <= ring * self._cell_size:
+                    break
+            ring += 1
+        best.sort(key=lambda entry: entry[0])
+        return best[:k]
+
+    def _scan(self, point, limit: float) -> List[Tuple[float, object]]:
+        """(distance, anchor) of every anchor at most limit away from point, without the grid."""
+        found = []
+        for anchor, (position, _) in self._items.items():
+            distance = math.dist(point, position)
+            if distance <= limit:
+                found.append((distance, anchor))
+        return found
+
+    @staticmethod
+    def _ring_cells(cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for x in range(cx - ring, cx + ring + 1):
+            yield (x, cy - ring)
+            yield (x, cy + ring)
+        for y in range(cy - ring + 1, cy + ring):
+            yield (cx - ring, y)
+            yield (cx + ring, y)
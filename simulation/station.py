@@ -22,11 +22,17 @@ class Station(ABC):
     def __init__(self, scenario=None, name=None):
         self._scenario = scenario
         self._name = name
+        # incremented on every change of name or position, see Scenario.revision
+        self._revision = 0
 
     @property
     def scenario(self):
         return self._scenario
 
+    @property
+    def revision(self):
+        return self._revision
+
     @abstractmethod
     def position(self):
         pass
@@ -46,6 +52,7 @@ class Station(ABC):
     @name.setter
     def name(self, value):
         self._name = value
+        self._revision += 1
 
     def __str__(self):
         return self.name
@@ -58,12 +65,17 @@ class Anchor(Station):
     def __init__(self, position, name='FixedDevice', scenario=None):
         super().__init__(scenario, name)
         self._position = np.array(position)
+        # simulation.spatial.GridIndex this anchor is in, kept current on moves
+        self._spatial_index = None
 
     def position(self, exclude=None):
         return self._position.copy()
 
     def update_position(self, position):
         self._position = np.array(position)
+        self._revision += 1
+        if self._spatial_index is not None:
+            self._spatial_index.move(self, self._position)
 
     def distance_to(self, other: Station):
         return distance_between(self, other)
@@ -84,6 +96,14 @@ class Tag(Station):
         super().__init__(scenario, name)
 
     def position(self, exclude=None):
+        return self._solve(exclude)[0]
+
+    def rejected_partners(self, exclude=None):
+        """Stations whose ranges the robust solver rejected as outliers (empty unless
+        the scenario uses robust positioning)."""
+        return self._solve(exclude)[1]
+
+    def _solve(self, exclude=None):
 
         if exclude is None:
             exclude = {self}
@@ -98,8 +118,9 @@ class Tag(Station):
             anchor_count += 1
 
         if anchor_count < 1:
-            return [0, 0]
+            return [0, 0], []
 
+        partners = []
         station_positions = []
         distances = []
 
@@ -107,10 +128,15 @@ class Tag(Station):
             partner = next(iter(measurement[0].copy() - {self}))
             if partner in exclude:
                 continue
+            partners.append(partner)
             station_positions.append(partner.position(exclude))
             distances = np.append(distances, measurement[1])
 
-        return geometry.trilateration(np.array(station_positions), np.array(distances))
+        station_positions = np.array(station_positions)
+        if getattr(self.scenario, 'robust_positioning', False) and len(partners) > station_positions.shape[1] + 1:
+            position, inliers = geometry.ransac_trilateration(station_positions, distances)
+            return position, [partner for partner, inlier in zip(partners, inliers) if not inlier]
+        return geometry.trilateration(station_positions, distances), []
 
     def distance_to(self, other: Station):
         return distance_between(self, other, self.scenario.measurements)
@@ -0,0 +1,175 @@
+"""
+Multi-tag position tracking.
+
+`MultiTagTracker` smooths the trilaterated positions of any number of tags with
+a constant-velocity Kalman filter. The state of all tags is kept in stacked
+arrays (x: (n, 4) with [x, y, vx, vy], P: (n, 4, 4)), so one predict/update
+step processes every tag at once with batched numpy operations instead of one
+Python filter object per tag.
+
+Usage:
+    tracker = MultiTagTracker()
+    positions, covariances = tracker.step(tags, raw_positions, time.monotonic())
+"""
+
+from typing import Hashable, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+# measurement matrix: only the position is observed
+_H = np.hstack([np.eye(2), np.zeros((2, 2))])
+
+
+class MultiTagTracker:
+    def __init__(self, process_noise: float = 0.5, measurement_noise: float = 0.5, initial_velocity_std: float = 1.0):
+        """
+        Args:
+            process_noise: Standard deviation of the unmodelled acceleration in m/s^2
+            measurement_noise: Standard deviation of a trilaterated position in m
+            initial_velocity_std: Velocity uncertainty of a newly seen tag in m/s
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.initial_velocity_std = initial_velocity_std
+        self._keys: List[Hashable] = []
+        self._index = {}
+        self.x = np.zeros((0, 4))
+        self.P = np.zeros((0, 4, 4))
+        self.t = np.zeros(0)
+        self._initialized = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _rows(self, keys: Iterable[Hashable]) -> np.ndarray:
+        rows = []
+        new = 0
+        for key in keys:
+            row = self._index.get(key)
+            if row is None:
+                row = self._index[key] = len(self._keys)
+                self._keys.append(key)
+                new += 1
+            rows.append(row)
+        if new:
+            self.x = np.vstack([self.x, np.zeros((new, 4))])
+            self.P = np.concatenate([self.P, np.zeros((new, 4, 4))])
+            self.t = np.concatenate([self.t, np.zeros(new)])
+            self._initialized = np.concatenate([self._initialized, np.zeros(new, dtype=bool)])
+        return np.asarray(rows, dtype=int)
+
+    @staticmethod
+    def _transition(dt: np.ndarray) -> np.ndarray:
+        F = np.tile(np.eye(4), (len(dt), 1, 1))
+        F[:, 0, 2] = dt
+        F[:, 1, 3] = dt
+        return F
+
+    def _process_covariance(self, dt: np.ndarray) -> np.ndarray:
+        # white acceleration noise, identical and independent in x and y
+        q = self.process_noise ** 2
+        dt2, dt3, dt4 = dt ** 2, dt ** 3, dt ** 4
+        Q = np.zeros((len(dt), 4, 4))
+        for pos, vel in ((0, 2), (1, 3)):
+            Q[:, pos, pos] = dt4 / 4 * q
+            Q[:, pos, vel] = Q[:, vel, pos] = dt3 / 2 * q
+            Q[:, vel, vel] = dt2 * q
+        return Q
+
+    def step(self, keys: Iterable[Hashable], positions, timestamp: float,
+             measurement_noise: Optional[Union[float, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict all given tags to timestamp and update them with their new positions.
+
+        Args:
+            keys: One hashable per tag (e.g. the Tag objects)
+            positions: (n, 2) measured positions; rows with NaN only predict
+            timestamp: Time of the positions in seconds
+            measurement_noise: Position standard deviation, scalar or one per tag
+                (defaults to the tracker's measurement_noise)
+
+        Returns:
+            Tuple of (positions (n, 2), covariances (n, 2, 2)) after the update
+        """
+        rows = self._rows(keys)
+        if len(rows) == 0:
+            return np.zeros((0, 2)), np.zeros((0, 2, 2))
+        z = np.asarray(positions, dtype=float).reshape(len(rows), 2)
+        valid = np.isfinite(z).all(axis=1)
+        sigma = self.measurement_noise if measurement_noise is None else measurement_noise
+        r = np.broadcast_to(np.asarray(sigma, dtype=float) ** 2, (len(rows),))
+
+        # first sighting: start at the measurement with zero velocity
+        fresh = valid & ~self._initialized[rows]
+        if fresh.any():
+            new_rows = rows[fresh]
+            self.x[new_rows] = np.column_stack([z[fresh], np.zeros((len(new_rows), 2))])
+            self.P[new_rows] = 0.0
+            self.P[new_rows, 0, 0] = self.P[new_rows, 1, 1] = r[fresh]
+            self.P[new_rows, 2, 2] = self.P[new_rows, 3, 3] = self.initial_velocity_std ** 2
+            self.t[new_rows] = timestamp
+            self._initialized[new_rows] = True
+
+        act = self._initialized[rows] & ~fresh
+        active = rows[act]
+        if len(active):
+            dt = np.maximum(timestamp - self.t[active], 0.0)
+            F = self._transition(dt)
+            x = np.einsum('nij,nj->ni', F, self.x[active])
+            P = F @ self.P[active] @ F.transpose(0, 2, 1) + self._process_covariance(dt)
+
+            upd = valid[act]
+            if upd.any():
+                Pu = P[upd]
+                S = Pu[:, :2, :2] + r[act][upd][:, None, None] * np.eye(2)
+                K = Pu[:, :, :2] @ np.linalg.inv(S)
+                innovation = z[act][upd] - x[upd, :2]
+                x[upd] += np.einsum('nij,nj->ni', K, innovation)
+                P[upd] = Pu - K @ (_H @ Pu)
+            self.x[active] = x
+            self.P[active] = P
+            self.t[active] = timestamp
+
+        out = self.x[rows, :2].copy()
+        out[~self._initialized[rows]] = np.nan
+        return out, self.P[rows, :2, :2].copy()
+
+    def positions(self, keys: Iterable[Hashable]) -> np.ndarray:
+        """Current smoothed positions (NaN for tags that were never measured)."""
+        result = []
+        for key in keys:
+            row = self._index.get(key)
+            result.append(self.x[row, :2] if row is not None and self._initialized[row] else (np.nan, np.nan))
+        return np.array(result, dtype=float).reshape(-1, 2)
+
+    def covariances(self, keys: Iterable[Hashable]) -> np.ndarray:
+        """Current (n, 2, 2) position covariances (NaN for tags that were never measured)."""
+        result = []
+        for key in keys:
+            row = self._index.get(key)
+            result.append(self.P[row, :2, :2] if row is not None and self._initialized[row] else np.full((2, 2), np.nan))
+        return np.array(result, dtype=float).reshape(-1, 2, 2)
+
+    def reset(self):
+        """Forget all tags."""
+        self._keys = []
+        self._index = {}
+        self.x = np.zeros((0, 4))
+        self.P = np.zeros((0, 4, 4))
+        self.t = np.zeros(0)
+        self._initialized = np.zeros(0, dtype=bool)
+
+
+def covariance_ellipses(covariances: np.ndarray, n_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Axis lengths and orientation of n_std confidence ellipses for (n, 2, 2) covariances.
+
+    Returns:
+        Tuple of (widths, heights, angles_deg), suitable for an EllipseCollection
+    """
+    values, vectors = np.linalg.eigh(covariances)
+    values = np.clip(values, 0.0, None)
+    widths = 2 * n_std * np.sqrt(values[:, 1])
+    heights = 2 * n_std * np.sqrt(values[:, 0])
+    angles = np.degrees(np.arctan2(vectors[:, 1, 1], vectors[:, 0, 1]))
+    return widths, heights, angles
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from data.async_sse import SSEParser, SSEService
+
+
+def _feed(parser, text):
+    events = []
+    for line in text.split("\n"):
+        event = parser.feed_line(line)
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def test_parser_fields_and_multiline_data():
+    parser = SSEParser()
+    events = _feed(parser, "event : update\nid: 7\nretry: 1500\ndata: a\ndata: b\n\n: heartbeat\n\ndata: c\n\n")
+
+    assert [(e.event, e.data, e.id) for e in events] == [("update", "a\nb", "7"), ("message", "c", "7")]
+    assert events[0].retry == 1500
+    assert parser.last_event_id == "7"
+
+
+class StandInServer:
+    """Local SSE server: every connection gets the next script, a list of event ids or 'hang'."""
+
+    def __init__(self, scripts):
+        self.scripts = list(scripts)
+        self.last_event_ids = []
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/events"
+
+    async def _handle(self, reader, writer):
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        self.last_event_ids.append(headers.get("last-event-id"))
+        script = self.scripts.pop(0) if self.scripts else []
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n\r\nretry: 50\n\n")
+        for event_id in script[:-1] if script and script[-1] == "hang" else script:
+            writer.write(f"id: {event_id}\ndata: range {event_id}\n\n".encode())
+        await writer.drain()
+        if script and script[-1] == "hang":
+            # half-open: keep the connection without sending anything
+            await asyncio.sleep(3600)
+        writer.close()
+
+    async def _shutdown(self):
+        self.server.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=1)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=1)
+        self.loop.close()
+
+
+@pytest.fixture
+def service():
+    service = SSEService(initial_backoff=0.05, max_backoff=0.1, timeout=2.0, idle_timeout=0.3)
+    yield service
+    service.close()
+
+
+def _collect(service, url, count, timeout=5.0):
+    received = []
+    stream_id = service.subscribe(url, lambda event: received.append(event))
+    deadline = time.monotonic() + timeout
+    while len(received) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    service.unsubscribe(stream_id)
+    return received
+
+
+def test_reconnects_with_last_event_id_after_server_close(service):
+    server = StandInServer([["1", "2"], ["3"]])
+    try:
+        received = _collect(service, server.url, 3)
+    finally:
+        server.close()
+
+    assert [e.data for e in received[:3]] == ["range 1", "range 2", "range 3"]
+    assert server.last_event_ids[:2] == [None, "2"]
+
+
+def test_reconnects_half_open_connection_after_idle_timeout(service):
+    server = StandInServer([["1", "hang"], ["2"]])
+    try:
+        received = _collect(service, server.url, 2)
+    finally:
+        server.close()
+
+    assert [e.data for e in received[:2]] == ["range 1", "range 2"]
+    assert server.last_event_ids[:2] == [None, "1"]
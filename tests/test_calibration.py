@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from data.calibration import Calibration, fit_calibration
+from data.importer import _match_anchor
+from simulation.station import Anchor
+
+HEADER = "#<Time(ms)>,<True Range(m)>,<Est. Range(m)>,<Std dev(m)>,<Successes#>,<Burst#>,<RSSI(dBm)>,<Ch-MHz>,<AP-SSID>,<RTT AP?>\n"
+ANCHORS = {"FTM_PINK": [0.0, 0.0], "FTM_BLUE": [0.0, 11.0], "FTM_GREEN": [16.0, 11.0]}
+# est = scale * reference + offset
+MODELS = {"FTM_PINK": (1.1, 0.5), "FTM_BLUE": (0.9, 1.5), "FTM_GREEN": (1.0, -0.5)}
+
+
+def _write_scenario(workspace, name, tag_position):
+    folder = workspace / name
+    folder.mkdir()
+    stations = [{"name": n, "type": "ANCHOR", "position": p} for n, p in ANCHORS.items()]
+    stations.append({"name": "TAG", "type": "TAG", "position": tag_position})
+    (folder / "scenario.json").write_text(json.dumps({"stations": stations}))
+    lines = []
+    for i in range(3):
+        for ap, (scale, offset) in MODELS.items():
+            reference = float(np.linalg.norm(np.subtract(ANCHORS[ap], tag_position)))
+            lines.append(f"{1000 + i},0.5,{scale * reference + offset},0.1,5,24,-56,2412,{ap},1\n")
+        # not an anchor of the scenario; must neither be fitted nor be attributed to another anchor
+        lines.append(f"{1000 + i},0.5,3.0,0.1,5,24,-56,2412,OTHER_AP,1\n")
+    (folder / "rtt-log-1.csv").write_text(HEADER + "".join(lines))
+
+
+def test_fit_recovers_models_and_skips_unmatched_aps(tmp_path):
+    for name, tag_position in (("a", [4.0, 3.0]), ("b", [12.0, 8.0]), ("c", [8.0, 1.0])):
+        _write_scenario(tmp_path, name, tag_position)
+
+    calibration, error = fit_calibration(str(tmp_path))
+
+    assert error is None
+    assert set(calibration.models) == set(MODELS)
+    for ap, (scale, offset) in MODELS.items():
+        assert np.allclose(calibration.models[ap][:2], (scale, offset))
+
+
+def test_unmatched_ap_has_no_anchor():
+    anchors = [Anchor(p, n) for n, p in ANCHORS.items()]
+    assert _match_anchor(anchors, "ftm_blue").name == "FTM_BLUE"
+    assert _match_anchor(anchors, "OTHER_AP") is None
+
+
+def test_correct_frame_matches_correct():
+    calibration = Calibration({"A": (1.1, 0.5, 0.02), "B": (0.9, -0.2, -0.01)}, use_rssi=True, rssi_center=-60.0)
+    df = pd.DataFrame({"ap-ssid": ["A", "B", "C", "A", "B"],
+                       "est._range(m)": [5.0, 7.0, 3.0, 9.0, 2.0],
+                       "rssi(dbm)": [-50, -70, -60, 0, np.nan]})
+
+    corrected = calibration.correct_frame(df)
+
+    expected = [calibration.correct(ap, est, rssi)
+                for ap, est, rssi in zip(df["ap-ssid"], df["est._range(m)"], df["rssi(dbm)"])]
+    assert np.allclose(corrected["est._range(m)"], expected)
+    # unknown APs are left unchanged and the input frame is not modified
+    assert corrected["est._range(m)"].iloc[2] == 3.0
+    assert df["est._range(m)"].tolist() == [5.0, 7.0, 3.0, 9.0, 2.0]
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from presentation.compute_worker import ComputeWorker, ScenarioResult, _dependent_tags, compute_scenario
+from simulation.scenario import Scenario
+from simulation.station import Anchor, Tag
+
+
+@pytest.fixture(scope="module", autouse=True)
+def qt_app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def _scenario():
+    """t1 is trilaterated from a1..a3; t2 only from a4 and t1; t3 only from a4 and a5."""
+    scenario = Scenario("chain")
+    a1, a2, a3 = Anchor([0.0, 0.0], "a1", scenario), Anchor([10.0, 0.0], "a2", scenario), Anchor([0.0, 10.0], "a3", scenario)
+    a4, a5 = Anchor([20.0, 20.0], "a4", scenario), Anchor([30.0, 20.0], "a5", scenario)
+    t1, t2, t3 = Tag(scenario, "t1"), Tag(scenario, "t2"), Tag(scenario, "t3")
+    scenario.stations = [a1, a2, a3, a4, a5, t1, t2, t3]
+    ranges = {(a1, t1): 5.0, (a2, t1): 8.0, (a3, t1): 7.0, (a4, t2): 15.0, (t1, t2): 6.0, (a4, t3): 4.0, (a5, t3): 8.0}
+    for (a, b), distance in ranges.items():
+        scenario.measurements.update_relation(frozenset([a, b]), distance)
+    return scenario
+
+
+def _station(scenario, name):
+    return next(s for s in scenario.stations if s.name == name)
+
+
+def test_dependents_are_transitive():
+    scenario = _scenario()
+    dependents = _dependent_tags(scenario, scenario.get_tag_list(), [_station(scenario, "a1")])
+    assert {s.name for s in dependents} == {"t1", "t2"}
+    assert {s.name for s in _dependent_tags(scenario, scenario.get_tag_list(), [_station(scenario, "a5")])} == {"t3"}
+
+
+def test_partial_result_matches_full_computation_and_is_completed_later():
+    scenario = _scenario()
+    worker = ComputeWorker(background=False)
+    worker.request([scenario])
+    before = worker.result(scenario)
+    assert not before.partial and worker.is_current(scenario)
+
+    a1 = _station(scenario, "a1")
+    a1.update_position([1.0, -1.0])
+    worker.request([scenario], changed=[a1])
+    partial = worker.result(scenario)
+
+    assert partial.partial and partial.sequence > before.sequence
+    full = compute_scenario(scenario).tag_positions
+    # t2 only depends on a1 through t1, but must follow as well
+    np.testing.assert_allclose(partial.tag_positions, full)
+    assert not np.allclose(partial.tag_positions[1], before.tag_positions[1])
+
+    # same revision, but a request without changed stations computes the partial result in full
+    worker.request([scenario])
+    assert not worker.result(scenario).partial
+    assert worker.result(scenario).sequence > partial.sequence
+    computed = worker.computed
+    worker.request([scenario])
+    assert worker.computed == computed
+
+
+def test_pending_requests_are_merged_while_busy():
+    scenario = _scenario()
+    worker = ComputeWorker(background=True)
+    # pretend a computation is in flight, so requests only queue up
+    worker._busy = True
+    a1, a2 = _station(scenario, "a1"), _station(scenario, "a2")
+
+    worker.request([scenario], changed=[a1])
+    worker.request([scenario], changed=[a2])
+    assert worker._pending[id(scenario)] == (scenario, {a1, a2})
+
+    # a full request makes the merged request full, and a later partial one keeps it full
+    worker.request([scenario])
+    assert worker._pending[id(scenario)] == (scenario, None)
+    worker.request([scenario], changed=[a1])
+    assert worker._pending[id(scenario)] == (scenario, None)
+    worker.stop()
+    assert not worker._pending
+
+
+def test_older_results_are_discarded():
+    scenario = _scenario()
+    worker = ComputeWorker(background=True)
+    worker._scenarios[id(scenario)] = scenario
+    newer = ScenarioResult(scenario.revision, 5, np.zeros((3, 2)), 1.0)
+    older = ScenarioResult(scenario.revision, 4, np.ones((3, 2)), 2.0)
+    emitted = []
+    worker.results_ready.connect(lambda: emitted.append(True))
+
+    worker._on_finished([(id(scenario), newer)])
+    worker._on_finished([(id(scenario), older), (id(object()), older)])
+
+    assert worker.result(scenario) is newer
+    assert worker.discarded == 2
+    assert emitted == [True]
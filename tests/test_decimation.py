@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from simulation.decimation import bucket_size_for, decimate_indices, lttb_indices, minmax_indices
+
+
+def _path(n, nan_every=None):
+    rng = np.random.default_rng(4)
+    x = np.cumsum(rng.normal(size=n))
+    y = np.cumsum(rng.normal(size=n))
+    if nan_every:
+        # interior gaps only; the endpoints stay finite
+        x[nan_every:-1:nan_every] = np.nan
+        y[3:-1:nan_every] = np.nan
+    return x, y
+
+
+def test_bucket_size_for():
+    assert bucket_size_for(1000, 100) == 10
+    assert bucket_size_for(1001, 100) == 11
+    assert bucket_size_for(50, 100) == 1
+    assert bucket_size_for(0, 100) == 1
+    assert bucket_size_for(100, 0) == 100
+
+
+@pytest.mark.parametrize("method, per_bucket", [("lttb", 1), ("minmax", 4)])
+@pytest.mark.parametrize("nan_every", [None, 7])
+def test_indices_are_bounded_sorted_and_finite(method, per_bucket, nan_every):
+    x, y = _path(10_000, nan_every)
+    bucket_size = bucket_size_for(len(x), 200)
+
+    kept = decimate_indices(x, y, bucket_size, method)
+
+    assert len(kept) <= per_bucket * 200 + 2
+    assert len(kept) >= 100
+    assert np.all(np.diff(kept) > 0)
+    assert kept[0] >= 0 and kept[-1] < len(x)
+    assert np.isfinite(x[kept]).all() and np.isfinite(y[kept]).all()
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+
+
+def test_minmax_preserves_extent():
+    x, y = _path(5_000, nan_every=11)
+    kept = minmax_indices(x, y, 50)
+    assert (x[kept].min(), x[kept].max()) == (np.nanmin(x), np.nanmax(x))
+    assert (y[kept].min(), y[kept].max()) == (np.nanmin(y), np.nanmax(y))
+
+
+def test_small_inputs_keep_all_finite_points():
+    x = np.array([0.0, np.nan, 2.0])
+    y = np.array([0.0, 1.0, 2.0])
+    for method in ("lttb", "minmax"):
+        assert decimate_indices(x, y, 1, method).tolist() == [0, 2]
+    assert lttb_indices(np.full(5, np.nan), np.zeros(5), 2).tolist() == []
+
+
+def test_lttb_piecewise_continues_from_previous():
+    x, y = _path(1_000)
+    kept = lttb_indices(x[500:], y[500:], 10, previous=(x[499], y[499]))
+    assert len(kept) <= 50 + 1
+    assert kept[-1] == 499
+
+
+def test_decimated_line_draws_about_one_bucket_per_pixel():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from presentation.trajectory import DecimatedLine
+
+    fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
+    x, y = _path(100_000)
+    ax.set_xlim(np.nanmin(x), np.nanmax(x))
+    ax.set_ylim(np.nanmin(y), np.nanmax(y))
+    for method, per_bucket in (("lttb", 1), ("minmax", 4)):
+        line = DecimatedLine(method)
+        ax.add_line(line)
+        line.set_path(x, y)
+        fig.canvas.draw()
+        assert 0 < line.vertex_count() <= per_bucket * int(ax.bbox.width) + 2
+        line.remove()
+    plt.close(fig)
@@ -0,0 +1,71 @@
+from data.ingestion import RangeUpdate, apply_updates
+from simulation.epochs import EpochAssembler, EpochCollector
+from simulation.scenario import Scenario
+from simulation.station import Anchor, Tag
+
+
+def _scenario():
+    scenario = Scenario("stream")
+    anchors = [Anchor([0.0, 0.0], "A"), Anchor([4.0, 0.0], "B"), Anchor([0.0, 4.0], "C")]
+    tag = Tag(scenario, "T")
+    scenario.stations = anchors + [tag]
+    return scenario, anchors, tag
+
+
+def test_epoch_is_emitted_once_all_anchors_reported():
+    _, anchors, tag = _scenario()
+    assembler = EpochAssembler(tag, window=1.0)
+
+    assert assembler.add(anchors[0], 1.0, 10.0, anchors) is None
+    assert assembler.add(anchors[1], 2.0, 10.1, anchors) is None
+    assert assembler.add(anchors[1], 2.5, 10.2, anchors) is None
+    epoch = assembler.add(anchors[2], 3.0, 10.3, anchors)
+
+    assert epoch.ranges == {anchors[0]: 1.0, anchors[1]: 2.5, anchors[2]: 3.0}
+    assert (epoch.start, epoch.end) == (10.0, 10.3)
+
+
+def test_window_closes_epoch_and_reports_stale_anchors():
+    _, anchors, tag = _scenario()
+    assembler = EpochAssembler(tag, window=0.5, max_age=2.0)
+    assembler.add(anchors[2], 3.0, 0.0, anchors)
+    assembler.add(anchors[0], 1.0, 5.0, anchors)
+
+    epoch = assembler.add(anchors[1], 2.0, 5.6, anchors)
+
+    assert epoch.ranges == {anchors[0]: 1.0}
+    # C was last heard at t=0, more than max_age before the epoch closed
+    assert epoch.stale == {anchors[2]}
+    assert assembler.flush(anchors, force=True).ranges == {anchors[1]: 2.0}
+
+
+def test_collector_through_apply_updates():
+    scenario, anchors, tag = _scenario()
+    collector = EpochCollector(window=1.0)
+
+    changed = apply_updates([RangeUpdate(scenario, "A", "T", 1.0, 0.0), RangeUpdate(scenario, "B", "T", 2.0, 0.1)],
+                            collector)
+    assert changed == set()
+    assert scenario.measurements.relation == {}
+
+    changed = apply_updates([RangeUpdate(scenario, "C", "T", 3.0, 0.2)], collector)
+    assert changed == {scenario}
+    assert len(scenario.measurements.relation) == 3
+    assert (collector.ranges_in, collector.epochs_out) == (3, 1)
+
+
+def test_removed_tags_and_anchors_are_dropped():
+    scenario, anchors, tag = _scenario()
+    collector = EpochCollector(window=1.0)
+    collector.add(tag, anchors[0], 1.0, 0.0)
+    collector.add(tag, anchors[1], 2.0, 0.1)
+
+    scenario.remove_station(anchors[1])
+    epoch = collector.flush(force=True)[0]
+    assert epoch.ranges == {anchors[0]: 1.0}
+
+    collector.add(tag, anchors[0], 1.0, 5.0)
+    scenario.remove_station(tag)
+    assert collector.flush(force=True) == []
+    assert collector.add(tag, anchors[0], 1.0, 6.0) is None
+    assert collector.flush(force=True) == []
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from data.import_measurements import merge_scenario_logs, read_csv_incremental
+
+HEADER = "#<Time(ms)>,<True Range(m)>,<Est. Range(m)>,<Std dev(m)>,<AP-SSID>\n"
+
+
+def _write_log(path, rows):
+    path.write_text(HEADER + "".join(f"{t},0.5,{r},0.1,{ap}\n" for t, r, ap in rows), encoding="utf-8")
+
+
+def test_merge_scenario_logs_is_time_ordered(tmp_path):
+    scenario = tmp_path / "walk"
+    scenario.mkdir()
+    _write_log(scenario / "a.csv", [(100, 1.0, "AP_A"), (300, 1.1, "AP_A"), (500, 1.2, "AP_A")])
+    _write_log(scenario / "b.csv", [(200, 2.0, "AP_B"), (300, 2.1, "AP_B"), (600, 2.2, "AP_B")])
+    (scenario / "c.csv").write_text("// comment only\n" + HEADER, encoding="utf-8")
+
+    rows = list(merge_scenario_logs("walk", str(tmp_path)))
+
+    assert [row["time(ms)"] for row in rows] == [100, 200, 300, 300, 500, 600]
+    assert [row["ap-ssid"] for row in rows] == ["AP_A", "AP_B", "AP_A", "AP_B", "AP_A", "AP_B"]
+    assert all(row["scenario"] == "walk" for row in rows)
+
+
+def test_merge_scenario_logs_skips_rows_without_timestamp(tmp_path):
+    scenario = tmp_path / "walk"
+    scenario.mkdir()
+    _write_log(scenario / "a.csv", [(100, 1.0, "AP_A"), ("n/a", 1.1, "AP_A"), (300, 1.2, "AP_A")])
+
+    assert [row["time(ms)"] for row in merge_scenario_logs("walk", str(tmp_path))] == [100, 300]
+
+
+def test_merge_scenario_logs_missing_scenario(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        merge_scenario_logs("missing", str(tmp_path))
+
+
+def _touch(path, step):
+    # make every rewrite visible to the (size, mtime) cache key, whatever the timestamp granularity
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + step * 1_000_000_000))
+
+
+def _ranges(frame):
+    return frame["est._range(m)"].tolist()
+
+
+def test_read_csv_incremental_append_and_partial_line(tmp_path):
+    path = tmp_path / "log.csv"
+    _write_log(path, [(100, 1.0, "AP_A")])
+    assert _ranges(read_csv_incremental(path)) == [1.0]
+
+    with path.open("a", encoding="utf-8") as f:
+        f.write("200,0.5,2.0,0.1,AP_A\n300,0.5,3.")
+    _touch(path, 1)
+    # the unterminated row is not consumed yet
+    assert _ranges(read_csv_incremental(path)) == [1.0, 2.0]
+
+    with path.open("a", encoding="utf-8") as f:
+        f.write("5,0.1,AP_A\n")
+    _touch(path, 2)
+    assert _ranges(read_csv_incremental(path)) == [1.0, 2.0, 3.5]
+
+
+def test_read_csv_incremental_rereads_shrunk_file(tmp_path):
+    path = tmp_path / "log.csv"
+    _write_log(path, [(100, 1.0, "AP_A"), (200, 2.0, "AP_A")])
+    read_csv_incremental(path)
+
+    _write_log(path, [(100, 9.0, "AP_A")])
+    _touch(path, 1)
+    assert _ranges(read_csv_incremental(path)) == [9.0]
+
+
+def test_read_csv_incremental_rereads_edited_file(tmp_path):
+    path = tmp_path / "log.csv"
+    _write_log(path, [(100, 1.0, "AP_A"), (200, 2.0, "AP_A")])
+    read_csv_incremental(path)
+
+    # same size, different content
+    _write_log(path, [(100, 7.0, "AP_A"), (200, 8.0, "AP_A")])
+    _touch(path, 1)
+    assert _ranges(read_csv_incremental(path)) == [7.0, 8.0]
+
+    # rewritten and longer: must not keep the old rows and only add the new tail
+    _write_log(path, [(100, 4.0, "AP_A"), (200, 5.0, "AP_A"), (300, 6.0, "AP_A")])
+    _touch(path, 2)
+    assert _ranges(read_csv_incremental(path)) == [4.0, 5.0, 6.0]
+    # and the fresh frame is what stays cached
+    assert _ranges(read_csv_incremental(path)) == [4.0, 5.0, 6.0]
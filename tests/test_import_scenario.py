@@ -0,0 +1,41 @@
+import json
+
+from data.import_scenario import load_scenario_from_json, update_scenario_from_json
+from simulation.scenario import Scenario
+from simulation.station import Anchor, Tag
+
+
+def _write_config(workspace, stations):
+    folder = workspace / "walk"
+    folder.mkdir(exist_ok=True)
+    (folder / "scenario.json").write_text(json.dumps({"stations": stations}))
+
+
+def _anchor(name, position):
+    return {"name": name, "type": "ANCHOR", "position": position}
+
+
+def test_update_keeps_station_identity_and_measurements(tmp_path):
+    _write_config(tmp_path, [_anchor("A", [0.0, 0.0]), _anchor("B", [10.0, 0.0]),
+                             {"name": "T", "type": "TAG", "position": [1.0, 1.0]}])
+    scenario = Scenario("walk")
+    assert load_scenario_from_json(scenario, "walk", str(tmp_path))
+    a, b, tag = scenario.stations
+    scenario.measurements.update_relation(frozenset([a, tag]), 3.0)
+    truth = scenario.tag_truth
+
+    _write_config(tmp_path, [_anchor("A", [2.0, 3.0]), _anchor("C", [0.0, 10.0]),
+                             {"name": "T", "type": "TAG", "position": [4.0, 4.0]}])
+    assert update_scenario_from_json(scenario, "walk", str(tmp_path))
+
+    names = {s.name: s for s in scenario.stations}
+    assert set(names) == {"A", "C", "T"}
+    assert names["A"] is a and names["T"] is tag
+    assert a.position().tolist() == [2.0, 3.0]
+    assert isinstance(names["C"], Anchor) and isinstance(names["T"], Tag)
+    assert scenario.measurements.relation == {frozenset([a, tag]): 3.0}
+    assert scenario.tag_truth is truth and truth.position().tolist() == [4.0, 4.0]
+
+
+def test_update_without_config_fails(tmp_path):
+    assert not update_scenario_from_json(Scenario("walk"), "walk", str(tmp_path))
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+from data.ingestion import IngestionQueue, RangeUpdate, apply_updates
+from simulation.scenario import Scenario
+from simulation.station import Anchor, Tag
+
+
+def _scenario():
+    scenario = Scenario("stream")
+    scenario.stations = [Anchor([0.0, 0.0], "1"), Anchor([4.0, 0.0], "2")]
+    return scenario
+
+
+def test_drain_returns_pending_updates_oldest_first():
+    scenario = _scenario()
+    queue = IngestionQueue(IngestionQueue.KEEP_N)
+    queue.push(scenario, "1", "7", 1.0)
+    queue.push(scenario, "2", "7", 2.0)
+
+    assert [(u.source, u.distance) for u in queue.drain()] == [("1", 1.0), ("2", 2.0)]
+    assert queue.drain() == []
+    assert queue.stats() == {"received": 2, "coalesced": 0, "dropped": 0, "pending": 0}
+
+
+def test_apply_updates_resolves_names_and_newest_range_wins():
+    scenario = _scenario()
+    anchor = scenario.stations[0]
+    updates = [RangeUpdate(scenario, "1", "7", 1.0), RangeUpdate(scenario, anchor, "7", 1.5),
+               RangeUpdate(scenario, "2", "7", 3.0), RangeUpdate(scenario, "1", "1", 9.0)]
+
+    changed = apply_updates(updates)
+
+    tag = scenario.get_station_by_name("7")
+    assert changed == {scenario}
+    assert isinstance(tag, Tag)
+    assert scenario.measurements.find_relation_pair_distance(frozenset([anchor, tag])) == 1.5
+    assert len(scenario.measurements.relation) == 2
+
+
+def test_push_is_thread_safe():
+    scenario = _scenario()
+    queue = IngestionQueue(IngestionQueue.KEEP_N, capacity=100000)
+    threads = [threading.Thread(target=lambda i=i: [queue.push(scenario, str(i), str(n), n) for n in range(1000)])
+               for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(queue.drain()) == 4000
+
+
+def test_latest_policy_coalesces_per_pair():
+    scenario = _scenario()
+    queue = IngestionQueue(IngestionQueue.LATEST, capacity=2)
+    queue.push(scenario, "1", "7", 1.0)
+    queue.push(scenario, "7", "1", 1.1)
+    queue.push(scenario, "2", "7", 2.0)
+    queue.push(scenario, "2", "8", 3.0)
+
+    assert [u.distance for u in queue.drain()] == [2.0, 3.0]
+    assert queue.stats()["coalesced"] == 1
+    assert queue.stats()["dropped"] == 1
+
+
+def test_keep_n_policy_drops_oldest():
+    scenario = _scenario()
+    queue = IngestionQueue(IngestionQueue.KEEP_N, capacity=3)
+    for n in range(5):
+        queue.push(scenario, "1", "7", float(n))
+
+    assert [u.distance for u in queue.drain()] == [2.0, 3.0, 4.0]
+    assert queue.stats()["dropped"] == 2
+
+
+def test_block_policy_waits_for_drain_and_times_out():
+    scenario = _scenario()
+    queue = IngestionQueue(IngestionQueue.BLOCK, capacity=1, block_timeout=2.0)
+    queue.push(scenario, "1", "7", 1.0)
+
+    producer = threading.Thread(target=queue.push, args=(scenario, "1", "7", 2.0))
+    producer.start()
+    time.sleep(0.1)
+    assert producer.is_alive()
+    assert [u.distance for u in queue.drain()] == [1.0]
+    producer.join(timeout=1)
+    assert not producer.is_alive()
+    assert [u.distance for u in queue.drain()] == [2.0]
+
+    queue.block_timeout = 0.05
+    queue.push(scenario, "1", "7", 3.0)
+    queue.push(scenario, "1", "7", 4.0)
+    assert [u.distance for u in queue.drain()] == [3.0]
+    assert queue.stats()["dropped"] == 1
+
+
+def test_async_block_policy_does_not_stall_the_loop():
+    scenario = _scenario()
+    queue = IngestionQueue(IngestionQueue.BLOCK, capacity=1, block_timeout=2.0)
+    queue.push(scenario, "1", "7", 1.0)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        # drained from another thread, like the GUI timer does
+        threading.Timer(0.2, queue.drain).start()
+        started = time.monotonic()
+        await queue.push_async(scenario, "1", "7", 2.0)
+        waited = time.monotonic() - started
+        tick_task.cancel()
+        return ticks, waited
+
+    ticks, waited = asyncio.run(main())
+    assert 0.15 < waited < 1.5
+    assert ticks >= 5
+    assert [u.distance for u in queue.drain()] == [2.0]
+
+
+def test_async_block_policy_drops_after_timeout():
+    scenario = _scenario()
+    queue = IngestionQueue(IngestionQueue.BLOCK, capacity=1, block_timeout=0.05)
+    queue.push(scenario, "1", "7", 1.0)
+
+    asyncio.run(queue.push_async(scenario, "1", "7", 2.0))
+
+    assert [u.distance for u in queue.drain()] == [1.0]
+    assert queue.stats() == {"received": 2, "coalesced": 0, "dropped": 1, "pending": 0}
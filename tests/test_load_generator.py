@@ -0,0 +1,48 @@
+import itertools
+import json
+
+from data.load_generator import LoadGenerator, encode_mqtt_batch, format_sse
+
+
+def _take(generator, count, start_id=0):
+    return list(itertools.islice(generator.events(start_id), count))
+
+
+def test_same_seed_gives_the_same_stream():
+    first = _take(LoadGenerator(tags=2, anchors=4, path="random_walk", seed=3), 200)
+    second = _take(LoadGenerator(tags=2, anchors=4, path="random_walk", seed=3), 200)
+    other = _take(LoadGenerator(tags=2, anchors=4, path="random_walk", seed=4), 200)
+
+    assert first == second
+    assert [e["raw_distance"] for _, e in first] != [e["raw_distance"] for _, e in other]
+    assert [e["id"] for _, e in first] == list(range(200))
+
+
+def test_tags_move_when_unpaced():
+    generator = LoadGenerator(tags=1, anchors=4, rate=0, sigma=0.0, path="circle", speed=2.0)
+    events = _take(generator, 4 * 50)
+
+    times = [t for t, _ in events]
+    assert times[-1] > 0 and all(b > a for a, b in zip(times, times[1:]))
+    # one tag-anchor pair per round
+    distances = [e["raw_distance"] for _, e in events if e["destination_id"] == 1]
+    assert len(set(distances)) == len(distances)
+
+
+def test_start_id_resumes_the_same_sequence():
+    generator = LoadGenerator(tags=2, anchors=3, path="random_walk", seed=1)
+    full = _take(generator, 100)
+
+    assert _take(generator, 50, start_id=37) == full[37:87]
+    assert [e for e in itertools.islice(generator.paced(start_id=37), 5)] == [e for _, e in full[37:42]]
+
+
+def test_unpaced_stream_stops_after_duration():
+    generator = LoadGenerator(rate=0)
+    assert 0 < sum(1 for _ in generator.paced(duration=0.05)) < 10 ** 7
+
+
+def test_encodings():
+    event = _take(LoadGenerator(), 1)[0][1]
+    assert format_sse(event).startswith("event : update\nid: 0\ndata: ")
+    assert json.loads(encode_mqtt_batch([event])) == [event]
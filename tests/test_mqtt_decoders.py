@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from data.mqtt_decoders import decode_payload, detect_format, encode_binary
+
+RANGES = [("7", "1", 110.5), ("7", "2", 42.25)]
+
+
+def test_json_object_and_array():
+    item = {"id": 17, "source_id": 7, "destination_id": 1, "raw_distance": 110.5}
+    assert decode_payload(json.dumps(item).encode()) == ([("7", "1", 110.5)], None)
+    assert decode_payload(b"  " + json.dumps([item, item]).encode()) == ([("7", "1", 110.5)] * 2, None)
+
+
+def test_binary_round_trip():
+    payload = encode_binary(RANGES)
+    assert detect_format(payload) == "binary"
+    assert decode_payload(payload) == (RANGES, None)
+
+
+@pytest.mark.parametrize("first_id", [0x5B, 0x7B, 0x0A + 0x100 * 0x7B, 32])
+def test_binary_batches_starting_with_json_or_whitespace_bytes(first_id):
+    payload = encode_binary(RANGES, first_id=first_id)
+    assert decode_payload(payload) == (RANGES, None)
+    assert decode_payload(payload, "binary") == (RANGES, None)
+
+
+def test_json_whose_length_fits_binary_records():
+    item = {"source_id": 7, "destination_id": 1, "raw_distance": 110.5}
+    payload = json.dumps(item).encode()
+    payload += b" " * (-len(payload) % 16)
+    assert len(payload) % 16 == 0
+    assert decode_payload(payload) == ([("7", "1", 110.5)], None)
+
+
+def test_explicit_format_and_errors():
+    ranges, error = decode_payload(encode_binary(RANGES), "json")
+    assert ranges == [] and error.startswith("Error decoding json payload")
+    assert decode_payload(b"abc", "binary")[1].startswith("Error decoding binary payload")
+    assert decode_payload(b"{}", "xml") == ([], "Unknown MQTT payload format: xml")
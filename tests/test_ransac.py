@@ -0,0 +1,65 @@
+import numpy as np
+
+from simulation import geometry
+
+ANCHORS = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0], [10.0, 10.0], [5.0, -5.0], [-5.0, 5.0]])
+
+
+def _ranges(position):
+    return np.linalg.norm(ANCHORS - position, axis=1)
+
+
+def test_rejects_a_multipath_range():
+    truth = np.array([3.0, 4.0])
+    distances = _ranges(truth)
+    distances[1] += 6.0
+
+    position, inliers = geometry.ransac_trilateration(ANCHORS, distances)
+
+    np.testing.assert_allclose(position, truth, atol=1e-6)
+    assert inliers.tolist() == [True, False, True, True, True, True]
+    # plain least squares is pulled away by the outlier
+    assert np.linalg.norm(geometry.trilateration(ANCHORS, distances) - truth) > 0.5
+
+
+def test_batch_matches_single_epochs_and_skips_missing_ranges():
+    rng = np.random.default_rng(1)
+    truths = rng.uniform(0.0, 10.0, (20, 2))
+    distances = np.array([_ranges(t) for t in truths]) + rng.normal(0.0, 0.05, (20, len(ANCHORS)))
+    distances[::3, 2] += 8.0
+    distances[1, 4] = np.nan
+
+    positions, inliers = geometry.ransac_trilateration_batch(ANCHORS, distances)
+
+    assert np.linalg.norm(positions - truths, axis=1).max() < 0.3
+    assert not inliers[::3, 2].any()
+    assert not inliers[1, 4]
+    for i in (0, 1, 5):
+        position, mask = geometry.ransac_trilateration(ANCHORS, distances[i])
+        np.testing.assert_allclose(positions[i], position)
+        assert (inliers[i] == mask).all()
+
+
+def test_without_redundancy_every_valid_range_is_an_inlier():
+    distances = _ranges(np.array([2.0, 2.0]))[:3]
+    positions, inliers = geometry.ransac_trilateration_batch(ANCHORS[:3], distances)
+
+    np.testing.assert_allclose(positions[0], [2.0, 2.0], atol=1e-6)
+    assert inliers.all()
+
+
+def test_chunked_matches_unchunked():
+    rng = np.random.default_rng(2)
+    anchors = rng.uniform(0.0, 20.0, (9, 2))
+    truths = rng.uniform(0.0, 20.0, (50, 2))
+    distances = np.linalg.norm(truths[:, None, :] - anchors[None, :, :], axis=2) + rng.normal(0.0, 0.05, (50, 9))
+    distances[::4, 3] += 7.0
+    distances[::7, 5] = np.nan
+
+    expected = geometry.ransac_trilateration_batch(anchors, distances, max_subsets=40, chunk_size=len(distances))
+    for chunk_size in (1, 7, None):
+        positions, inliers = geometry.ransac_trilateration_batch(anchors, distances, max_subsets=40,
+                                                                 chunk_size=chunk_size)
+        np.testing.assert_array_equal(positions, expected[0])
+        np.testing.assert_array_equal(inliers, expected[1])
+    np.testing.assert_allclose(expected[0], truths, atol=0.2)
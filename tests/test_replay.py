@@ -0,0 +1,87 @@
+import os
+
+from data.ingestion import IngestionQueue, RangeUpdate
+from data import replay
+from data.replay import Replayer, StreamRecorder, _iter_records, event_stream_items, recording_items
+from simulation.scenario import Scenario
+
+
+def _record(path, scenario, ranges):
+    recorder = StreamRecorder(str(path))
+    recorder.record_many([RangeUpdate(scenario, source, destination, distance, float(i))
+                          for i, (source, destination, distance) in enumerate(ranges)])
+    recorder.close()
+
+
+def test_recording_round_trip(tmp_path):
+    path = tmp_path / "run.gdoprec"
+    walk, other = Scenario("walk"), Scenario("other")
+    recorder = StreamRecorder(str(path))
+    recorder.record_many([RangeUpdate(walk, "1", "7", 1.5, 10.0), RangeUpdate(other, "2", "7", 2.5, 11.0)])
+    recorder.close()
+
+    assert list(recording_items(str(path))) == [(10.0, "1", "7", 1.5), (11.0, "2", "7", 2.5)]
+    assert list(recording_items(str(path), "other")) == [(11.0, "2", "7", 2.5)]
+
+
+def test_resume_reuses_name_ids(tmp_path):
+    path = tmp_path / "run.gdoprec"
+    scenario = Scenario("walk")
+    _record(path, scenario, [("1", "7", 1.0)])
+    _record(path, scenario, [("1", "7", 2.0), ("2", "7", 3.0)])
+
+    names = [record[1:] for record in _iter_records(str(path)) if record[0] == 1]
+    # walk, 1, 7 from the first session; only the new station 2 is added on resume
+    assert names == [("walk", 0), ("1", 1), ("7", 2), ("2", 3)]
+    assert [item[1:] for item in recording_items(str(path))] == [("1", "7", 1.0), ("1", "7", 2.0), ("2", "7", 3.0)]
+
+
+def test_resume_truncates_partial_record(tmp_path):
+    path = tmp_path / "run.gdoprec"
+    scenario = Scenario("walk")
+    _record(path, scenario, [("1", "7", 1.0), ("1", "7", 2.0)])
+    # interrupted while writing the second range record
+    os.truncate(path, os.path.getsize(path) - 5)
+
+    _record(path, scenario, [("2", "7", 3.0)])
+
+    assert [item[1:] for item in recording_items(str(path))] == [("1", "7", 1.0), ("2", "7", 3.0)]
+
+
+def test_replay_at_maximum_speed_pushes_everything(tmp_path):
+    path = tmp_path / "run.gdoprec"
+    scenario = Scenario("walk")
+    _record(path, scenario, [("1", "7", float(i)) for i in range(3000)])
+    queue = IngestionQueue(IngestionQueue.KEEP_N, capacity=10000)
+
+    stats = Replayer(queue, speed=None).replay(scenario, recording_items(str(path)))
+
+    assert stats["events"] == 3000
+    assert [u.distance for u in queue.drain()] == [float(i) for i in range(3000)]
+
+
+def test_records_spanning_read_chunks(tmp_path, monkeypatch):
+    path = tmp_path / "run.gdoprec"
+    scenario = Scenario("walk")
+    ranges = [(f"anchor-{i % 5}", "tag", float(i)) for i in range(100)]
+    _record(path, scenario, ranges)
+    expected = list(recording_items(str(path)))
+
+    # every record straddles several reads
+    monkeypatch.setattr(replay, "_READ_CHUNK", 7)
+    assert list(recording_items(str(path))) == expected
+    assert [item[1:] for item in expected] == ranges
+
+    with path.open("ab") as f:
+        f.write(b"\x02\x00\x01")
+    assert list(recording_items(str(path))) == expected
+
+
+def test_event_stream_items(tmp_path):
+    path = tmp_path / "capture.stream"
+    path.write_text('event: connected\ndata: {"status":"connected"}\n\n'
+                    'event : update\ndata: {"source_id":1,"destination_id":7,"raw_distance":2.5}\n\n'
+                    'event : update\ndata: not json\n\n'
+                    'event : update\ndata: {"source_id":2,"destination_id":7,"raw_distance":3.5}\n')
+
+    assert list(event_stream_items(str(path))) == [(None, "1", "7", 2.5), (None, "2", "7", 3.5)]
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data.session import load_session, save_session
+from simulation.sandbox_scenario import SandboxScenario
+from simulation.scenario import Scenario
+from simulation.station import Anchor, Tag
+
+
+def _scenario():
+    scenario = Scenario("walk")
+    anchors = [Anchor([0.0, 0.0], "A"), Anchor([10.0, 0.0], "B"), Anchor([0.0, 10.0], "C")]
+    tag = Tag(scenario, "T")
+    scenario.stations = anchors + [tag]
+    for anchor, distance in zip(anchors, (5.0, 7.0, 8.0)):
+        scenario.measurements.update_relation(frozenset([anchor, tag]), distance)
+    scenario.agg_method = "median"
+    scenario.sigma = 0.3
+    scenario.track = pd.DataFrame({"time_ms": [1000.0, 2000.0], "x": [1.0, 2.0], "y": [3.0, 4.0]})
+    scenario.track_options = {"window_ms": 1000.0, "step_ms": 1000.0, "max_age_ms": None}
+    return scenario
+
+
+def _relations(scenario):
+    return {tuple(sorted(s.name for s in pair)): distance for pair, distance in scenario.measurements.relation.items()}
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "session.gdop"
+    original = [_scenario(), SandboxScenario("Sandbox")]
+
+    ok, message = save_session(str(path), original)
+    assert ok, message
+    loaded, error = load_session(str(path))
+    assert error is None
+
+    for before, after in zip(original, loaded):
+        assert type(after) is type(before)
+        assert after.name == before.name
+        assert [(s.name, type(s)) for s in after.stations] == [(s.name, type(s)) for s in before.stations]
+        np.testing.assert_allclose(after.anchor_positions(), before.anchor_positions())
+        assert _relations(after) == _relations(before)
+        assert after.sigma == before.sigma
+        assert after.agg_method == before.agg_method
+    pd.testing.assert_frame_equal(loaded[0].track, original[0].track)
+    assert loaded[0].track_options == original[0].track_options
+    np.testing.assert_allclose(loaded[1].tag_truth.position(), original[1].tag_truth.position())
+
+
+def test_save_over_loaded_session(tmp_path):
+    path = tmp_path / "session.gdop"
+    save_session(str(path), [_scenario()])
+    loaded, _ = load_session(str(path))
+
+    ok, message = save_session(str(path), loaded)
+    assert ok, message
+    assert list(loaded[0].track["x"]) == [1.0, 2.0]
+
+    reloaded, error = load_session(str(path))
+    assert error is None
+    pd.testing.assert_frame_equal(reloaded[0].track, loaded[0].track)
+    assert [p.name for p in tmp_path.iterdir()] == ["session.gdop"]
+
+
+def test_loaded_session_keeps_no_view_of_the_file(tmp_path):
+    path = tmp_path / "session.gdop"
+    save_session(str(path), [_scenario()])
+    loaded, _ = load_session(str(path))
+
+    for column in loaded[0].track.columns:
+        base = loaded[0].track[column].to_numpy()
+        while base is not None:
+            assert not isinstance(base, np.memmap)
+            base = base.base
+
+
+def test_new_file_follows_the_umask(tmp_path):
+    path = tmp_path / "session.gdop"
+    previous = os.umask(0o027)
+    try:
+        ok, message = save_session(str(path), [_scenario()])
+    finally:
+        os.umask(previous)
+    assert ok, message
+    assert path.stat().st_mode & 0o777 == 0o640
+
+    path.chmod(0o600)
+    save_session(str(path), [_scenario()])
+    assert path.stat().st_mode & 0o777 == 0o600
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.gdop"
+    path.write_bytes(b"not a session file at all")
+    scenarios, error = load_session(str(path))
+    assert scenarios is None
+    assert "not a GDOP session file" in error
@@ -0,0 +1,76 @@
+import math
+
+import numpy as np
+import pytest
+
+from simulation.spatial import GridIndex
+from simulation.station import Anchor
+
+
+def _anchors(positions):
+    return [Anchor(position, f"A{i}") for i, position in enumerate(positions)]
+
+
+def _brute_force(anchors, point, k, max_distance=None):
+    pairs = sorted((math.dist(point, anchor.position()[:2]), anchor) for anchor in anchors)
+    if max_distance is not None:
+        pairs = [pair for pair in pairs if pair[0] <= max_distance]
+    return [distance for distance, _ in pairs[:k]]
+
+
+LAYOUTS = {
+    "scattered": np.random.default_rng(1).uniform(-50, 50, size=(200, 2)),
+    "colinear": np.column_stack([np.linspace(0, 100, 50), np.zeros(50)]),
+    "two": np.array([[0.0, 0.0], [30.0, 0.0]]),
+    "clustered": np.vstack([np.random.default_rng(2).normal(0, 0.1, size=(40, 2)), [[500.0, 500.0]]]),
+}
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_nearest_matches_brute_force(layout):
+    anchors = _anchors(LAYOUTS[layout])
+    index = GridIndex.from_anchors(anchors)
+    queries = np.random.default_rng(3).uniform(-80, 130, size=(50, 2))
+
+    for point in queries:
+        for k in (1, 3):
+            result = [distance for distance, _ in index.nearest_with_distances(point, k)]
+            assert np.allclose(result, _brute_force(anchors, point, k))
+        result = [distance for distance, _ in index.nearest_with_distances(point, 5, max_distance=20.0)]
+        assert np.allclose(result, _brute_force(anchors, point, 5, max_distance=20.0))
+        within = [math.dist(point, anchor.position()) for anchor in index.within(point, 15.0)]
+        assert np.allclose(within, _brute_force(anchors, point, len(anchors), max_distance=15.0))
+
+
+def test_degenerate_layout_query_is_bounded(monkeypatch):
+    anchors = _anchors(LAYOUTS["colinear"])
+    index = GridIndex.from_anchors(anchors)
+    visited = []
+    ring_cells = GridIndex._ring_cells
+
+    def counting_ring_cells(cx, cy, ring):
+        for cell in ring_cells(cx, cy, ring):
+            visited.append(cell)
+            yield cell
+
+    monkeypatch.setattr(GridIndex, "_ring_cells", staticmethod(counting_ring_cells))
+
+    anchor = index.nearest([49.0, 20.0])
+
+    assert anchor.name == "A24"
+    # cells follow the length of the line, not the (zero) area of the layout
+    assert index.cell_size == pytest.approx(100 / math.sqrt(len(anchors)))
+    # the ring search gives up for a linear scan before it visits more cells than there are anchors
+    assert len(visited) <= len(anchors)
+
+
+def test_follows_moves_and_removals():
+    anchors = _anchors([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+    index = GridIndex.from_anchors(anchors)
+
+    anchors[2].update_position([9.0, 1.0])
+    assert index.nearest([8.0, 1.0]) is anchors[2]
+    index.remove(anchors[2])
+    assert index.nearest([8.0, 1.0]) is anchors[1]
+    assert anchors[2] not in index and len(index) == 2
+    assert index.nearest([100.0, 100.0], max_distance=5.0) is None
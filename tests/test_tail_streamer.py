@@ -0,0 +1,78 @@
+import os
+
+from data.tail_streamer import CSVTail
+
+HEADER = "#<Time(ms)>,<Est. Range(m)>,<AP-SSID>\n"
+
+
+def _append(path, text):
+    with path.open("a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _values(rows):
+    return [(row["time(ms)"], row["est._range(m)"], row["ap-ssid"]) for row in rows]
+
+
+def test_skips_existing_rows_and_joins_split_rows(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text(HEADER + "100,1.5,AP_A\n200,2.5,AP_B\n")
+    tail = CSVTail(path)
+    assert tail.columns == ["time(ms)", "est._range(m)", "ap-ssid"]
+    assert tail.read_new_rows() == []
+
+    _append(path, "300,3.")
+    assert tail.read_new_rows() == []
+    _append(path, "5,AP_A\n400,4.5,AP_B\n")
+    assert _values(tail.read_new_rows()) == [(300, 3.5, "AP_A"), (400, 4.5, "AP_B")]
+
+
+def test_incomplete_header_is_read_once_complete(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text("// written by the logger\n#<Time(ms)>,<Est. Ra")
+    tail = CSVTail(path)
+    assert tail.columns is None and tail.offset == 0
+
+    _append(path, "nge(m)>,<AP-SSID>\n100,1.5,AP_A\n")
+    assert _values(tail.read_new_rows()) == [(100, 1.5, "AP_A")]
+    assert tail.columns == ["time(ms)", "est._range(m)", "ap-ssid"]
+
+
+def test_existing_partial_row_is_read_once_complete(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text(HEADER + "100,1.5,AP_A\n200,2.")
+    tail = CSVTail(path)
+
+    _append(path, "5,AP_B\n")
+    assert _values(tail.read_new_rows()) == [(200, 2.5, "AP_B")]
+
+
+def test_from_start_reads_existing_rows(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text(HEADER + "100,1.5,AP_A\n200,2.5,AP_B\n")
+    tail = CSVTail(path, from_start=True)
+    assert _values(tail.read_new_rows()) == [(100, 1.5, "AP_A"), (200, 2.5, "AP_B")]
+    assert tail.read_new_rows() == []
+
+
+def test_truncated_or_replaced_file_is_read_from_the_start(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text(HEADER + "100,1.5,AP_A\n200,2.5,AP_B\n")
+    tail = CSVTail(path)
+
+    path.write_text(HEADER + "300,3.5,AP_A\n")
+    assert _values(tail.read_new_rows()) == [(300, 3.5, "AP_A")]
+
+    # a new file moved over the old one, longer than what was consumed so far
+    replacement = tmp_path / "new.csv"
+    replacement.write_text(HEADER + "400,4.5,AP_A\n500,5.5,AP_B\n600,6.5,AP_A\n")
+    os.replace(replacement, path)
+    assert _values(tail.read_new_rows()) == [(400, 4.5, "AP_A"), (500, 5.5, "AP_B"), (600, 6.5, "AP_A")]
+
+
+def test_missing_file_yields_nothing(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text(HEADER)
+    tail = CSVTail(path)
+    path.unlink()
+    assert tail.read_new_rows() == []
@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+
+from data.importer import _window_aggregate, compute_scenario_track, import_scenario
+from simulation import geometry
+
+HEADER = "#<Time(ms)>,<True Range(m)>,<Est. Range(m)>,<Std dev(m)>,<Successes#>,<Burst#>,<RSSI(dBm)>,<Ch-MHz>,<AP-SSID>,<RTT AP?>\n"
+ANCHORS = {"FTM_PINK": [0.0, 0.0], "FTM_BLUE": [10.0, 0.0], "FTM_GREEN": [0.0, 10.0], "FTM_ORANGE": [10.0, 10.0]}
+TRUTH = np.array([3.0, 4.0])
+
+
+def _workspace(tmp_path):
+    folder = tmp_path / "walk"
+    folder.mkdir()
+    stations = [{"name": n, "type": "ANCHOR", "position": p} for n, p in ANCHORS.items()]
+    stations.append({"name": "TAG", "type": "TAG", "position": TRUTH.tolist()})
+    (folder / "scenario.json").write_text(json.dumps({"stations": stations}))
+    ranges = {ap: float(np.linalg.norm(np.subtract(p, TRUTH))) for ap, p in ANCHORS.items()}
+    # every AP at the start, then only FTM_PINK after 5 s
+    lines = [f"{100 * i},0.5,{ranges[ap]},0.1,5,24,-56,2412,{ap},1\n" for i, ap in enumerate(ANCHORS)]
+    lines.append(f"5000,0.5,{ranges['FTM_PINK']},0.1,5,24,-56,2412,FTM_PINK,1\n")
+    (folder / "rtt-log-1.csv").write_text(HEADER + "".join(lines))
+    ok, message, scenario = import_scenario("walk", str(tmp_path))
+    assert ok, message
+    return scenario
+
+
+def test_window_aggregate_boundaries():
+    times = np.array([0.0, 999.0, 1000.0, 2500.0])
+    ranges = np.array([1.0, 2.0, 3.0, 4.0])
+    starts = np.array([0.0, 1000.0, 2000.0, 3000.0])
+
+    # windows are [start, start + window): a sample on the boundary belongs to the later window
+    newest = _window_aggregate(times, ranges, starts, 1000.0, "newest")
+    np.testing.assert_array_equal(newest, [2.0, 3.0, 4.0, np.nan])
+    lowest = _window_aggregate(times, ranges, starts, 1000.0, "lowest")
+    np.testing.assert_array_equal(lowest, [1.0, 3.0, 4.0, np.nan])
+    # overlapping windows
+    mean = _window_aggregate(times, ranges, np.array([0.0, 500.0]), 1000.0, "mean")
+    np.testing.assert_allclose(mean, [1.5, 2.5])
+
+
+def test_track_windows_and_carry_forward(tmp_path):
+    scenario = _workspace(tmp_path)
+
+    track, error = compute_scenario_track(scenario, "walk", str(tmp_path), window_ms=1000.0)
+    assert error is None
+    np.testing.assert_array_equal(track["time_ms"], [1000.0, 2000.0, 3000.0, 4000.0, 5000.0, 6000.0])
+    # without max_age_ms the first ranges are carried through every later window
+    assert track["anchors"].tolist() == [4] * 6
+    np.testing.assert_allclose(track[["x", "y"]].to_numpy(), np.tile(TRUTH, (6, 1)), atol=1e-9)
+    assert scenario.track is track
+
+    track, error = compute_scenario_track(scenario, "walk", str(tmp_path), window_ms=2000.0, step_ms=1000.0)
+    assert error is None
+    np.testing.assert_array_equal(track["time_ms"], [2000.0, 3000.0, 4000.0, 5000.0, 6000.0, 7000.0])
+
+    track, error = compute_scenario_track(scenario, "walk", str(tmp_path), window_ms=1000.0, max_age_ms=2000.0)
+    assert error is None
+    # ranges expire once they are more than 2 s older than the window; FTM_PINK is fresh again at 5 s
+    assert track["anchors"].tolist() == [4, 4, 4, 0, 0, 1]
+    assert np.isnan(track["x"].iloc[3:]).all()
+    assert scenario.track_options == {"window_ms": 1000.0, "step_ms": 1000.0, "max_age_ms": 2000.0}
+
+
+def test_trilateration_batch_matches_single_epochs():
+    anchors = np.array(list(ANCHORS.values()) + [[5.0, -5.0]])
+    rng = np.random.default_rng(5)
+    truths = rng.uniform(0.0, 10.0, (30, 2))
+    distances = np.linalg.norm(truths[:, None, :] - anchors[None, :, :], axis=2) + rng.normal(0.0, 0.1, (30, 5))
+    distances[::4, 0] = np.nan
+    distances[1, :3] = np.nan
+
+    positions = geometry.trilateration_batch(anchors, distances)
+
+    for row, position in zip(distances, positions):
+        valid = np.isfinite(row)
+        if valid.sum() < 3:
+            assert np.isnan(position).all()
+        else:
+            np.testing.assert_allclose(position, geometry.trilateration(anchors[valid], row[valid]), atol=1e-8)
+
+
+def test_dilution_of_precision_batch_nan_and_singular_rows():
+    anchors = np.array(list(ANCHORS.values()))
+    positions = np.array([[3.0, 4.0], [np.nan, 1.0], [15.0, 0.0], [5.0, 5.0]])
+    valid = np.ones((4, 4), dtype=bool)
+    # a tag on the line through the only two anchors used: both lines of sight are parallel
+    valid[2] = [True, True, False, False]
+
+    gdop = geometry.dilution_of_precision_batch(anchors, positions, valid)
+
+    assert np.isclose(gdop[0], geometry.dilution_of_precision(anchors, positions[0]))
+    assert np.isnan(gdop[1])
+    assert np.isinf(gdop[2])
+    assert np.isclose(gdop[3], geometry.dilution_of_precision(anchors, positions[3]))
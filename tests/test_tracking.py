@@ -0,0 +1,76 @@
+import numpy as np
+
+from simulation.tracking import MultiTagTracker, covariance_ellipses
+
+
+def test_constant_velocity_track_converges():
+    tracker = MultiTagTracker(process_noise=0.1, measurement_noise=0.3)
+    rng = np.random.default_rng(7)
+    velocity = np.array([1.0, -0.5])
+    for i in range(200):
+        t = 0.1 * i
+        truth = np.array([2.0, 3.0]) + velocity * t
+        position, covariance = tracker.step(["tag"], [truth + rng.normal(0.0, 0.3, 2)], t)
+
+    assert np.linalg.norm(position[0] - truth) < 0.15
+    np.testing.assert_allclose(tracker.x[0, 2:], velocity, atol=0.15)
+    # the filtered position is more certain than a single measurement
+    assert np.trace(covariance[0]) < 2 * 0.3 ** 2
+
+
+def test_nan_rows_only_predict():
+    tracker = MultiTagTracker()
+    tracker.step(["a", "b"], [[0.0, 0.0], [5.0, 5.0]], 0.0)
+    tracker.step(["a", "b"], [[1.0, 0.0], [5.0, 5.0]], 1.0)
+    state = tracker.x[0].copy()
+    covariance = tracker.P[0].copy()
+
+    positions, covariances = tracker.step(["a", "b"], [[np.nan, np.nan], [5.0, 5.0]], 2.0)
+
+    # a keeps its prior state and is only moved along its velocity, with a growing uncertainty
+    np.testing.assert_allclose(positions[0], state[:2] + state[2:])
+    np.testing.assert_allclose(tracker.x[0, 2:], state[2:])
+    assert np.trace(covariances[0]) > np.trace(covariance[:2, :2])
+    np.testing.assert_allclose(positions[1], [5.0, 5.0], atol=1e-6)
+
+
+def test_never_measured_tag_stays_nan():
+    tracker = MultiTagTracker()
+    positions, _ = tracker.step(["a"], [[np.nan, np.nan]], 0.0)
+    assert np.isnan(positions).all()
+    assert np.isnan(tracker.positions(["a", "unknown"])).all()
+    assert np.isnan(tracker.covariances(["a"])).all()
+
+
+def test_tags_come_and_go_between_steps():
+    tracker = MultiTagTracker()
+    tracker.step(["a", "b"], [[0.0, 0.0], [10.0, 10.0]], 0.0)
+    tracker.step(["a"], [[0.5, 0.0]], 1.0)
+    positions, _ = tracker.step(["c", "a"], [[3.0, 3.0], [1.0, 0.0]], 2.0)
+
+    assert len(tracker) == 3
+    np.testing.assert_allclose(positions[0], [3.0, 3.0])
+    # b was not part of the last steps and is unchanged
+    np.testing.assert_allclose(tracker.positions(["b"]), [[10.0, 10.0]])
+    assert tracker.t[tracker._index["b"]] == 0.0
+
+    # b comes back: it is predicted over the whole gap, then updated
+    positions, _ = tracker.step(["b"], [[10.0, 10.0]], 3.0)
+    np.testing.assert_allclose(positions[0], [10.0, 10.0], atol=1e-6)
+
+    tracker.reset()
+    assert len(tracker) == 0
+    assert np.isnan(tracker.positions(["a"])).all()
+
+
+def test_covariance_ellipses():
+    angle = np.radians(30.0)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    covariances = np.array([np.diag([4.0, 1.0]), rotation @ np.diag([9.0, 0.25]) @ rotation.T, np.zeros((2, 2))])
+
+    widths, heights, angles = covariance_ellipses(covariances, n_std=2.0)
+
+    np.testing.assert_allclose(widths, [8.0, 12.0, 0.0])
+    np.testing.assert_allclose(heights, [4.0, 2.0, 0.0])
+    # the major axis direction; an ellipse is the same after a half turn
+    np.testing.assert_allclose(np.mod(angles[:2], 180.0), [0.0, 30.0], atol=1e-9)
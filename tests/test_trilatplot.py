@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from presentation.compute_worker import ScenarioResult
+from presentation.trilatplot import TrilatPlot
+
+
+def _plot(results):
+    """TrilatPlot reduced to the state _computed_tag_positions uses; results are returned in order."""
+    plot = TrilatPlot.__new__(TrilatPlot)
+    plot.scenario = object()
+    plot.window = SimpleNamespace(compute_worker=SimpleNamespace(result=lambda scenario: results.pop(0)))
+    plot._tag_result = None
+    plot._trail_revision = None
+    return plot
+
+
+def _result(revision, x):
+    return ScenarioResult(revision, 0, np.array([[x, 0.0]]), 1.0)
+
+
+def test_only_results_of_new_ranges_are_new():
+    first = _result((0, 1, 4, 0), 1.0)
+    anchor_moved = _result((0, 1, 4, 1), 2.0)
+    truth_moved = _result((0, 1, 4, 2), 3.0)
+    new_ranges = _result((0, 2, 4, 2), 4.0)
+    plot = _plot([first, first, anchor_moved, truth_moved, new_ranges, new_ranges])
+    tags = ["t"]
+
+    news = []
+    for _ in range(6):
+        positions, new = plot._computed_tag_positions(tags)
+        news.append(new)
+    assert news == [True, False, False, False, True, False]
+    assert positions[0, 0] == 4.0
+
+
+def test_missing_or_mismatched_result_is_not_new():
+    plot = _plot([None, _result((0, 1, 4, 0), 1.0)])
+    positions, new = plot._computed_tag_positions(["t"])
+    assert not new and np.isnan(positions).all()
+    positions, new = plot._computed_tag_positions(["t", "u"])
+    assert not new and positions.shape == (2, 2) and np.isnan(positions).all()
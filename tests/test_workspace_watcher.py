@@ -0,0 +1,44 @@
+import os
+
+from data.workspace_watcher import WorkspaceChange, WorkspaceWatcher
+
+
+def _bump(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _kinds(changes):
+    return {scenario: sorted((os.path.basename(c.path), c.kind) for c in items) for scenario, items in changes.items()}
+
+
+def test_poll_reports_new_appended_changed_and_removed_files(tmp_path):
+    walk = tmp_path / "walk"
+    walk.mkdir()
+    log = walk / "a.csv"
+    log.write_text("#<Time(ms)>\n100\n")
+    (walk / "notes.txt").write_text("ignored")
+    watcher = WorkspaceWatcher(str(tmp_path))
+    assert watcher.scenarios() == ["walk"]
+    assert watcher.poll() == {}
+
+    with log.open("a") as f:
+        f.write("200\n")
+    _bump(log)
+    config = walk / "scenario.json"
+    config.write_text("{}")
+    changes = watcher.poll()
+    assert _kinds(changes) == {"walk": [("a.csv", WorkspaceChange.APPENDED), ("scenario.json", WorkspaceChange.NEW)]}
+    assert [c.is_config for c in sorted(changes["walk"], key=lambda c: c.path)] == [False, True]
+
+    log.write_text("#<Time(ms)>\n9\n")
+    _bump(log)
+    config.unlink()
+    assert _kinds(watcher.poll()) == {"walk": [("a.csv", WorkspaceChange.CHANGED), ("scenario.json", WorkspaceChange.REMOVED)]}
+    assert watcher.poll() == {}
+
+
+def test_missing_workspace_is_empty(tmp_path):
+    watcher = WorkspaceWatcher(str(tmp_path / "missing"))
+    assert watcher.scenarios() == []
+    assert watcher.poll() == {}